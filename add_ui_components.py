@@ -3,33 +3,81 @@
 Add UI components for progression, orders, and disasters to Kitchen Explorer
 """
 
+import argparse
 import re
 
-def read_file(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return f.read()
+from patch_cache import PatchCache
+from patch_io import MappedSource, write_plan
+from patch_ledger import PatchLedger
+from jsx_hoist import derived_unit, hoist_repeated, index_lookups, lookup_table
+from patch_report import PatchProfile, format_profile, plan_diff
+from render_probes import plan_runtime, probe_block
+from splice import SplicePlan
 
-def write_file(filepath, content):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
+DEFAULT_SOURCE = 'C:/Dev/Kitchen_Explorer/src/CookingGame.jsx'
 
-def add_ui_components():
-    source_file = 'C:/Dev/Kitchen_Explorer/src/CookingGame.jsx'
-    content = read_file(source_file)
+# Every insertion point add_ui_components() looks up, located in a single scan
+ANCHORS = [
+    'Kitchen Explorer</h1>',
+    '<div className="px-4 py-2 flex',
+    '</div>',
+    'const checkRecipeCompletion',
+    'setCompletedDishes(prev => [...prev, recipeKey]);',
+    'Plate',
+    'className="flex flex-wrap gap-2 justify-center">',
+]
+
+# Names for the values hoisted out of the UI blocks; others get generated names
+DERIVED_NAMES = {
+    'CHEF_LEVELS_BY_LEVEL[playerProfile.level + 1]?.xpRequired': 'nextLevelXP',
+    'playerProfile.xp / (nextLevelXP || 100)': 'levelProgress',
+    "order.timeRemaining < 30 ? '#EF4444' : order.timeRemaining < 60 ? '#F59E0B' : '#10B981'": 'urgencyColor',
+}
+
+IDENT_RE = re.compile(r'[A-Za-z_$][\w$]*')
+
+# UI blocks wrapped in render probes with --instrument
+PROBED_BLOCKS = ['xp_bar', 'active_orders', 'warning_banners', 'level_up_modal', 'disaster_overlay']
+
+def add_ui_components(source_file=DEFAULT_SOURCE, dry_run=False, cache=None, profile=None, instrument=False):
+    cache = cache or PatchCache()
+    profile = profile or PatchProfile()
+    with profile.stage('read'):
+        source = MappedSource(source_file)
+    content = source.text
+
+    # Every edit is planned against the original text and applied in one pass
+    plan = SplicePlan(content)
+    ledger = PatchLedger(source_file, content, source.digest)
+    with profile.locate('(anchor index)'):
+        anchors = cache.anchor_index(content, ANCHORS, source.digest)
 
     # Find the main return statement and add UI components
     # Look for the title "Kitchen Explorer"
-    title_pos = content.find('Kitchen Explorer</h1>')
+    with profile.locate('ui_blocks'):
+        title_pos = anchors.find('Kitchen Explorer</h1>')
 
     if title_pos == -1:
-        print("Could not find title element")
-        return {}
+        source.close()
+        reason = "Could not find title element"
+        print(reason)
+        return {'skipped': reason}
+
+    # The UI reads the progression and restaurant state enhance_game adds
+    with profile.locate('(structure map)'):
+        structure = cache.structure(content, source.digest)
+    if 'CHEF_LEVELS' not in structure.by_name:
+        source.close()
+        reason = "Could not find CHEF_LEVELS (run enhance_game first)"
+        print(reason)
+        return {'skipped': reason}
 
     # Find the div that contains the header bar
-    container_start = content.rfind('<div className="px-4 py-2 flex', 0, title_pos)
+    container_start = anchors.rfind('<div className="px-4 py-2 flex', 0, title_pos)
 
-    # Insert XP Bar and Restaurant Mode Toggle after title container
-    ui_components = '''
+    # Insert XP Bar and Restaurant Mode Toggle after title container, one named block at a time
+    ui_blocks = [
+        ('xp_bar', '''
 
       {/* XP Bar and Player Stats */}
       <div className="bg-gradient-to-r from-purple-600 to-indigo-600 rounded-lg p-4 shadow-lg mb-4">
@@ -56,7 +104,8 @@ def add_ui_components():
           <span>👥 Served: {playerProfile.stats.customersServed}</span>
           <span>⭐ Rep: {reputation.toFixed(1)}/5.0</span>
         </div>
-      </div>
+      </div>'''),
+        ('restaurant_toggle', '''
 
       {/* Restaurant Mode Toggle */}
       <div className="flex gap-4 mb-4">
@@ -78,7 +127,8 @@ def add_ui_components():
             + New Customer
           </button>
         )}
-      </div>
+      </div>'''),
+        ('active_orders', '''
 
       {/* Active Orders Row */}
       {restaurantMode && activeOrders.length > 0 && (
@@ -120,7 +170,8 @@ def add_ui_components():
             ))}
           </div>
         </div>
-      )}
+      )}'''),
+        ('warning_banners', '''
 
       {/* Warning Banners */}
       {warnings.length > 0 && (
@@ -138,7 +189,8 @@ def add_ui_components():
             </div>
           ))}
         </div>
-      )}
+      )}'''),
+        ('level_up_modal', '''
 
       {/* Level Up Modal */}
       {showLevelUp && levelUpData && (
@@ -171,7 +223,8 @@ def add_ui_components():
             </button>
           </div>
         </div>
-      )}
+      )}'''),
+        ('disaster_overlay', '''
 
       {/* Disaster Mini-Game Overlay */}
       {activeDisaster && (
@@ -232,30 +285,69 @@ def add_ui_components():
             )}
           </div>
         </div>
-      )}
-
-'''
+      )}'''),
+    ]
 
     # Find the closing div of the title container and insert after it
-    insert_pos = content.find('</div>', container_start) + len('</div>')
+    with profile.locate('ui_blocks'):
+        insert_pos = anchors.find('</div>', container_start) + len('</div>')
 
-    # Insert the UI components
-    content = content[:insert_pos] + ui_components + content[insert_pos:]
+    # Index lookups on module constants and hoist repeated expressions out of
+    # the blocks. Names this script added before are free to be reused.
+    with profile.locate('derived_values'):
+        recorded = ''.join(unit.get('text', '') for unit in ledger.units.values())
+        taken = set(IDENT_RE.findall(content)) - set(IDENT_RE.findall(recorded))
+        tables = {}
+        for i, (name, block) in enumerate(ui_blocks):
+            block, block_tables = index_lookups(block, set(structure.by_name))
+            ui_blocks[i] = (name, block)
+            tables.update(block_tables)
+        hoisted, derived = hoist_repeated(dict(ui_blocks), DERIVED_NAMES, taken)
+        ui_blocks = [(name, hoisted[name]) for name, _ in ui_blocks]
+    for table, (constant, key) in tables.items():
+        with profile.apply(table.lower(), plan):
+            ledger.plan_insert(plan, table.lower(), lookup_table(table, constant, key),
+                               structure.declaration(constant).end)
+    if derived:
+        with profile.locate('derived_values'):
+            component = structure.declaration('CookingGame')
+            derived_pos = content.rfind('\n', 0, component.return_offset) + 1
+        with profile.apply('derived_values', plan):
+            ledger.plan_insert(plan, 'derived_values',
+                               derived_unit(derived, 'Derived values for the progression and restaurant UI'),
+                               derived_pos)
+
+    # With and without probes are two versions of one unit; the unwanted one is upgraded away
+    probed_blocks = {name: probe_block(name, block) for name, block in ui_blocks if name in PROBED_BLOCKS}
+    with profile.apply('render_probes', plan):
+        plan_runtime(plan, ledger, content, instrument, probed_blocks.values())
+
+    # Insert the UI components that are not already in the file
+    for name, block in ui_blocks:
+        variants = []
+        if name in probed_blocks:
+            if instrument:
+                block, variants = probed_blocks[name], [block]
+            else:
+                variants = [probed_blocks[name]]
+        with profile.apply(name, plan):
+            ledger.plan_insert(plan, name, block, insert_pos, variants)
 
     # Now update the checkRecipeCompletion to award XP
     # Find the checkRecipeCompletion function
-    check_recipe_pos = content.find('const checkRecipeCompletion')
+    with profile.locate('recipe_xp_award'):
+        check_recipe_pos = anchors.find('const checkRecipeCompletion')
+        # Find the part where it sets completedDishes
+        completed_dishes_line = anchors.find('setCompletedDishes(prev => [...prev, recipeKey]);', check_recipe_pos)
 
     if check_recipe_pos > 0:
-        # Find the part where it sets completedDishes
-        completed_dishes_line = content.find('setCompletedDishes(prev => [...prev, recipeKey]);', check_recipe_pos)
 
         if completed_dishes_line > 0:
             # Add XP gain and stat update after setCompletedDishes
             xp_addition = '''
 
         // Award XP for completing recipe
-        const xpReward = RECIPES[recipeKey].xpReward || 25;
+        const xpReward = RECIPES[recipeKey].xpReward || 20;
         gainXP(xpReward, `Completed ${recipeName}`);
         setPlayerProfile(prev => ({
           ...prev,
@@ -265,11 +357,13 @@ def add_ui_components():
 
             # Find the end of the setCompletedDishes line
             insert_at = content.find(';', completed_dishes_line) + 1
-            content = content[:insert_at] + xp_addition + content[insert_at:]
+            with profile.apply('recipe_xp_award', plan):
+                ledger.plan_insert(plan, 'recipe_xp_award', xp_addition, insert_at)
 
     # Also update the plate rendering to check orders when dish is placed
     # Find where plateItems are rendered and add order checking
-    plate_items_render = content.find('className="flex flex-wrap gap-2 justify-center">', content.find('Plate'))
+    with profile.locate('plate_order_check'):
+        plate_items_render = anchors.find('className="flex flex-wrap gap-2 justify-center">', anchors.find('Plate'))
 
     if plate_items_render > 0:
         # Find useEffect for plateItems and add order checking
@@ -287,20 +381,53 @@ def add_ui_components():
 
 '''
 
-        # Find a good place to insert this - after other useEffects
-        last_useeffect = content.rfind('}, [', 0, content.find('return ('))
-        if last_useeffect > 0:
-            insert_at = content.find(']);', last_useeffect) + 3
-            content = content[:insert_at] + plate_check_effect + content[insert_at:]
+        # Find a good place to insert this - after the component's last hook with dependencies
+        with profile.locate('plate_order_check'):
+            hooks_with_deps = [h for h in structure.hooks('CookingGame') if h.deps]
+        if hooks_with_deps:
+            with profile.apply('plate_order_check', plan):
+                ledger.plan_insert(plan, 'plate_order_check', plate_check_effect, hooks_with_deps[-1].end)
 
-    # Write the enhanced file
-    write_file(source_file, content)
+    # Dry runs only report what would change
+    diff = None
+    if dry_run:
+        diff = plan_diff(plan, source_file)
+        source.close()
+
+    # Stream all planned edits to disk in a single pass
+    else:
+        digest = source.digest
+        if plan:
+            with profile.stage('write'):
+                digest = write_plan(source, plan)
+        source.close()
+        if plan or not ledger.trusted:
+            ledger.save(digest)
 
     return {
-        'enhanced_size': len(content)
+        'enhanced_size': len(content) + plan.size_delta(),
+        'units': ledger.status,
+        'profile': profile.units,
+        'diff': diff
     }
 
 if __name__ == '__main__':
-    stats = add_ui_components()
+    parser = argparse.ArgumentParser(description='Add the progression and restaurant UI to CookingGame.jsx')
+    parser.add_argument('source_file', nargs='?', default=DEFAULT_SOURCE)
+    parser.add_argument('--dry-run', action='store_true', help='print a unified diff and patch timings, write nothing')
+    parser.add_argument('--instrument', action='store_true',
+                        help='wrap the UI blocks in render probes; rerun without it to strip them')
+    args = parser.parse_args()
+
+    stats = add_ui_components(args.source_file, dry_run=args.dry_run, instrument=args.instrument)
+    if 'skipped' in stats:
+        raise SystemExit(1)
+    if args.dry_run:
+        print(stats['diff'], end='')
+        print(format_profile(stats['profile']))
+        raise SystemExit(0)
+
     print("UI Components Added!")
     print(f"Final file size: {stats['enhanced_size']:,} chars")
+    for name, status in stats['units'].items():
+        print(f"  {name}: {status}")
@@ -0,0 +1,85 @@
+"""
+Anchor index for locating patch insertion points in one scan.
+
+All anchors of a file are compiled into a single alternation regex and
+matched in one pass, together with the curly braces, so every anchor
+occurrence is recorded with its offset and brace depth. Lookups after
+that are binary searches instead of repeated str.find/rfind rescans.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+Occurrence = namedtuple('Occurrence', ['offset', 'depth'])
+
+
+def compile_anchors(anchors):
+    # Longest first so that an anchor which is a prefix of another one never
+    # shadows it; the shorter prefixes are recorded from the longer match.
+    ordered = sorted(set(anchors), key=len, reverse=True)
+    alternation = '|'.join(re.escape(a) for a in ordered)
+    # Braces come last so anchors such as '}, [' win over a bare brace
+    pattern = re.compile('(?=(' + alternation + '|[{}]))' if ordered else '(?=([{}]))')
+    prefixes = {a: [b for b in ordered if b != a and a.startswith(b)] for a in ordered}
+    return pattern, prefixes
+
+
+class AnchorIndex:
+    def __init__(self, text, anchors, occurrences=None):
+        self.text = text
+        self.anchors = list(dict.fromkeys(anchors))
+        if occurrences is None:
+            self.occurrences = {a: [] for a in self.anchors}
+            self._build()
+        else:
+            # Restored from a cache entry for this exact text and anchor list
+            self.occurrences = occurrences
+        self._offsets = {a: [o.offset for o in occ] for a, occ in self.occurrences.items()}
+
+    def _build(self):
+        pattern, prefixes = compile_anchors(self.anchors)
+        text = self.text
+        depth = 0
+        for match in pattern.finditer(text):
+            offset = match.start()
+            found = match.group(1)
+            for anchor in [found] + prefixes.get(found, []):
+                if anchor in self.occurrences:
+                    self.occurrences[anchor].append(Occurrence(offset, depth))
+            char = text[offset]
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+
+    def _offsets_for(self, anchor):
+        if anchor not in self._offsets:
+            raise KeyError(f'Anchor not indexed: {anchor!r}')
+        return self._offsets[anchor]
+
+    def _bounds(self, anchor, start, end):
+        offsets = self._offsets_for(anchor)
+        end = len(self.text) if end is None else end
+        lo = bisect_left(offsets, max(start, 0))
+        hi = bisect_right(offsets, end - len(anchor))
+        return offsets, lo, hi
+
+    def find(self, anchor, start=0, end=None):
+        # Same contract as str.find, restricted to indexed anchors
+        offsets, lo, hi = self._bounds(anchor, start, end)
+        return offsets[lo] if lo < hi else -1
+
+    def rfind(self, anchor, start=0, end=None):
+        offsets, lo, hi = self._bounds(anchor, start, end)
+        return offsets[hi - 1] if lo < hi else -1
+
+    def depth_at(self, anchor, offset):
+        offsets = self._offsets_for(anchor)
+        i = bisect_left(offsets, offset)
+        if i == len(offsets) or offsets[i] != offset:
+            raise KeyError(f'No {anchor!r} anchor at offset {offset}')
+        return self.occurrences[anchor][i].depth
+
+    def count(self, anchor):
+        return len(self._offsets_for(anchor))
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Run the Kitchen Explorer patch scripts over many target files in parallel.
+
+Targets come from glob patterns and/or a manifest file (one path or glob
+per line, `#` starts a comment). Each target is read, analyzed, spliced
+and written by a worker process; the transforms for one file always run
+in order inside the same worker. Results are collected per file and
+summarized in one report.
+
+With --dry-run nothing is written; each transform's unified diff and
+per-unit timings are reported instead. Every transform is then diffed
+against the file as it is on disk, not against the output of the
+transforms before it.
+
+A transform with nothing to patch in a file (say enhance_game on a file
+that imports its game systems instead of declaring them) is reported as
+skipped, with its reason, rather than as a failure.
+
+    python batch_patch.py "src/**/*.jsx" --jobs 4
+    python batch_patch.py --manifest targets.txt --transform enhance_game
+    python batch_patch.py src/CookingGame.jsx --dry-run
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from add_ui_components import add_ui_components
+from code_split import split_chunks
+from dead_assets import prune_dead_assets
+from enhance_game import enhance_game
+from patch_report import format_profile
+from svg_sprite import extract_svg_sprite
+
+TRANSFORMS = {
+    'enhance_game': enhance_game,
+    'add_ui_components': add_ui_components,
+    'svg_sprite': extract_svg_sprite,
+    'code_split': split_chunks,
+    'dead_assets': prune_dead_assets,
+}
+
+# Transforms that take instrument=True to add render probes
+INSTRUMENTED = {'enhance_game', 'add_ui_components'}
+
+
+def read_manifest(path):
+    patterns = []
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                patterns.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return patterns
+
+
+def expand_targets(patterns):
+    targets = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            key = os.path.normcase(os.path.abspath(path))
+            if key not in seen and os.path.isfile(path):
+                seen.add(key)
+                targets.append(path)
+    return targets
+
+
+def run_target(path, transform_names, dry_run=False, instrument=False):
+    result = {'path': path, 'ok': True, 'error': None, 'transforms': {}, 'skipped': {}, 'seconds': 0.0,
+              'diffs': {}, 'profiles': {}}
+    start = time.perf_counter()
+    result['size_before'] = os.path.getsize(path)
+    for name in transform_names:
+        try:
+            options = {'instrument': instrument} if name in INSTRUMENTED else {}
+            # The report carries everything a transform would print on its own
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = TRANSFORMS[name](path, dry_run=dry_run, **options) or {}
+        except Exception as e:  # reported per file, the batch keeps going
+            result['ok'] = False
+            result['error'] = f'{name}: {type(e).__name__}: {e}'
+            break
+        if 'skipped' in stats:
+            result['skipped'][name] = stats['skipped']
+            continue
+        result['transforms'][name] = stats.get('units', {})
+        result['profiles'][name] = stats.get('profile', {})
+        if stats.get('diff'):
+            result['diffs'][name] = stats['diff']
+    result['size_after'] = os.path.getsize(path)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_batch(targets, transform_names, jobs=None, dry_run=False, instrument=False):
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(targets) or 1))
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(run_target, path, transform_names, dry_run, instrument) for path in targets]
+        for future in as_completed(futures):
+            results.append(future.result())
+    results.sort(key=lambda r: r['path'])
+    return results
+
+
+def summarize(results, elapsed):
+    applied = 0
+    for result in results:
+        for units in result['transforms'].values():
+            applied += sum(1 for status in units.values() if status in ('applied', 'upgraded'))
+    return {
+        'files': len(results),
+        'succeeded': sum(1 for r in results if r['ok']),
+        'failed': sum(1 for r in results if not r['ok']),
+        'skipped': sum(1 for r in results if r['ok'] and not r['transforms']),
+        'units_applied': applied,
+        'bytes_added': sum(r['size_after'] - r['size_before'] for r in results),
+        'worker_seconds': sum(r['seconds'] for r in results),
+        'wall_seconds': elapsed,
+    }
+
+
+def print_dry_run(results):
+    for result in results:
+        for name, diff in result['diffs'].items():
+            print(f'# {name}')
+            print(diff, end='')
+        for name, units in result['profiles'].items():
+            print(f"# {name} on {result['path']}")
+            print(format_profile(units))
+        print()
+
+
+def print_report(results, summary):
+    for result in results:
+        status = 'ok' if result['transforms'] else 'skip'
+        if not result['ok']:
+            status = 'FAILED'
+        delta = result['size_after'] - result['size_before']
+        print(f"{status:6} {result['path']}  {delta:+,} bytes  {result['seconds'] * 1000:.1f} ms")
+        for name, reason in result['skipped'].items():
+            print(f"       {name} skipped: {reason}")
+        if result['error']:
+            print(f"       {result['error']}")
+    print()
+    print(f"Files: {summary['files']} ({summary['succeeded'] - summary['skipped']} ok, "
+          f"{summary['skipped']} skipped, {summary['failed']} failed)")
+    print(f"Patch units applied: {summary['units_applied']}")
+    print(f"Bytes added: {summary['bytes_added']:,}")
+    print(f"Time: {summary['wall_seconds']:.2f}s wall, {summary['worker_seconds']:.2f}s in workers")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('patterns', nargs='*', help='target files or glob patterns')
+    parser.add_argument('--manifest', help='file listing targets, one path or glob per line')
+    parser.add_argument('--transform', action='append', choices=sorted(TRANSFORMS),
+                        help='transform to run (repeatable, default: enhance_game then add_ui_components)')
+    parser.add_argument('--jobs', '-j', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--json', dest='json_path', help='also write per-file results and summary as JSON')
+    parser.add_argument('--dry-run', action='store_true', help='print diffs and per-unit timings, write nothing')
+    parser.add_argument('--instrument', action='store_true',
+                        help='add render probes; without it, probes from an earlier run are stripped')
+    args = parser.parse_args(argv)
+
+    patterns = list(args.patterns)
+    if args.manifest:
+        patterns += read_manifest(args.manifest)
+    targets = expand_targets(patterns)
+    if not targets:
+        parser.error('no target files matched')
+
+    transform_names = args.transform or ['enhance_game', 'add_ui_components']
+    start = time.perf_counter()
+    results = run_batch(targets, transform_names, args.jobs, args.dry_run, args.instrument)
+    summary = summarize(results, time.perf_counter() - start)
+    if args.dry_run:
+        print_dry_run(results)
+    print_report(results, summary)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'results': results}, f, indent=2)
+
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Benchmark the patch pipeline on synthetic components shaped like CookingGame.jsx.
+
+For each size a component is generated with a long IngredientSVG switch
+of `case '...'` SVG branches, a large RECIPES literal and many
+useState/useEffect blocks. enhance_game and add_ui_components then run
+over a fresh copy in pipeline order with a cold cache, and again with a
+warm one. Each run is split into read, locate, splice and write time,
+and peak Python heap use is measured in a separate tracemalloc pass so
+tracing does not skew the timings.
+
+Results are appended to a JSON history file (.patch_cache/patch_bench.json
+by default; timings are machine-specific, so it is not committed) together
+with the current commit, and compared against the previous entry so regressions in the
+patch tooling show up before they reach the build.
+
+    python bench_patch.py
+    python bench_patch.py --sizes 8000 --repeat 5 --max-regression 25
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from add_ui_components import add_ui_components
+from enhance_game import enhance_game
+from jsx_structure import scan
+from patch_cache import CACHE_DIR, PatchCache
+from patch_report import PatchProfile
+
+DEFAULT_SIZES = [8000, 50000, 250000]
+DEFAULT_HISTORY = os.path.join(CACHE_DIR, 'patch_bench.json')
+
+PIPELINE = [
+    ('enhance_game', enhance_game),
+    ('add_ui_components', add_ui_components),
+]
+
+# Timing changes smaller than this are noise, whatever the percentage
+MIN_REGRESSION_MS = 5.0
+
+INGREDIENTS = ['salmon', 'chicken', 'shrimp', 'rice', 'nori', 'flour', 'avocado', 'cucumber',
+               'onion', 'garlic', 'ginger', 'egg', 'cheese', 'butter', 'bacon', 'soySauce']
+RECIPE_EMOJI = ['🍣', '🍲', '🍳', '🍤', '🍗']
+COLORS = ['#FA8072', '#F5DEB3', '#FFB6C1', '#FFFAF0', '#2F4F4F', '#90EE90', '#DEB887']
+
+
+def _svg_case(i):
+    name = f'{INGREDIENTS[i % len(INGREDIENTS)]}{i}'
+    fill = COLORS[i % len(COLORS)]
+    return f'''      case '{name}':
+        return (
+          <svg width={{size}} height={{size}} viewBox="0 0 100 100">
+            <defs>
+              <linearGradient id="{name}Grad" x1="0%" y1="0%" x2="100%" y2="100%">
+                <stop offset="0%" stopColor="{fill}" />
+                <stop offset="100%" stopColor="#333333" />
+              </linearGradient>
+            </defs>
+            <ellipse cx="50" cy="55" rx={{state === 'chopped' ? 30 : 40}} ry="25" fill="url(#{name}Grad)" />
+            {{state === 'cooked' && <path d="M20 50 Q50 {30 + i % 20} 80 50" stroke="#8B4513" strokeWidth="2" fill="none" />}}
+          </svg>
+        );
+'''
+
+
+def _recipe(i):
+    first = INGREDIENTS[i % len(INGREDIENTS)]
+    second = INGREDIENTS[(i * 7 + 3) % len(INGREDIENTS)]
+    return (f"  recipe{i}: {{ name: 'Recipe {i}', required: ['{first}', '{second}'], "
+            f"emoji: '{RECIPE_EMOJI[i % len(RECIPE_EMOJI)]}' }},\n")
+
+
+def _state_block(i):
+    return f'''  const [value{i}, setValue{i}] = useState({i});
+  useEffect(() => {{
+    if (value{i} > {i + 100}) {{
+      setValue{i}(prev => prev - 1);
+    }}
+  }}, [value{i}]);
+
+'''
+
+
+def generate_component(lines):
+    # Roughly half the lines go to SVG branches, a tenth to recipes and
+    # the rest to component hooks, like the real file
+    head = '''import React, { useState, useEffect, useCallback, useRef } from 'react';
+
+const IngredientSVG = ({ type, state, size = 50 }) => {
+  const renderIngredient = () => {
+    switch (type) {
+'''
+    svg_cases = max(1, lines // 2 // 13)
+    recipes = max(len(RECIPE_EMOJI), lines // 10)
+    blocks = max(1, (lines - svg_cases * 13 - recipes) // 7)
+    parts = [head]
+    parts.extend(_svg_case(i) for i in range(svg_cases))
+    parts.append('''      default:
+        return null;
+    }
+  };
+
+  return <div className="ingredient">{renderIngredient()}</div>;
+};
+
+const RECIPES = {
+''')
+    parts.extend(_recipe(i) for i in range(recipes))
+    parts.append('''};
+
+const CookingGame = () => {
+  const [activeItems, setActiveItems] = useState([]);
+  const [plateItems, setPlateItems] = useState([]);
+  const [completedDishes, setCompletedDishes] = useState([]);
+  const [expandedCategory, setExpandedCategory] = useState(null);
+  const [notification, setNotification] = useState(null);
+
+''')
+    parts.extend(_state_block(i) for i in range(blocks))
+    parts.append('''  const checkRecipeCompletion = useCallback((recipeKey, recipeName) => {
+    setCompletedDishes(prev => [...prev, recipeKey]);
+  }, []);
+
+  const showNotification = useCallback((message) => {
+    setNotification(message);
+    setTimeout(() => setNotification(null), 2000);
+  }, []);
+
+  useEffect(() => {
+    const timer = setInterval(() => setActiveItems(prev => [...prev]), 1000);
+    return () => clearInterval(timer);
+  }, [plateItems]);
+
+  return (
+    <div className="w-full h-screen">
+      <div className="bg-white shadow-md">
+        <div className="px-4 py-2 flex">
+          <h1 className="text-2xl font-bold">🍳 Kitchen Explorer</h1>
+        </div>
+      </div>
+      <div className="plate-area">
+        <h2>Plate</h2>
+        <div className="flex flex-wrap gap-2 justify-center">
+          {plateItems.map((item, i) => (
+            <IngredientSVG key={i} type={item.type} state={item.state} />
+          ))}
+        </div>
+      </div>
+      {notification && <div className="notification">{notification}</div>}
+    </div>
+  );
+};
+
+export default CookingGame;
+''')
+    return ''.join(parts)
+
+
+def _run_pipeline(path, cache):
+    # Returns {script: stage totals in ms} plus the end-to-end time
+    result = {}
+    for name, transform in PIPELINE:
+        profile = PatchProfile()
+        start = time.perf_counter()
+        transform(path, cache=cache, profile=profile)
+        stages = profile.totals()
+        stages['total'] = (time.perf_counter() - start) * 1000
+        result[name] = stages
+    return result
+
+
+def _fresh_copy(source, workdir):
+    path = os.path.join(workdir, 'CookingGame.jsx')
+    for leftover in (path, path + '.patches.json'):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    shutil.copyfile(source, path)
+    return path
+
+
+def _best(runs):
+    # Fastest of the repeats, stage by stage
+    return {name: {stage: round(min(run[name][stage] for run in runs), 3) for stage in runs[0][name]}
+            for name in runs[0]}
+
+
+def bench_size(lines, repeat, workdir):
+    source = os.path.join(workdir, f'synthetic-{lines}.jsx')
+    text = generate_component(lines)
+    with open(source, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+    cache_dir = os.path.join(workdir, 'cache')
+
+    cold, warm = [], []
+    for _ in range(repeat):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        scan.cache_clear()
+        cache = PatchCache(cache_dir, max_bytes=1 << 30)
+        cold.append(_run_pipeline(_fresh_copy(source, workdir), cache))
+        scan.cache_clear()
+        warm.append(_run_pipeline(_fresh_copy(source, workdir), cache))
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    scan.cache_clear()
+    path = _fresh_copy(source, workdir)
+    cache = PatchCache(cache_dir, max_bytes=1 << 30)
+    peaks = {}
+    for name, transform in PIPELINE:
+        tracemalloc.start()
+        transform(path, cache=cache)
+        peaks[name] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'lines': text.count('\n'),
+        'bytes': len(text.encode('utf-8')),
+        'cold_ms': _best(cold),
+        'warm_ms': _best(warm),
+        'peak_bytes': peaks,
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def compare(previous, current, threshold):
+    # (size, script, metric, old, new, percent change) for every metric that
+    # got worse by more than `threshold` percent
+    regressions = []
+    for size, result in current['results'].items():
+        old = previous['results'].get(size)
+        if not old:
+            continue
+        metrics = [('cold total ms', 'cold_ms', 'total'), ('warm total ms', 'warm_ms', 'total')]
+        for name in result['peak_bytes']:
+            for label, group, key in metrics:
+                before = old[group].get(name, {}).get(key)
+                after = result[group][name][key]
+                if (before and after - before > MIN_REGRESSION_MS
+                        and (after - before) / before * 100 > threshold):
+                    regressions.append((size, name, label, before, after, (after - before) / before * 100))
+            before = old['peak_bytes'].get(name)
+            after = result['peak_bytes'][name]
+            if before and (after - before) / before * 100 > threshold:
+                regressions.append((size, name, 'peak bytes', before, after, (after - before) / before * 100))
+    return regressions
+
+
+def print_results(entry):
+    print(f"{'lines':>8} {'script':18} {'read':>8} {'locate':>8} {'splice':>8} {'write':>8} "
+          f"{'cold':>9} {'warm':>9} {'peak MiB':>9}")
+    for result in entry['results'].values():
+        for name, stages in result['cold_ms'].items():
+            print(f"{result['lines']:8,} {name:18} {stages['read']:8.1f} {stages['locate']:8.1f} "
+                  f"{stages['splice']:8.1f} {stages['write']:8.1f} {stages['total']:9.1f} "
+                  f"{result['warm_ms'][name]['total']:9.1f} {result['peak_bytes'][name] / 2 ** 20:9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='component sizes in lines')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per size; the fastest is kept')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='JSON file results are appended to')
+    parser.add_argument('--no-save', action='store_true', help='do not append this run to the history')
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help='percent slowdown or memory growth against the last run that fails the benchmark')
+    args = parser.parse_args(argv)
+
+    entry = {
+        'commit': _git_commit(),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'results': {},
+    }
+    workdir = tempfile.mkdtemp(prefix='patch-bench-')
+    try:
+        for lines in args.sizes:
+            entry['results'][str(lines)] = bench_size(lines, max(1, args.repeat), workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print_results(entry)
+
+    history = load_history(args.history)
+    regressions = compare(history[-1], entry, args.max_regression) if history else []
+    if regressions:
+        print(f"\nRegressions against {history[-1].get('commit') or 'the previous run'}:")
+        for size, name, label, before, after, change in regressions:
+            print(f"  {int(size):,} lines  {name}  {label}: {before:,.1f} -> {after:,.1f} ({change:+.0f}%)")
+    if not args.no_save:
+        history.append(entry)
+        save_history(args.history, history)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
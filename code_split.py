@@ -0,0 +1,762 @@
+#!/usr/bin/env python3
+"""
+Build stage that splits CookingGame.jsx into lazily loaded chunks.
+
+IngredientSVG's `switch (type)` is grouped by the pantry categories of
+INGREDIENT_CATEGORIES in gameData.js, and each category's cases move to
+chunks/ingredients/<category>.jsx. IngredientSVG keeps the cases that
+cannot move (the default shape, ingredients outside every category,
+cases that read names only the component has) and draws the others
+through IngredientChunk, which loads the category's chunk with dynamic
+import() and shows the default shape until it arrives. Opening a pantry
+drawer starts loading that category.
+
+CompletedDishVisual, SushiRollVisual and the restaurant and disaster
+overlays move to chunks/<Name>.jsx and are rendered through
+lazyComponent() from systems/lazyChunks.js; an overlay gets the state
+and handlers it reads as props. The imports a chunk needs are copied
+from CookingGame.jsx with their paths rewritten for the chunk.
+
+Moved code lives in the chunks from then on. Re-running, for example
+after enhance_game.py or add_ui_components.py added cases or blocks,
+moves only what is new and merges cases into the existing chunk files.
+Run it after sprite_atlas.py, which renders its tiles from the cases
+that are still inside IngredientSVG.
+
+    python code_split.py src/CookingGame.jsx --dry-run
+"""
+
+import argparse
+import os
+import re
+import sys
+import textwrap
+from collections import namedtuple
+
+from game_data import GameDataError, game_data_for, parse_exports
+from jsx_eval import GLOBALS, Parser, Unsupported, free_names, parse_statements, pattern_names
+from jsx_structure import ScanError, tokenize
+from patch_cache import PatchCache
+from patch_io import MappedSource, write_atomic, write_plan
+from patch_ledger import PatchLedger
+from patch_report import PatchProfile, diff_path, format_profile, plan_diff
+from splice import SplicePlan
+
+DEFAULT_SOURCE = 'C:/Dev/Kitchen_Explorer/src/CookingGame.jsx'
+
+COMPONENT = 'IngredientSVG'
+ROOT_COMPONENT = 'CookingGame'
+RENDER_FUNCTION = 'renderIngredient'
+LAZY_COMPONENTS = ('CompletedDishVisual', 'SushiRollVisual')
+
+# Comments that mark the overlay blocks of the root component's JSX
+BLOCK_MARKER_RE = re.compile(r'\{/\*\s*((?:Active Orders|Disaster Mini-Game Overlay)[^*]*?)\s*\*/\}')
+
+# Names a chunk can use without importing them
+JS_GLOBALS = set(GLOBALS) | {
+    'undefined', 'NaN', 'Infinity', 'Object', 'Array', 'String', 'Number', 'Boolean', 'JSON', 'Math',
+    'Date', 'Map', 'Set', 'Promise', 'Symbol', 'Error', 'parseInt', 'parseFloat', 'isNaN', 'isFinite',
+    'console', 'window', 'document', 'navigator', 'localStorage', 'setTimeout', 'clearTimeout',
+    'setInterval', 'clearInterval', 'requestAnimationFrame', 'cancelAnimationFrame', 'performance',
+}
+
+WS_RE = re.compile(r'\s*')
+IMPORT_RE = re.compile(r'^import\s+([^;]+?)\s+from\s+([\'"])(.+?)\2', re.M)
+
+INGREDIENT_CHUNK_TEMPLATE = '''// {category} drawings of {component}, moved out of {source} by code_split.py.
+// Edit them here; re-running the build stage merges new cases into this file.
+{imports}
+export const {function} = ({{ {context} }}) => {{
+  switch ({discriminant}) {{
+{cases}
+  }}
+  return null;
+}};
+'''
+
+COMPONENT_CHUNK_TEMPLATE = '''// {name}, moved out of {source} by code_split.py. Edit it here.
+{imports}
+{declaration}
+
+export default {name};
+'''
+
+BLOCK_CHUNK_TEMPLATE = '''// "{title}" block of {root}, moved out of {source} by code_split.py.
+// Edit it here.
+{imports}
+const {name} = ({{ {props} }}) => (
+{element}
+);
+
+export default {name};
+'''
+
+CHUNKS_TEMPLATE = '''// IngredientSVG drawings moved to per-category chunks by code_split.py
+const INGREDIENT_CHUNKS = {{
+{loaders}
+}};
+
+// Ingredient -> category chunk with its drawing
+const INGREDIENT_CHUNK_OF = Object.fromEntries(
+  Object.entries({{
+{items}
+  }}).flatMap(([category, items]) => items.map((item) => [item, category]))
+);
+
+const IngredientChunk = ({{ fallback, ...context }}) => {{
+  const chunk = useChunk(INGREDIENT_CHUNKS[INGREDIENT_CHUNK_OF[context.{discriminant}]]);
+  return chunk ? chunk.{function}(context) : fallback();
+}};
+
+'''
+
+DRAW_TEMPLATE = '''
+{indent}if (lazy && INGREDIENT_CHUNK_OF[{discriminant}]) {{
+{indent}  return (
+{indent}    <IngredientChunk
+{props}
+{indent}      fallback={{() => {function}(false)}}
+{indent}    />
+{indent}  );
+{indent}}}'''
+
+PREFETCH_TEMPLATE = '''
+
+  // Start loading a category's drawings as soon as its pantry drawer opens
+  useEffect(() => {{
+    INGREDIENT_CHUNKS[{state}]?.().catch(() => {{}});
+  }}, [{state}]);'''
+
+ImportBinding = namedtuple('ImportBinding', ['module', 'imported'])  # imported: 'default', '*' or a name
+CaseGroup = namedtuple('CaseGroup', ['labels', 'start', 'body_start', 'end'])  # labels: None for default
+
+
+class SplitError(ValueError):
+    pass
+
+
+def _tokens(text):
+    return [t for t in tokenize(text) if t.kind not in ('ws', 'comment')]
+
+
+def _closing(tokens, i):
+    # Index of the bracket that closes tokens[i]
+    depth = tokens[i].depth
+    for j in range(i + 1, len(tokens)):
+        if tokens[j].depth == depth and tokens[j].kind == 'punct' and tokens[j].value in ')]}':
+            return j
+    raise SplitError(f'unbalanced {tokens[i].value!r}')
+
+
+def _line_span(text, start, end):
+    # Widen a removal to whole lines when nothing else shares them
+    line_start = text.rfind('\n', 0, start) + 1
+    line_end = text.find('\n', end)
+    line_end = len(text) if line_end == -1 else line_end
+    if not text[line_start:start].strip() and not text[end:line_end].strip():
+        return line_start, min(line_end + 1, len(text))
+    return start, end
+
+
+def _through_blank_lines(text, end):
+    # Extend a removal that ends at a line start over the blank lines after it
+    while 0 < end < len(text) and text[end - 1] == '\n':
+        line_end = text.find('\n', end)
+        if line_end == -1 or text[end:line_end].strip():
+            break
+        end = line_end + 1
+    return end
+
+
+def _indent_of(text, offset):
+    line_start = text.rfind('\n', 0, offset) + 1
+    line = text[line_start:offset]
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _column(text, offset):
+    return offset - (text.rfind('\n', 0, offset) + 1)
+
+
+def _dedent(fragment, column):
+    # A fragment whose first line started at `column`, shifted to column 0
+    return textwrap.dedent(' ' * column + fragment)
+
+
+def _leading_comments_start(text, offset):
+    # Start of the comment lines directly above the line at `offset`
+    start = text.rfind('\n', 0, offset) + 1
+    while start > 0:
+        previous = text.rfind('\n', 0, start - 1) + 1
+        if not text[previous:start].strip().startswith('//'):
+            break
+        start = previous
+    return start
+
+
+def _relative_import(from_file, to_file):
+    relative = os.path.relpath(to_file, os.path.dirname(os.path.abspath(from_file))).replace(os.sep, '/')
+    return relative if relative.startswith('.') else './' + relative
+
+
+def parse_imports(text):
+    # {local name: ImportBinding} for the import declarations of a module
+    bindings = {}
+    for match in IMPORT_RE.finditer(text):
+        clause, module = match.group(1), match.group(3)
+        named = re.search(r'\{(.*)\}', clause, re.S)
+        if named:
+            for part in named.group(1).split(','):
+                names = part.split()
+                if names:
+                    bindings[names[-1]] = ImportBinding(module, names[0])
+            clause = clause[:named.start()] + clause[named.end():]
+        for part in clause.split(','):
+            names = part.split()
+            if len(names) == 3 and names[0] == '*':
+                bindings[names[2]] = ImportBinding(module, '*')
+            elif len(names) == 1:
+                bindings[names[0]] = ImportBinding(module, 'default')
+    return bindings
+
+
+def _module_for(module, from_file, to_file):
+    # `module` as imported by from_file, as it has to be written in to_file
+    if not module.startswith('.'):
+        return module
+    target = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(from_file)), module))
+    return _relative_import(to_file, target)
+
+
+def render_imports(bindings):
+    # Import lines for {local name: ImportBinding}, one per module in first-seen order
+    modules = {}
+    for name, binding in bindings.items():
+        modules.setdefault(binding.module, []).append((name, binding.imported))
+    lines = []
+    for module, names in modules.items():
+        default = [name for name, imported in names if imported == 'default']
+        named = [name if imported == name else f'{imported} as {name}'
+                 for name, imported in names if imported not in ('default', '*')]
+        for name, imported in names:
+            if imported == '*':
+                lines.append(f"import * as {name} from '{module}';")
+        clause = ', '.join(default[:1] + ([f"{{ {', '.join(named)} }}"] if named else []))
+        if clause:
+            lines.append(f"import {clause} from '{module}';")
+    return ''.join(line + '\n' for line in lines)
+
+
+def _chunk_imports(names, imports, source_file, chunk_file, existing=None):
+    # Bindings a chunk needs for `names`, added to the ones it already imports
+    bindings = dict(existing or {})
+    for name in sorted(names):
+        if name in imports and name not in bindings:
+            binding = imports[name]
+            bindings[name] = ImportBinding(_module_for(binding.module, source_file, chunk_file), binding.imported)
+    if 'React' in imports and 'React' not in bindings:
+        bindings = dict(React=ImportBinding(imports['React'].module, imports['React'].imported), **bindings)
+    return bindings
+
+
+def _is_terminal(statement):
+    # Whether control never falls out of the end of `statement`
+    kind = statement[0]
+    if kind in ('return', 'break', 'throw'):
+        return True
+    if kind == 'block':
+        return bool(statement[1]) and _is_terminal(statement[1][-1])
+    if kind == 'if':
+        return statement[3] is not None and _is_terminal(statement[2]) and _is_terminal(statement[3])
+    return False
+
+
+class RenderSwitch:
+    """The `switch` a render function is made of, as groups of cases."""
+
+    def __init__(self, text, function_name=RENDER_FUNCTION):
+        self.text = text
+        tokens = _tokens(text)
+        for i in range(1, len(tokens) - 1):
+            if (tokens[i].value == function_name and tokens[i - 1].value in ('const', 'let')
+                    and tokens[i + 1].value == '='):
+                break
+        else:
+            raise SplitError(f'no {function_name} function')
+        # (start, end) of an empty parameter list, which gets the `lazy` flag
+        self.empty_params = None
+        if tokens[i + 2].value == '(' and tokens[i + 3].value == ')':
+            self.empty_params = (tokens[i + 2].start, tokens[i + 3].end)
+        arrow = next((j for j in range(i, len(tokens)) if tokens[j].value == '=>'), None)
+        if arrow is None or tokens[arrow + 1].value != '{':
+            raise SplitError(f'{function_name} has no function body')
+        body_close = _closing(tokens, arrow + 1)
+        self.body_open = tokens[arrow + 1].end
+        depth = tokens[arrow + 1].depth + 1
+        for s in range(arrow + 2, body_close):
+            if tokens[s].depth == depth and tokens[s].value == 'switch':
+                break
+        else:
+            raise SplitError(f'{function_name} has no switch')
+        discriminant_close = _closing(tokens, s + 1)
+        self.discriminant = text[tokens[s + 1].end:tokens[discriminant_close].start].strip()
+        switch_open = discriminant_close + 1
+        switch_close = _closing(tokens, switch_open)
+        self.after = text[tokens[switch_close].end:tokens[body_close].start].strip()
+
+        labels = [j for j in range(switch_open + 1, switch_close)
+                  if tokens[j].depth == depth + 1 and tokens[j].kind == 'ident'
+                  and tokens[j].value in ('case', 'default')]
+        self.groups = []
+        group_start = None
+        group_labels = []
+        for n, j in enumerate(labels):
+            colon = j + 1 if tokens[j].value == 'default' else j + 2
+            if tokens[j].value == 'default':
+                label = None
+            elif tokens[j + 1].kind == 'string' and tokens[colon].value == ':':
+                label = tokens[j + 1].value[1:-1]
+            else:
+                label = '?'
+            if group_start is None:
+                group_start = tokens[j].start
+            group_labels.append(label)
+            next_label = labels[n + 1] if n + 1 < len(labels) else switch_close
+            if next_label == colon + 1:
+                continue  # falls through to the next label with no code in between
+            self.groups.append(CaseGroup(tuple(group_labels), group_start, tokens[colon].end,
+                                         tokens[next_label - 1].end))
+            group_start = None
+            group_labels = []
+
+    def group_text(self, group):
+        start, end = _line_span(self.text, group.start, group.end)
+        return _dedent(self.text[start:end].rstrip('\n'), _column(self.text, start))
+
+    def chains(self):
+        # Groups joined with the ones they fall through to: [(groups, statements, error)]
+        chains = []
+        groups, statements, error = [], [], None
+        for group in self.groups:
+            groups.append(group)
+            try:
+                body = parse_statements(self.text[group.body_start:group.end],
+                                        self.text.count('\n', 0, group.body_start) + 1)
+                statements.extend(body)
+                terminal = bool(body) and _is_terminal(body[-1])
+            except Unsupported as e:
+                error = error or e
+                terminal = False
+            if terminal:
+                chains.append((groups, statements, error))
+                groups, statements, error = [], [], None
+        if groups:
+            chains.append((groups, statements, error))
+        return chains
+
+
+def _ingredient_groups(text):
+    # {labels: dedented case text} of an existing ingredient chunk
+    switch = RenderSwitch(text)
+    return {group.labels: switch.group_text(group) for group in switch.groups}
+
+
+def _component_context(declaration_text, function_name):
+    # Parameter names of a component plus what its body declares before `function_name`
+    statements = parse_statements(declaration_text)
+    arrow = statements[0][1][0][1] if statements[0][0] == 'declare' else None
+    if not arrow or arrow[0] != 'arrow' or arrow[2][0] != 'block':
+        raise SplitError('is not an arrow function component')
+    names = [name for target, _ in arrow[1] for name in pattern_names(target)]
+    for statement in arrow[2][1]:
+        if statement[0] != 'declare':
+            continue
+        declared = [name for target, _ in statement[1] for name in pattern_names(target)]
+        if function_name in declared:
+            break
+        names.extend(declared)
+    return names
+
+
+def _pascal(title):
+    return ''.join(word[:1].upper() + word[1:] for word in re.findall(r'[A-Za-z0-9]+', title))
+
+
+class SplitBuild:
+    """Plans what moves out of the source file and the chunk files it goes to."""
+
+    def __init__(self, source_file, content, structure, categories):
+        self.source_file = source_file
+        self.content = content
+        self.structure = structure
+        self.categories = categories
+        self.chunk_dir = os.path.join(os.path.dirname(os.path.abspath(source_file)), 'chunks')
+        # A module-level declaration shadows an import of the same name
+        self.imports = {name: binding for name, binding in parse_imports(content).items()
+                        if name not in structure.by_name or structure.by_name[name].kind == 'import'}
+        self.known = set(self.imports) | JS_GLOBALS
+        self.removals = []  # (start, end, replacement)
+        self.chunks = {}  # path -> text
+        self.kept = {}  # what stays in the source file -> reason
+        self.moved = {}  # chunk name -> what moved
+        self.ingredient_chunks = {}  # category -> ingredient keys in its chunk
+        self.lazy_components = []
+        self.switch = None
+        self.context = []
+
+    def chunk_path(self, name):
+        return os.path.join(self.chunk_dir, name + '.jsx')
+
+    def ingredient_chunk_path(self, category):
+        return os.path.join(self.chunk_dir, 'ingredients', category + '.jsx')
+
+    def _read(self, path):
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def split_ingredients(self):
+        declaration = self.structure.declaration(COMPONENT)
+        text = self.content[declaration.start:declaration.end]
+        try:
+            self.switch = switch = RenderSwitch(text)
+            self.context = _component_context(text, RENDER_FUNCTION)
+        except (SplitError, Unsupported) as e:
+            self.kept[COMPONENT] = str(e)
+            return
+        if switch.after:
+            # A `break` would run the code after the switch, which the chunks do not have
+            self.kept[COMPONENT] = f'{RENDER_FUNCTION} has code after its switch'
+            return
+        if switch.discriminant not in self.context:
+            self.kept[COMPONENT] = f'switches on {switch.discriminant}, not on a prop'
+            return
+        category_of = {item: category for category, record in self.categories.items()
+                       for item in record.get('items', [])}
+
+        moved = {}
+        for groups, statements, error in switch.chains():
+            labels = [label for group in groups for label in group.labels]
+            title = '/'.join(label or 'default' for label in labels)
+            if error is not None:
+                self.kept[title] = str(error)
+                continue
+            categories = {category_of.get(label) for label in labels}
+            if None in categories or len(categories) > 1:
+                self.kept[title] = 'default case' if None in labels else 'not in exactly one pantry category'
+                continue
+            start, end = groups[0].start, groups[-1].end
+            missing = free_names(statements, set(self.context) | self.known)
+            if missing:
+                self.kept[title] = f"reads {', '.join(sorted(missing))}"
+                continue
+            category = categories.pop()
+            moved.setdefault(category, []).append((groups, statements))
+            start, end = _line_span(self.content, declaration.start + start, declaration.start + end)
+            self.removals.append((start, _through_blank_lines(self.content, end), ''))
+
+        for category, record in self.categories.items():
+            path = self.ingredient_chunk_path(category)
+            existing_text = self._read(path)
+            if existing_text is None and category not in moved:
+                continue
+            cases = {}
+            existing_imports = {}
+            if existing_text is not None:
+                try:
+                    cases = _ingredient_groups(existing_text)
+                except SplitError as e:
+                    raise SplitError(f'{path}: {e}') from None
+                existing_imports = parse_imports(existing_text)
+            needed = set()
+            for groups, statements in moved.get(category, []):
+                labels = tuple(label for group in groups for label in group.labels)
+                case_text = '\n'.join(switch.group_text(group) for group in groups)
+                # The source file's version of a case replaces the chunk's, in place
+                merged = {}
+                for old_labels, old_text in cases.items():
+                    if not set(old_labels) & set(labels):
+                        merged[old_labels] = old_text
+                    elif labels not in merged:
+                        merged[labels] = case_text
+                merged.setdefault(labels, case_text)
+                cases = merged
+                needed |= free_names(statements, self.context)
+            self.ingredient_chunks[category] = [label for labels in cases for label in labels]
+            if category not in moved:
+                continue
+            self.moved[f'ingredients/{category}'] = sorted(
+                label for groups, _ in moved[category] for group in groups for label in group.labels)
+            imports = _chunk_imports(needed, self.imports, self.source_file, path, existing_imports)
+            self.chunks[path] = INGREDIENT_CHUNK_TEMPLATE.format(
+                category=record.get('name', category), component=COMPONENT,
+                source=os.path.basename(self.source_file), imports=render_imports(imports),
+                function=RENDER_FUNCTION, context=', '.join(self.context), discriminant=switch.discriminant,
+                cases=textwrap.indent('\n\n'.join(cases.values()), ' ' * 4))
+
+    def split_components(self):
+        for name in LAZY_COMPONENTS:
+            if name not in self.structure.by_name:
+                continue
+            declaration = self.structure.declaration(name)
+            text = self.content[declaration.start:declaration.end]
+            if 'lazyComponent(' in text:
+                self.lazy_components.append(name)
+                continue
+            try:
+                names = free_names(parse_statements(text))
+            except Unsupported as e:
+                self.kept[name] = str(e)
+                continue
+            missing = names - self.known - {name}
+            if missing:
+                self.kept[name] = f"reads {', '.join(sorted(missing))}"
+                continue
+            path = self.chunk_path(name)
+            imports = _chunk_imports(names, self.imports, self.source_file, path)
+            self.chunks[path] = COMPONENT_CHUNK_TEMPLATE.format(
+                name=name, source=os.path.basename(self.source_file), imports=render_imports(imports),
+                declaration=text.replace('export ', '', 1) if declaration.exported else text)
+            stub = f"const {name} = lazyComponent(() => import('{_relative_import(self.source_file, path)}'));"
+            self.removals.append((declaration.start, declaration.end, stub))
+            self.lazy_components.append(name)
+            self.moved[name] = [name]
+
+    def split_blocks(self):
+        root = self.structure.declaration(ROOT_COMPONENT)
+        text = self.content[root.start:root.end]
+        tokens = _tokens(text)
+        by_start = {token.start: i for i, token in enumerate(tokens)}
+        taken = set(self.structure.by_name)
+        blocks = []
+        for match in BLOCK_MARKER_RE.finditer(text):
+            title = match.group(1)
+            i = by_start.get(WS_RE.match(text, match.end()).end())
+            if i is not None and tokens[i].value == '<' and tokens[i + 1].value == 'RenderProbe':
+                # Instrumented by add_ui_components.py: the probe stays, its child moves
+                i = next(j for j in range(i, len(tokens)) if tokens[j].kind == 'jsx_tag' and tokens[j].value != '<') + 1
+                while tokens[i].kind == 'jsx_text' and not tokens[i].value.strip():
+                    i += 1
+            if i is None or tokens[i].value != '{':
+                continue
+            close = _closing(tokens, i)
+            depth = tokens[i].depth + 1
+            ands = [j for j in range(i + 1, close) if tokens[j].depth == depth and tokens[j].value == '&&']
+            if not ands:
+                self.kept[title] = 'is not a `condition && <element>` block'
+                continue
+            first, last = ands[-1] + 1, close - 1
+            if tokens[first].value == '(' and _closing(tokens, first) == last:
+                first, last = first + 1, last - 1
+            if tokens[first].kind != 'jsx_tag':
+                self.kept[title] = 'is not a `condition && <element>` block'
+                continue
+            element = text[tokens[first].start:tokens[last].end]
+            try:
+                parser = Parser(element, _tokens(element), self.structure.line_of(root.start + tokens[first].start))
+                node = parser.jsx()
+                if parser.i != len(parser.tokens):
+                    raise parser.error('more than one element')
+                names = free_names([('expression', node)])
+            except Unsupported as e:
+                self.kept[title] = str(e)
+                continue
+            if node[1] and node[1][0].isupper() and not node[3]:
+                self.lazy_components.append(node[1])  # split on an earlier run
+                continue
+            name = base = _pascal(title.split(' - ')[0])
+            count = 1
+            while name in taken:
+                count += 1
+                name = f'{base}{count}'
+            taken.add(name)
+            props = sorted(names - self.known)
+            path = self.chunk_path(name)
+            imports = _chunk_imports(names & set(self.imports), self.imports, self.source_file, path)
+            body = _dedent(element, _column(text, tokens[first].start))
+            self.chunks[path] = BLOCK_CHUNK_TEMPLATE.format(
+                title=title, root=ROOT_COMPONENT, source=os.path.basename(self.source_file), name=name,
+                imports=render_imports(imports), props=', '.join(props),
+                element=textwrap.indent(body, '  '))
+            indent = ' ' * _column(text, tokens[i].start)
+            condition = text[tokens[i].end:tokens[ands[-1]].end].strip()
+            replacement = f'{{{condition} <{name} />}}'
+            if props:
+                attrs = ''.join(f'\n{indent}    {prop}={{{prop}}}' for prop in props)
+                replacement = f'{{{condition} (\n{indent}  <{name}{attrs}\n{indent}  />\n{indent})}}'
+            self.removals.append((root.start + tokens[i].start, root.start + tokens[close].end, replacement))
+            blocks.append(name)
+            self.moved[name] = [title]
+        return blocks
+
+    def plan(self, plan):
+        for start, end, replacement in self.removals:
+            plan.replace(start, end, replacement)
+
+
+def split_chunks(source_file=DEFAULT_SOURCE, game_data_file=None, dry_run=False, cache=None, profile=None):
+    cache = cache or PatchCache()
+    profile = profile or PatchProfile()
+    game_data_file = game_data_file or game_data_for(source_file)
+
+    with profile.stage('read'):
+        source = MappedSource(source_file)
+        with open(game_data_file, 'r', encoding='utf-8') as f:
+            categories = parse_exports(f.read(), ('INGREDIENT_CATEGORIES',))['INGREDIENT_CATEGORIES']
+    content = source.text
+
+    plan = SplicePlan(content)
+    ledger = PatchLedger(source_file, content, source.digest)
+    with profile.locate('(structure map)'):
+        structure = cache.structure(content, source.digest)
+    if ROOT_COMPONENT not in structure.by_name:
+        source.close()
+        reason = f"Could not find {ROOT_COMPONENT}"
+        print(reason)
+        return {'skipped': reason}
+
+    build = SplitBuild(source_file, content, structure, categories)
+    if COMPONENT in structure.by_name:
+        with profile.locate('ingredient_cases'):
+            build.split_ingredients()
+    with profile.locate('lazy_components'):
+        build.split_components()
+    with profile.locate('lazy_blocks'):
+        blocks = build.split_blocks()
+    with profile.apply('moved_code', plan):
+        build.plan(plan)
+
+    # Module-level declarations go above the leading comments of what uses them
+    imports = [d for d in structure.declarations if d.kind == 'import']
+    import_pos = content.find('\n', imports[-1].end) + 1 if imports else 0
+    root = structure.declaration(ROOT_COMPONENT)
+    root_pos = _leading_comments_start(content, root.start)
+    used = set()
+    if build.ingredient_chunks:
+        used |= {'chunkLoader', 'useChunk'}
+    if build.lazy_components or blocks:
+        used.add('lazyComponent')
+    if used:
+        relative = _relative_import(source_file, os.path.join(os.path.dirname(os.path.abspath(source_file)),
+                                                              'systems', 'lazyChunks'))
+        names = [name for name in ('chunkLoader', 'lazyComponent', 'useChunk') if name in used]
+        with profile.apply('chunk_import', plan):
+            ledger.plan_insert(plan, 'chunk_import', f"import {{ {', '.join(names)} }} from '{relative}';\n",
+                               import_pos)
+
+    if build.ingredient_chunks:
+        with profile.locate('ingredient_chunks'):
+            component = structure.declaration(COMPONENT)
+            component_pos = _leading_comments_start(content, component.start)
+            switch = build.switch
+            loaders = ''.join(
+                f"  {category}: chunkLoader(() => import('"
+                f"{_relative_import(source_file, build.ingredient_chunk_path(category))}')),\n"
+                for category in build.ingredient_chunks)
+            items = ''.join(
+                '\n'.join(textwrap.wrap(f"{category}: [{', '.join(repr(item) for item in keys)}],", 100,
+                                        initial_indent=' ' * 4, subsequent_indent=' ' * 6,
+                                        break_on_hyphens=False)) + '\n'
+                for category, keys in build.ingredient_chunks.items())
+            body_indent = _indent_of(content, component.start + switch.body_open) + '  '
+            draw_pos = component.start + switch.body_open
+        with profile.apply('ingredient_chunks', plan):
+            ledger.plan_insert(plan, 'ingredient_chunks', CHUNKS_TEMPLATE.format(
+                loaders=loaders.rstrip('\n'), items=items.rstrip('\n'), discriminant=switch.discriminant,
+                function=RENDER_FUNCTION), component_pos)
+        with profile.apply('ingredient_chunk_draw', plan):
+            props = '\n'.join(f'{body_indent}      {name}={{{name}}}' for name in build.context)
+            draw = DRAW_TEMPLATE.format(indent=body_indent, discriminant=switch.discriminant, props=props,
+                                        function=RENDER_FUNCTION)
+            ledger.plan_insert(plan, 'ingredient_chunk_draw', draw, draw_pos)
+            if switch.empty_params:
+                start, end = switch.empty_params
+                plan.replace(component.start + start, component.start + end, '(lazy = true)')
+
+        # Opening a pantry drawer loads its category
+        try:
+            hook = structure.hook(ROOT_COMPONENT, '[expandedCategory, setExpandedCategory]')
+        except ScanError:
+            hook = None
+        if hook and 'useEffect' in build.imports:
+            with profile.apply('ingredient_chunk_prefetch', plan):
+                ledger.plan_insert(plan, 'ingredient_chunk_prefetch',
+                                   PREFETCH_TEMPLATE.format(state='expandedCategory'), hook.end)
+
+    for name in blocks:
+        with profile.apply(f'chunk_{name}', plan):
+            declaration = f"const {name} = lazyComponent(() => import('" \
+                          f"{_relative_import(source_file, build.chunk_path(name))}'));\n\n"
+            ledger.plan_insert(plan, f'chunk_{name}', declaration, root_pos)
+
+    diff = None
+    writes = {path: text for path, text in build.chunks.items() if build._read(path) != text}
+    if dry_run:
+        diff = plan_diff(plan, source_file)
+        for path, text in writes.items():
+            old_text = build._read(path)
+            chunk_plan = SplicePlan(old_text or '')
+            chunk_plan.replace(0, len(chunk_plan.text), text)
+            diff += plan_diff(chunk_plan, diff_path(path, source_file), new=old_text is None)
+        source.close()
+    else:
+        # Chunks go first: a patched component must never import a missing file
+        with profile.stage('write'):
+            for path, text in writes.items():
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                write_atomic(path, [text.encode('utf-8')])
+            digest = source.digest
+            if plan:
+                digest = write_plan(source, plan)
+        source.close()
+        if plan or not ledger.trusted:
+            ledger.save(digest)
+
+    return {
+        'moved': build.moved,
+        'kept': build.kept,
+        'chunk_bytes': {path: len(text.encode('utf-8')) for path, text in build.chunks.items()},
+        'bytes_removed': -plan.size_delta(),
+        'written': sorted(writes),
+        'units': ledger.status,
+        'profile': profile.units,
+        'diff': diff
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Split CookingGame.jsx into lazily loaded chunks')
+    parser.add_argument('source_file', nargs='?', default=DEFAULT_SOURCE)
+    parser.add_argument('--data', dest='game_data_file', help='path to gameData.js')
+    parser.add_argument('--dry-run', action='store_true', help='print a unified diff and patch timings, write nothing')
+    args = parser.parse_args(argv)
+
+    try:
+        stats = split_chunks(args.source_file, args.game_data_file, dry_run=args.dry_run)
+    except (SplitError, GameDataError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 1
+    if 'skipped' in stats:
+        return 1
+    if args.dry_run:
+        print(stats['diff'], end='')
+        print(format_profile(stats['profile']))
+        return 0
+
+    print("Code Split!")
+    for chunk, moved in sorted(stats['moved'].items()):
+        print(f"  chunks/{chunk}: {len(moved)} moved")
+    print(f"Bytes moved out of {os.path.basename(args.source_file)}: {stats['bytes_removed']:,}")
+    for path, size in sorted(stats['chunk_bytes'].items()):
+        print(f"  {os.path.relpath(path, os.path.dirname(os.path.abspath(args.source_file)))}: {size:,} bytes")
+    for what, reason in sorted(stats['kept'].items()):
+        print(f"  kept {what}: {reason}")
+    for name, status in stats['units'].items():
+        print(f"  {name}: {status}")
+    print(f"\nChunks written: {len(stats['written'])}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+Reachability and dead-asset analyzer for IngredientSVG and gameData.js.
+
+Builds a cross-reference graph of the ingredient keys and states in
+gameData.js, the `case` branches of IngredientSVG (including the ones
+code_split.py moved to chunks/ingredients/), the unlock lists of the
+CHEF_LEVELS that enhance_game.py adds, and the SVG definitions of the
+component and its sprite. It reports:
+
+  dead-case        a `case` label that is not an INGREDIENTS key; the
+                   component returns before its switch for those
+  dead-state       an `if (state === ...)` branch, or a `{state === ... && ...}`
+                   child, for states the ingredient never has: not in its
+                   `states`, not required by a recipe and never set by the game
+  unused-def       a gradient, filter, pattern, clip path, mask or sprite
+                   symbol whose id nothing references
+  unused-const     a module-level declaration of the component file that
+                   nothing reads
+  missing-key      RECIPES, STARTER_INGREDIENTS, INGREDIENT_UNLOCKS,
+                   INGREDIENT_CATEGORIES or CHEF_LEVELS naming an ingredient
+                   INGREDIENTS does not have
+  missing-state    a recipe requiring a state its ingredient does not list
+  unlock-conflict  CHEF_LEVELS unlocking an ingredient at another level than
+                   gameData.js does (or one that is a starter ingredient)
+  locked-case      a branch for ingredients nothing ever unlocks
+
+Sizes are the UTF-8 bytes of the code a finding covers. References from
+code that is itself dead do not count, so an asset only a dead branch uses
+is dead as well. With --prune the dead-case, dead-state, unused-def and
+(side-effect free) unused-const findings are removed, one pass per file;
+the others only point at data to fix by hand.
+
+    python dead_assets.py src/CookingGame.jsx
+    python dead_assets.py src/CookingGame.jsx --prune --dry-run
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+from code_split import RenderSwitch, SplitError
+from game_data import GameDataError, game_data_for, parse_exports
+from jsx_eval import Unsupported, parse_statements
+from jsx_structure import tokenize
+from patch_cache import PatchCache
+from patch_io import MappedSource, write_plan
+from patch_ledger import REMOVED
+from patch_report import PatchProfile, plan_diff
+from splice import SplicePlan
+from svg_sprite import DEF_TAGS, ID_RE, REF_RE, sprite_path_for
+
+DEFAULT_SOURCE = 'C:/Dev/Kitchen_Explorer/src/CookingGame.jsx'
+
+COMPONENT = 'IngredientSVG'
+
+# enhance_game.py holds the CHEF_LEVELS it adds; checked even before it has run
+ENHANCE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enhance_game.py')
+
+GAME_DATA_EXPORTS = ('INGREDIENTS', 'RECIPES', 'STARTER_INGREDIENTS', 'INGREDIENT_UNLOCKS', 'INGREDIENT_CATEGORIES')
+
+PRUNABLE = ('dead-case', 'dead-state', 'unused-def', 'unused-const')
+
+CHEF_LEVELS_RE = re.compile(r'^const CHEF_LEVELS = \[.*?^\];', re.M | re.S)
+LABEL_RE = re.compile(r'''\bcase\s*(['"])(.*?)\1\s*:''')
+# Items the game creates or changes outside of an ingredient's `states`
+STATE_SET_RE = re.compile(r'''\bstate:\s*(['"])(\w+)\1''')
+TYPE_SET_RE = re.compile(r'''\btype:\s*(['"])(\w+)\1''')
+# Code inside a case that binds its own `state`
+STATE_SHADOW_RE = re.compile(r'\b(?:const|let|var)\s+state\b|\bstate\s*=>|\(\s*state\s*\)\s*=>')
+DYNAMIC_REF_RE = re.compile(r'(?:url\(#|[hH]ref=\{`#)([\w:.-]*)\$\{')
+NAME_RE = re.compile(r'^[\w$]+$')
+
+Finding = namedtuple('Finding', [
+    'kind',
+    'path',
+    'line',
+    'subject',   # ingredient key, `key/state`, definition id or constant name
+    'bytes',     # size of the code the finding covers, 0 for data references
+    'prunable',
+    'reason',
+])
+
+
+def _tokens(text):
+    return [t for t in tokenize(text) if t.kind not in ('ws', 'comment')]
+
+
+def _closing(tokens, i):
+    # Index of the bracket that closes tokens[i]
+    depth = tokens[i].depth
+    for j in range(i + 1, len(tokens)):
+        if tokens[j].depth == depth and tokens[j].kind == 'punct' and tokens[j].value in ')]}':
+            return j
+    raise SplitError(f'unbalanced {tokens[i].value!r}')
+
+
+def _element_end(tokens, i):
+    # Index of the token closing the JSX element opened at tokens[i]
+    nesting = 0
+    for j in range(i, len(tokens)):
+        token = tokens[j]
+        if token.kind != 'jsx_tag':
+            continue
+        if token.value in ('<', '<>'):
+            nesting += 1
+        elif token.value == '/>' or token.value.startswith('</'):
+            nesting -= 1
+            if nesting == 0:
+                return j
+    raise SplitError(f'unclosed JSX element at offset {tokens[i].start}')
+
+
+def _line_span(text, start, end):
+    # Widen a removal to whole lines when nothing else shares them
+    line_start = text.rfind('\n', 0, start) + 1
+    line_end = text.find('\n', end)
+    line_end = len(text) if line_end == -1 else line_end
+    if not text[line_start:start].strip() and not text[end:line_end].strip():
+        return line_start, min(line_end + 1, len(text))
+    return start, end
+
+
+def _through_blank_lines(text, end):
+    # Extend a removal that ends at a line start over the blank lines after it
+    while 0 < end < len(text) and text[end - 1] == '\n':
+        line_end = text.find('\n', end)
+        if line_end == -1 or text[end:line_end].strip():
+            break
+        end = line_end + 1
+    return end
+
+
+def _leading_comments_start(text, offset):
+    # Start of the comment lines directly above the line at `offset`
+    start = text.rfind('\n', 0, offset) + 1
+    while start > 0:
+        previous = text.rfind('\n', 0, start - 1) + 1
+        if not text[previous:start].strip().startswith('//'):
+            break
+        start = previous
+    return start
+
+
+def _line_of(text, offset):
+    return text.count('\n', 0, offset) + 1
+
+
+def _inside(ranges, start, end):
+    return any(s <= start and end <= e for s, e in ranges)
+
+
+def never_true(node, states):
+    # Whether test `node` is false whenever `state` is one of `states`
+    if node[0] == 'binary' and node[1] == '&&':
+        return never_true(node[2], states) or never_true(node[3], states)
+    if node[0] == 'binary' and node[1] == '||':
+        return never_true(node[2], states) and never_true(node[3], states)
+    if node[0] == 'binary' and node[1] in ('===', '=='):
+        sides = {node[2][0]: node[2], node[3][0]: node[3]}
+        if set(sides) == {'name', 'literal'} and sides['name'][1] == 'state':
+            return sides['literal'][1] not in states
+    return False
+
+
+def has_effects(node):
+    # Whether evaluating `node` can call, construct or assign; function bodies don't run
+    if isinstance(node, list):
+        return any(has_effects(item) for item in node)
+    if not isinstance(node, tuple) or not node:
+        return False
+    if node[0] == 'arrow':
+        return False
+    if node[0] in ('call', 'new', 'assign', 'update') or node[:2] == ('unary', 'await'):
+        return True
+    return any(has_effects(part) for part in node[1:])
+
+
+def _test_node(text):
+    try:
+        statements = parse_statements(f'({text});')
+    except Unsupported:
+        return None
+    return statements[0][1] if len(statements) == 1 and statements[0][0] == 'expression' else None
+
+
+class AssetGraph:
+    """Cross-references between gameData.js, IngredientSVG and the files split from it."""
+
+    def __init__(self, source_file, game_data_file=None, cache=None):
+        self.source_file = source_file
+        self.game_data_file = game_data_file or game_data_for(source_file)
+        self.cache = cache or PatchCache()
+        self.sources = {}   # path -> MappedSource
+        self.findings = []
+        self.removals = {}  # path -> [(start, end)] planned by --prune
+        self.dead = {}      # path -> [(start, end)] of unreachable code
+
+        with open(self.game_data_file, 'r', encoding='utf-8') as f:
+            self.data_text = f.read()
+        values = parse_exports(self.data_text, GAME_DATA_EXPORTS)
+        self.ingredients = values['INGREDIENTS']
+        self.recipes = values['RECIPES']
+        self.starters = values['STARTER_INGREDIENTS']
+        self.unlocks = {int(level): keys for level, keys in values['INGREDIENT_UNLOCKS'].items()}
+        self.categories = values['INGREDIENT_CATEGORIES']
+
+        self.text = self._read(source_file)
+        self.chunk_files = sorted(glob.glob(os.path.join(
+            os.path.dirname(os.path.abspath(source_file)), 'chunks', 'ingredients', '*.jsx')))
+        self.sprite_file = sprite_path_for(source_file)
+        for path in self.chunk_files + [self.sprite_file]:
+            if os.path.exists(path):
+                self._read(path)
+
+    def _read(self, path):
+        self.sources[path] = MappedSource(path)
+        return self.sources[path].text
+
+    def close(self):
+        for source in self.sources.values():
+            source.close()
+
+    def _add(self, kind, path, offset, subject, reason, span=None, prunable=False):
+        text = self.sources[path].text if path in self.sources else self.data_text
+        size = self.sources[path].byte_length(*span) if span else 0
+        self.findings.append(Finding(kind, path, _line_of(text, offset), subject, size, prunable, reason))
+        if span and prunable:
+            # Code that is going away; what it references does not count as used
+            self.dead.setdefault(path, []).append(span)
+            self.removals.setdefault(path, []).append(span)
+
+    def _data_offset(self, export, *keys):
+        # Offset of the first of `keys` (searched in turn) inside export `export`
+        offset = self.data_text.find(f'const {export} ')
+        for key in keys:
+            match = re.compile(rf'''(['"]?)\b{re.escape(str(key))}\b\1''').search(self.data_text, offset)
+            offset = match.start() if match else offset
+        return max(offset, 0)
+
+    def chef_levels(self):
+        # (path, text, offset, levels, live) of the CHEF_LEVELS the game uses, else of the one
+        # enhance_game.py adds; only `live` unlock lists make ingredients reachable
+        for path, text, live in ((self.source_file, self.text, True), (ENHANCE_SCRIPT, None, False)):
+            if text is None:
+                if not os.path.exists(path):
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            match = CHEF_LEVELS_RE.search(text)
+            if match:
+                levels = parse_exports(match.group(), ('CHEF_LEVELS',))['CHEF_LEVELS']
+                return path, text, match.start(), levels, live
+        return None
+
+    def check_data(self):
+        ingredients = self.ingredients
+        self.unlocked = {key: 1 for key in self.starters}
+        for level, keys in sorted(self.unlocks.items()):
+            for key in keys:
+                self.unlocked.setdefault(key, level)
+
+        data = self.game_data_file
+        for key in self.starters:
+            if key not in ingredients:
+                self._add('missing-key', data, self._data_offset('STARTER_INGREDIENTS', key), key,
+                          'STARTER_INGREDIENTS names an unknown ingredient')
+        for level, keys in self.unlocks.items():
+            for key in keys:
+                if key not in ingredients:
+                    self._add('missing-key', data, self._data_offset('INGREDIENT_UNLOCKS', key), key,
+                              f'INGREDIENT_UNLOCKS[{level}] names an unknown ingredient')
+        for category, fields in self.categories.items():
+            for key in fields.get('items', ()):
+                if key not in ingredients:
+                    self._add('missing-key', data, self._data_offset('INGREDIENT_CATEGORIES', category, key), key,
+                              f'INGREDIENT_CATEGORIES.{category} names an unknown ingredient')
+
+        # States the game can put each ingredient in
+        assigned = {m.group(2) for m in STATE_SET_RE.finditer(self.text)}
+        self.states = {key: set(fields.get('states', ())) | assigned for key, fields in ingredients.items()}
+        for recipe, fields in self.recipes.items():
+            for item in fields.get('required', ()):
+                key, state = item['ingredient'], item['state']
+                if key not in ingredients:
+                    self._add('missing-key', data, self._data_offset('RECIPES', recipe, key), key,
+                              f'RECIPES.{recipe} requires an unknown ingredient')
+                    continue
+                if state not in ingredients[key].get('states', ()):
+                    self._add('missing-state', data, self._data_offset('RECIPES', recipe, key), f'{key}/{state}',
+                              f"RECIPES.{recipe} requires a state {key} does not list")
+                self.states[key].add(state)
+            for key in fields.get('optional', ()):
+                if key not in ingredients:
+                    self._add('missing-key', data, self._data_offset('RECIPES', recipe, key), key,
+                              f'RECIPES.{recipe} lists an unknown optional ingredient')
+
+        chef_levels = self.chef_levels()
+        if chef_levels is None:
+            return
+        path, text, offset, levels, live = chef_levels
+        starters = set(self.starters)
+        data_levels = dict(self.unlocked)
+        for fields in levels:
+            level = fields['level']
+            for key in fields.get('unlocks', ()):
+                at = text.find(f"'{key}'", offset)
+                line = _line_of(text, at if at != -1 else offset)
+                subject = f'CHEF_LEVELS[{level}] {key}'
+                if key not in ingredients:
+                    reason = f'level {level} unlocks an unknown ingredient'
+                    self.findings.append(Finding('missing-key', path, line, key, 0, False, reason))
+                    continue
+                if key in starters:
+                    reason = 'is a starter ingredient already'
+                elif key not in data_levels:
+                    reason = 'gameData.js never unlocks it'
+                elif data_levels[key] != level:
+                    reason = f'gameData.js unlocks it at level {data_levels[key]}'
+                else:
+                    reason = None
+                if reason:
+                    self.findings.append(Finding('unlock-conflict', path, line, subject, 0, False, reason))
+                if live:
+                    self.unlocked.setdefault(key, level)
+
+    def switches(self):
+        # (path, base offset, RenderSwitch) of IngredientSVG and every ingredient chunk
+        found = []
+        structure = self.cache.structure(self.text, self.sources[self.source_file].digest)
+        declaration = structure.by_name.get(COMPONENT)
+        if declaration is not None:
+            try:
+                found.append((self.source_file, declaration.start,
+                              RenderSwitch(self.text[declaration.start:declaration.end])))
+            except SplitError:
+                pass
+        for path in self.chunk_files:
+            if path in self.sources:
+                found.append((path, 0, RenderSwitch(self.sources[path].text)))
+        return found
+
+    def check_branches(self):
+        spawned = {m.group(2) for m in TYPE_SET_RE.finditer(self.text)}
+        for path, base, switch in self.switches():
+            text = self.sources[path].text
+            for groups, _, _ in switch.chains():
+                # A group is only entered through its labels if the group before it cannot fall into it
+                reachable = False
+                for group in groups:
+                    start, end = base + group.start, base + group.end
+                    live = [label for label in group.labels if label in self.ingredients]
+                    dead = [label for label in group.labels if label not in self.ingredients
+                            and label not in (None, '?')]
+                    if not live and dead and not reachable:
+                        span = _line_span(text, start, end)
+                        span = (span[0], _through_blank_lines(text, span[1]))
+                        self._add('dead-case', path, start, ', '.join(dead),
+                                  'not an INGREDIENTS key, so IngredientSVG never reaches it', span, True)
+                        continue
+                    reachable = True
+                    for match in LABEL_RE.finditer(text, start, base + group.body_start):
+                        if match.group(2) in dead:
+                            self._add('dead-case', path, match.start(), match.group(2),
+                                      'not an INGREDIENTS key, so IngredientSVG never reaches it',
+                                      _line_span(text, match.start(), match.end()), True)
+                    if not live:
+                        continue
+                    if all(key not in self.unlocked and key not in spawned for key in live):
+                        self._add('locked-case', path, start, ', '.join(live),
+                                  'no starter list, unlock list or game code ever hands it out',
+                                  (start, end))
+                    states = set().union(*(self.states[key] for key in live))
+                    self.check_states(path, base + group.body_start, end, live, states)
+
+    def check_states(self, path, start, end, keys, states):
+        # Branches of one case group that test for states none of `keys` can have
+        text = self.sources[path].text
+        if STATE_SHADOW_RE.search(text, start, end):
+            return
+        tokens = _tokens(text[start:end])
+        subject = '/'.join(keys)
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token.kind == 'ident' and token.value == 'if' and tokens[i + 1].value == '(':
+                close = _closing(tokens, i + 1)
+                test = _test_node(text[start + tokens[i + 1].end:start + tokens[close].start])
+                if (test is None or not never_true(test, states) or tokens[close + 1].value != '{'):
+                    i += 1
+                    continue
+                block_end = _closing(tokens, close + 1)
+                has_else = block_end + 1 < len(tokens) and tokens[block_end + 1].value == 'else'
+                if i > 0 and tokens[i - 1].value == 'else' and tokens[i - 2].value == '}':
+                    # `} else if (dead) {...}`: drop it from the chain
+                    span = (start + tokens[i - 2].end, start + tokens[block_end].end)
+                elif not has_else:
+                    span = _line_span(text, start + token.start, start + tokens[block_end].end)
+                elif tokens[block_end + 2].value == 'if':
+                    # `if (dead) {...} else if`: the chain starts at the next test
+                    span = (start + token.start, start + tokens[block_end + 2].start)
+                else:
+                    span = None
+                reason = f"tests for {' or '.join(self._tested(test))}, which {subject} never is"
+                self._add('dead-state', path, start + token.start, subject, reason,
+                          span or (start + token.start, start + tokens[block_end].end), span is not None)
+                i = block_end + 1
+            elif (token.kind == 'punct' and token.value == '{' and i > 0
+                  and tokens[i - 1].kind in ('jsx_tag', 'jsx_text') and tokens[i - 1].value != '<'):
+                close = _closing(tokens, i)
+                node = _test_node(text[start + token.end:start + tokens[close].start])
+                if node and node[0] == 'binary' and node[1] == '&&' and never_true(node[2], states):
+                    reason = f"renders only for {' or '.join(self._tested(node[2]))}, which {subject} never is"
+                    self._add('dead-state', path, start + token.start, subject, reason,
+                              _line_span(text, start + token.start, start + tokens[close].end), True)
+                    i = close + 1
+                else:
+                    i += 1
+            else:
+                i += 1
+
+    @staticmethod
+    def _tested(node):
+        # The states a test compares `state` with, for reports
+        if node[0] == 'binary' and node[1] in ('&&', '||'):
+            return AssetGraph._tested(node[2]) + AssetGraph._tested(node[3])
+        if node[0] == 'binary' and node[1] in ('===', '=='):
+            return [repr(side[1]) for side in node[2:] if side[0] == 'literal']
+        return []
+
+    def check_defs(self):
+        defs = []  # (path, start, end, id, tag)
+        refs = []  # (path, offset, id)
+        prefixes = []  # (path, offset, prefix) of ids built at run time
+        for path, source in self.sources.items():
+            text = source.text
+            refs.extend((path, m.start(), m.group(2)) for m in REF_RE.finditer(text))
+            prefixes.extend((path, m.start(), m.group(1)) for m in DYNAMIC_REF_RE.finditer(text))
+            tokens = _tokens(text)
+            for i, token in enumerate(tokens):
+                if not (token.kind == 'jsx_tag' and token.value == '<' and i + 1 < len(tokens)
+                        and tokens[i + 1].value in DEF_TAGS | {'symbol'}):
+                    continue
+                j = i + 1
+                while tokens[j].kind != 'jsx_tag' or tokens[j].value not in ('>', '/>'):
+                    j += 1
+                match = ID_RE.search(text, token.start, tokens[j].end)
+                if match:
+                    defs.append((path, token.start, tokens[_element_end(tokens, i)].end,
+                                 match.group(1), tokens[i + 1].value))
+
+        # A definition only a dropped one refers to (a gradient inside a symbol) goes too
+        def live(path, offset):
+            return not _inside(self.dead.get(path, []), offset, offset + 1)
+
+        changed = True
+        while changed:
+            changed = False
+            used = {element_id for path, offset, element_id in refs if live(path, offset)}
+            built = [prefix for path, offset, prefix in prefixes if live(path, offset)]
+            for path, start, end, element_id, tag in defs:
+                if (element_id in used or any(element_id.startswith(p) for p in built)
+                        or not live(path, start)):
+                    continue
+                changed = True
+                text = self.sources[path].text
+                self._add('unused-def', path, start, element_id, f'<{tag}> that no url(#...) or href references',
+                          _line_span(text, start, end), True)
+
+    def check_constants(self):
+        text = self.text
+        path = self.source_file
+        structure = self.cache.structure(text, self.sources[path].digest)
+        uses = {}
+        for token in _tokens(text):
+            if token.kind in ('ident', 'jsx_attr'):
+                uses.setdefault(token.value, []).append(token.start)
+
+        candidates = [d for d in structure.declarations
+                      if d.kind in ('const', 'let', 'var', 'function', 'class')
+                      and not d.exported and d.name and NAME_RE.match(d.name)]
+        # Dropping one declaration can leave the ones only it read unused, so repeat
+        changed = True
+        while changed:
+            changed = False
+            dead = self.dead.get(path, [])
+            for declaration in list(candidates):
+                if any(not declaration.start <= offset < declaration.end and not _inside(dead, offset, offset + 1)
+                       for offset in uses.get(declaration.name, ())):
+                    continue
+                candidates.remove(declaration)
+                changed = True
+                try:
+                    prunable = not has_effects(parse_statements(text[declaration.start:declaration.end]))
+                except Unsupported:
+                    prunable = False
+                start = _leading_comments_start(text, declaration.start)
+                span = _line_span(text, start, declaration.end)
+                span = (span[0], _through_blank_lines(text, span[1]))
+                reason = 'declared but never read' + ('' if prunable else '; kept, it may have side effects')
+                self._add('unused-const', path, declaration.start, declaration.name, reason, span, prunable)
+
+    def analyze(self):
+        self.check_data()
+        self.check_branches()
+        self.check_defs()
+        self.check_constants()
+        return self.findings
+
+    def plans(self):
+        # {path: SplicePlan} removing every prunable finding; nested removals fold into the outer one
+        plans = {}
+        for path, spans in self.removals.items():
+            plan = SplicePlan(self.sources[path].text)
+            outer = []
+            for start, end in sorted(spans, key=lambda span: (span[0], -span[1])):
+                if outer and start < outer[-1][1]:
+                    continue
+                outer.append((start, end))
+                plan.replace(start, end, '')
+            plans[path] = plan
+        return plans
+
+
+def analyze(source_file=DEFAULT_SOURCE, game_data_file=None, cache=None):
+    graph = AssetGraph(source_file, game_data_file, cache)
+    try:
+        return graph.analyze()
+    finally:
+        graph.close()
+
+
+def prune_dead_assets(source_file=DEFAULT_SOURCE, game_data_file=None, dry_run=False, cache=None, profile=None):
+    profile = profile or PatchProfile()
+    with profile.stage('read'):
+        graph = AssetGraph(source_file, game_data_file, cache)
+    try:
+        with profile.locate('(cross-references)'):
+            findings = graph.analyze()
+        plans = graph.plans()
+        diff = None
+        if dry_run:
+            diff = ''.join(plan_diff(plan, path) for path, plan in plans.items())
+        else:
+            with profile.stage('write'):
+                for path, plan in plans.items():
+                    write_plan(graph.sources[path], plan)
+    finally:
+        graph.close()
+
+    # The pruned files no longer match their patch ledgers, so patch units are
+    # found by their text again on the next run and are left alone if edited
+    return {
+        'findings': findings,
+        'bytes_removed': -sum(plan.size_delta() for plan in plans.values()),
+        'written': [] if dry_run else sorted(plans),
+        'units': {f'{f.kind} {f.subject} ({os.path.basename(f.path)}:{f.line})': REMOVED
+                  for f in findings if f.prunable},
+        'profile': profile.units,
+        'diff': diff,
+    }
+
+
+def print_report(findings):
+    if not findings:
+        print('No dead assets or missing keys found.')
+        return
+    order = {'missing-key': 0, 'missing-state': 1, 'unlock-conflict': 2}
+    findings = sorted(findings, key=lambda f: (order.get(f.kind, 3), -f.bytes, f.path, f.line))
+    print(f"{'bytes':>8}  {'kind':15} location")
+    for f in findings:
+        size = f'{f.bytes:,}' if f.bytes else '-'
+        mark = '' if f.prunable or f.kind not in PRUNABLE else '  (kept)'
+        print(f'{size:>8}  {f.kind:15} {f.path}:{f.line}  {f.subject}{mark}')
+        print(f'{"":26}{f.reason}')
+    prunable = sum(f.bytes for f in findings if f.prunable)
+    print(f'\n{len(findings)} findings, {prunable:,} bytes prunable')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', nargs='?', default=DEFAULT_SOURCE, help='component file (default: %(default)s)')
+    parser.add_argument('--game-data', help='gameData.js (default: data/gameData.js next to the source)')
+    parser.add_argument('--json', dest='json_path', help='also write the findings as JSON')
+    parser.add_argument('--prune', action='store_true', help='remove the prunable findings')
+    parser.add_argument('--dry-run', action='store_true', help='with --prune, print the diff instead of writing')
+    parser.add_argument('--strict', action='store_true', help='exit with status 1 if anything was found')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.prune:
+            result = prune_dead_assets(args.source, args.game_data, dry_run=args.dry_run)
+            findings = result['findings']
+        else:
+            findings = analyze(args.source, args.game_data)
+    except (OSError, GameDataError, SplitError) as e:
+        print(f'❌ {e}')
+        return 1
+
+    print_report(findings)
+    if args.prune:
+        if args.dry_run:
+            print(result['diff'], end='')
+        for path in result['written']:
+            print(f'✅ Pruned {path}')
+        print(f"{result['bytes_removed']:,} characters {'would be ' if args.dry_run else ''}removed")
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump([f._asdict() for f in findings], f, indent=2)
+    return 1 if args.strict and findings else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo simulator for the restaurant-mode economy.
+
+Replays the rules enhance_game() injects into CookingGame.jsx over many
+simulated shifts at once, one NumPy array element per shift. The rules
+are: an order spawn check every 15 seconds, a uniform customer pick from
+CUSTOMER_TYPES with its recipe preferences, a 1-second patience
+countdown, -0.5 reputation on timeout, and
+`xpReward * (1 + timeBonus) * tipMultiplier` XP per served order with
+the CHEF_LEVELS level-up rules of gainXP(), with at most
+MAX_ACTIVE_ORDERS orders waiting. The constants are read from a patched
+CookingGame.jsx; RECIPES falls back to gameData.js when the
+component imports it. The player is modelled as cooking one order at a
+time, oldest first, with a log-normal cooking time.
+
+Shifts are split into chunks that run in worker processes and reduce to
+mergeable histograms. The report covers time-to-level distributions,
+order abandonment rates and reputation over the shift. NumPy is the
+one dependency (pip install -r requirements.txt).
+
+    python economy_sim.py patched/CookingGame.jsx --shifts 1000000
+    python economy_sim.py patched/CookingGame.jsx --sweep cook_seconds=30,45,60
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from game_data import game_data_for, load_game_data, parse_exports
+
+DEFAULT_SOURCE = 'C:/Dev/Kitchen_Explorer/src/CookingGame.jsx'
+
+# Player model and the rule literals that live in code rather than in
+# the constants; every key can be overridden with --set and swept with --sweep
+DEFAULT_PARAMS = {
+    'shift_seconds': 1800,
+    'spawn_interval': 15,      # createOrder interval in ms / 1000
+    'spawn_chance': 0.5,       # Math.random() > 0.5
+    'max_orders': None,        # MAX_ACTIVE_ORDERS of the game unless set
+    'cook_seconds': 45.0,      # median time to cook and plate a dish
+    'cook_sigma': 0.4,         # log-normal spread of the cooking time
+    'completion_xp': 1,        # recipe XP from checkRecipeCompletion as well
+    'reputation_penalty': 0.5,
+    'default_xp': 20,          # `xpReward || 20`
+    'patience_scale': 1.0,
+    'xp_scale': 1.0,
+}
+
+CHUNK_SHIFTS = 25000
+REPUTATION_STEP = 0.1  # resolution of the reputation histograms
+XP_BIN = 25
+
+Rules = namedtuple('Rules', [
+    'level_names',      # names of CHEF_LEVELS in order
+    'xp_required',      # xpRequired of each level
+    'customer_names',
+    'patience',         # seconds, per customer type
+    'tip_multiplier',   # per customer type
+    'recipe_cdf',       # [customer, recipe] cumulative order probabilities
+    'recipe_names',
+    'recipe_xp',        # xpReward per recipe
+    'reputation',       # starting reputation
+    'max_orders',       # MAX_ACTIVE_ORDERS
+])
+
+
+class SimulationError(ValueError):
+    pass
+
+
+def load_rules(source_file, default_xp=DEFAULT_PARAMS['default_xp']):
+    with open(source_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+    names = ['CHEF_LEVELS', 'CUSTOMER_TYPES', 'MAX_ACTIVE_ORDERS']
+    inline_recipes = re.search(r'^(?:export )?const RECIPES\s*=', text, re.M) is not None
+    if inline_recipes:
+        names.append('RECIPES')
+    try:
+        values = parse_exports(text, names)
+    except ValueError as e:
+        raise SimulationError(f'{source_file}: {e} (run enhance_game.py on it first)') from None
+
+    if inline_recipes:
+        recipes = {key: fields.get('xpReward') for key, fields in values['RECIPES'].items()}
+    else:
+        game_data = load_game_data(game_data_for(source_file))
+        recipes = {recipe.key: recipe.xp_reward for recipe in game_data.recipes}
+
+    discovered = re.search(r'discoveredRecipes:\s*\[([^\]]*)\]', text)
+    discovered = re.findall(r"'([\w$]+)'", discovered.group(1)) if discovered else list(recipes)
+    available = [key for key in recipes if key in discovered]
+    if not available:
+        raise SimulationError(f'{source_file}: no discovered recipe is defined in RECIPES')
+    # useState(5.0) in older patches, the game store's initial state since
+    reputation = re.search(r'\[reputation, setReputation\] = useState\(([\d.]+)\)|^\s*reputation: ([\d.]+),', text, re.M)
+
+    customers = values['CUSTOMER_TYPES']
+    if isinstance(customers, dict):
+        customers = list(customers.values())
+    cdf = np.zeros((len(customers), len(available)))
+    for c, customer in enumerate(customers):
+        # createOrder(): uniform over available recipes unless the customer
+        # prefers some of them
+        orders = customer.get('orders') or customer.get('preferredDishes') or ['any']
+        preferred = [r for r in orders if r in available] if orders[0] != 'any' else []
+        weights = np.array([1.0 if not preferred or key in preferred else 0.0 for key in available])
+        cdf[c] = np.cumsum(weights / weights.sum())
+    cdf[:, -1] = 1.0
+
+    levels = sorted(values['CHEF_LEVELS'], key=lambda level: level['level'])
+    return Rules(
+        level_names=[level.get('name') or level.get('title') for level in levels],
+        xp_required=[level['xpRequired'] for level in levels],
+        customer_names=[customer['name'] for customer in customers],
+        patience=[customer['patience'] for customer in customers],
+        tip_multiplier=[customer['tipMultiplier'] for customer in customers],
+        recipe_cdf=cdf,
+        recipe_names=available,
+        recipe_xp=[recipes[key] or default_xp for key in available],
+        reputation=float(reputation.group(1) or reputation.group(2)) if reputation else 5.0,
+        max_orders=int(values['MAX_ACTIVE_ORDERS']),
+    )
+
+
+def simulate(rules, params, shifts, seed):
+    # One chunk of shifts; returns histograms that merge by addition
+    rng = np.random.default_rng(seed)
+    n = shifts
+    k = int(params['max_orders'])
+    seconds = int(params['shift_seconds'])
+    rows = np.arange(n)
+
+    patience = np.asarray(rules.patience, np.float32) * params['patience_scale']
+    tip = np.asarray(rules.tip_multiplier, np.float32)
+    recipe_xp = np.asarray(rules.recipe_xp, np.float64) * params['xp_scale']
+    cdf = rules.recipe_cdf
+    # gainXP() compares the XP left over since the last level with the next
+    # level's xpRequired; the sentinel keeps the top level from levelling
+    thresholds = np.append(np.asarray(rules.xp_required[1:], np.float64), np.inf)
+    levels = len(rules.xp_required)
+
+    order_id = np.zeros((n, k), np.int32)  # 0 marks an empty slot
+    order_recipe = np.zeros((n, k), np.int16)
+    remaining = np.zeros((n, k), np.float32)
+    max_time = np.ones((n, k), np.float32)
+    order_tip = np.zeros((n, k), np.float32)
+    next_id = np.ones(n, np.int32)
+    cooking = np.zeros(n, np.int32)
+    cooking_recipe = np.zeros(n, np.int16)
+    cook_left = np.zeros(n, np.float32)
+
+    level = np.zeros(n, np.int64)
+    xp = np.zeros(n)
+    total_xp = np.zeros(n)
+    reputation = np.full(n, rules.reputation)
+    spawned = np.zeros(n, np.int64)
+    served = np.zeros(n, np.int64)
+    abandoned = np.zeros(n, np.int64)
+
+    reputation_bins = int(round(rules.reputation / REPUTATION_STEP)) + 1
+    result = {
+        'shifts': n,
+        'level_reached': np.zeros((levels, seconds + 1), np.int64),
+        'reputation': np.zeros((seconds // 60 + 1, reputation_bins), np.int64),
+    }
+    result['level_reached'][0, 0] = n
+
+    def gain_xp(idx, amount, t):
+        xp[idx] += amount
+        total_xp[idx] += amount
+        required = thresholds[level[idx]]
+        up = xp[idx] >= required
+        if up.any():
+            upi = idx[up]
+            xp[upi] -= required[up]
+            level[upi] += 1
+            np.add.at(result['level_reached'], (level[upi], t), 1)
+
+    def sample_reputation(minute):
+        codes = np.clip(np.rint(reputation / REPUTATION_STEP).astype(np.int64), 0, reputation_bins - 1)
+        result['reputation'][minute] += np.bincount(codes, minlength=reputation_bins)
+
+    sample_reputation(0)
+    cook_mu = math.log(params['cook_seconds'])
+    for t in range(1, seconds + 1):
+        # Patience countdown; an order whose time runs out leaves unhappy
+        active = order_id > 0
+        remaining -= active
+        expired = active & (remaining <= 0)
+        if expired.any():
+            lost = expired.sum(axis=1)
+            reputation = np.maximum(0.0, reputation - params['reputation_penalty'] * lost)
+            abandoned += lost
+            order_id[expired] = 0
+
+        # Spawn check
+        if t % int(params['spawn_interval']) == 0:
+            room = (order_id > 0).sum(axis=1) < k
+            idx = rows[room & (rng.random(n) < params['spawn_chance'])]
+            if idx.size:
+                customer = rng.integers(0, len(patience), idx.size)
+                recipe = (rng.random(idx.size)[:, None] >= cdf[customer]).sum(axis=1)
+                slot = (order_id[idx] > 0).argmin(axis=1)
+                order_id[idx, slot] = next_id[idx]
+                order_recipe[idx, slot] = recipe
+                remaining[idx, slot] = patience[customer]
+                max_time[idx, slot] = patience[customer]
+                order_tip[idx, slot] = tip[customer]
+                next_id[idx] += 1
+                spawned[idx] += 1
+
+        # The player picks up the oldest waiting order when idle
+        start = (cooking == 0) & (order_id > 0).any(axis=1)
+        if start.any():
+            idx = rows[start]
+            waiting = np.where(order_id[idx] > 0, order_id[idx], np.iinfo(np.int32).max)
+            slot = waiting.argmin(axis=1)
+            cooking[idx] = order_id[idx, slot]
+            cooking_recipe[idx] = order_recipe[idx, slot]
+            cook_left[idx] = rng.lognormal(cook_mu, params['cook_sigma'], idx.size)
+
+        busy = cooking > 0
+        cook_left -= busy
+        done = busy & (cook_left <= 0)
+        if done.any():
+            idx = rows[done]
+            if params['completion_xp']:
+                gain_xp(idx, recipe_xp[cooking_recipe[idx]], t)
+            match = order_id[idx] == cooking[idx][:, None]
+            found = match.any(axis=1)
+            idx, slot = idx[found], match[found].argmax(axis=1)
+            if idx.size:
+                # checkOrderMatch()
+                bonus = remaining[idx, slot] / max_time[idx, slot]
+                reward = np.floor(recipe_xp[order_recipe[idx, slot]] * (1 + bonus) * order_tip[idx, slot])
+                gain_xp(idx, reward, t)
+                served[idx] += 1
+                order_id[idx, slot] = 0
+            cooking[rows[done]] = 0
+
+        if t % 60 == 0:
+            sample_reputation(t // 60)
+
+    orders_bins = seconds // int(params['spawn_interval']) + 2
+    result['spawned'] = np.bincount(spawned, minlength=orders_bins)
+    result['served'] = np.bincount(served, minlength=orders_bins)
+    result['abandonment'] = np.bincount(
+        np.rint(100 * abandoned / np.maximum(spawned, 1)).astype(np.int64), minlength=101)
+    result['final_level'] = np.bincount(level, minlength=levels)
+    result['total_xp'] = np.bincount((total_xp // XP_BIN).astype(np.int64))
+    result['orders'] = np.array([spawned.sum(), served.sum(), abandoned.sum()])
+    return result
+
+
+def merge(a, b):
+    merged = {'shifts': a['shifts'] + b['shifts']}
+    for key, value in a.items():
+        if key == 'shifts':
+            continue
+        other = b[key]
+        size = max(len(value), len(other))
+        if value.ndim == 1 and len(value) != len(other):
+            value = np.pad(value, (0, size - len(value)))
+            other = np.pad(other, (0, size - len(other)))
+        merged[key] = value + other
+    return merged
+
+
+def _percentiles(counts, points=(10, 50, 90), scale=1.0):
+    # Percentiles of a histogram whose bin i holds the value i * scale
+    total = counts.sum()
+    if not total:
+        return [None for _ in points]
+    cumulative = np.cumsum(counts)
+    return [float(np.searchsorted(cumulative, total * p / 100.0) * scale) for p in points]
+
+
+def summarize(rules, params, result, seconds_taken):
+    shifts = result['shifts']
+    spawned, served, abandoned = (int(x) for x in result['orders'])
+    levels = []
+    for i, name in enumerate(rules.level_names):
+        reached = result['level_reached'][i]
+        p10, p50, p90 = _percentiles(reached, scale=1 / 60)
+        levels.append({'level': i + 1, 'name': name, 'reached': float(reached.sum() / shifts),
+                       'minutes_p10': p10, 'minutes_p50': p50, 'minutes_p90': p90})
+    reputation = []
+    values = np.arange(result['reputation'].shape[1]) * REPUTATION_STEP
+    for minute, counts in enumerate(result['reputation']):
+        p10, p50, p90 = _percentiles(counts, scale=REPUTATION_STEP)
+        reputation.append({'minute': minute, 'mean': float(counts @ values / counts.sum()),
+                           'p10': p10, 'p50': p50, 'p90': p90})
+    return {
+        'params': params,
+        'shifts': shifts,
+        'seconds': seconds_taken,
+        'levels': levels,
+        'final_level': [float(x) for x in result['final_level'] / shifts],
+        'orders': {
+            'spawned_per_shift': spawned / shifts,
+            'served_per_shift': served / shifts,
+            'abandoned_per_shift': abandoned / shifts,
+            'abandonment_rate': abandoned / spawned if spawned else 0.0,
+            'shift_abandonment_pct_p50': _percentiles(result['abandonment'])[1],
+            'shift_abandonment_pct_p90': _percentiles(result['abandonment'])[2],
+        },
+        'total_xp_p10_p50_p90': _percentiles(result['total_xp'], scale=XP_BIN),
+        'reputation': reputation,
+    }
+
+
+def run(rules, configs, shifts, jobs=None, seed=0, chunk=CHUNK_SHIFTS):
+    # Every chunk of every configuration goes through one process pool
+    chunks = [(i, min(chunk, shifts - start)) for i in range(len(configs)) for start in range(0, shifts, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    results = [None] * len(configs)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [(i, executor.submit(simulate, rules, configs[i], size, chunk_seed))
+                   for (i, size), chunk_seed in zip(chunks, seeds)]
+        for i, future in futures:
+            result = future.result()
+            results[i] = result if results[i] is None else merge(results[i], result)
+    elapsed = time.perf_counter() - start
+    return [summarize(rules, config, result, elapsed) for config, result in zip(configs, results)]
+
+
+def _fmt(value, spec='5.1f'):
+    return format(value, spec) if value is not None else '    -'
+
+
+def print_summary(summary):
+    params = summary['params']
+    orders = summary['orders']
+    print(f"{summary['shifts']:,} shifts of {params['shift_seconds'] / 60:.0f} min in {summary['seconds']:.1f}s")
+    print()
+    print(f"{'level':24} {'reached':>8} {'p10 min':>8} {'p50 min':>8} {'p90 min':>8}")
+    for level in summary['levels']:
+        print(f"{level['level']} {level['name']:22} {level['reached']:8.1%} {_fmt(level['minutes_p10']):>8} "
+              f"{_fmt(level['minutes_p50']):>8} {_fmt(level['minutes_p90']):>8}")
+    print()
+    print(f"Orders per shift: {orders['spawned_per_shift']:.1f} spawned, {orders['served_per_shift']:.1f} served, "
+          f"{orders['abandoned_per_shift']:.1f} abandoned ({orders['abandonment_rate']:.1%})")
+    print(f"Abandonment per shift: p50 {orders['shift_abandonment_pct_p50']:.0f}%, "
+          f"p90 {orders['shift_abandonment_pct_p90']:.0f}%")
+    print()
+    print(f"{'minute':>6} {'reputation':>10} {'p10':>5} {'p50':>5} {'p90':>5}")
+    step = max(1, len(summary['reputation']) // 10)
+    for point in summary['reputation'][::step]:
+        print(f"{point['minute']:6} {point['mean']:10.2f} {_fmt(point['p10'])} {_fmt(point['p50'])} {_fmt(point['p90'])}")
+
+
+def print_sweep(key, summaries):
+    level_names = [f"L{level['level']}" for level in summaries[0]['levels'][1:]]
+    print(f"{key:>16} " + ' '.join(f'{name:>6}' for name in level_names) + f" {'abandon':>8} {'rep end':>8}")
+    for summary in summaries:
+        reached = ' '.join(f"{level['reached']:6.0%}" for level in summary['levels'][1:])
+        print(f"{summary['params'][key]:>16} {reached} {summary['orders']['abandonment_rate']:8.1%} "
+              f"{summary['reputation'][-1]['mean']:8.2f}")
+
+
+def _parse_value(text):
+    return float(text) if '.' in text or 'e' in text else int(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source_file', nargs='?', default=DEFAULT_SOURCE,
+                        help='CookingGame.jsx patched by enhance_game.py')
+    parser.add_argument('--shifts', type=int, default=200000)
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help=f"override a parameter ({', '.join(DEFAULT_PARAMS)})")
+    parser.add_argument('--sweep', metavar='KEY=V1,V2,...', help='run one configuration per value')
+    parser.add_argument('--jobs', '-j', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path', help='also write the summaries as JSON')
+    args = parser.parse_args(argv)
+
+    params = dict(DEFAULT_PARAMS)
+    for item in args.set:
+        key, _, value = item.partition('=')
+        if key not in params:
+            parser.error(f'unknown parameter {key!r}')
+        params[key] = _parse_value(value)
+    configs = [params]
+    sweep_key = None
+    if args.sweep:
+        sweep_key, _, values = args.sweep.partition('=')
+        if sweep_key not in params:
+            parser.error(f'unknown parameter {sweep_key!r}')
+        configs = [dict(params, **{sweep_key: _parse_value(value)}) for value in values.split(',')]
+
+    try:
+        rules = load_rules(args.source_file, params['default_xp'])
+    except (OSError, SimulationError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    for config in configs:
+        if config['max_orders'] is None:
+            config['max_orders'] = rules.max_orders
+    summaries = run(rules, configs, args.shifts, args.jobs, args.seed)
+    if sweep_key:
+        print_sweep(sweep_key, summaries)
+    else:
+        print_summary(summaries[0])
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,25 +4,93 @@ Script to enhance Kitchen Explorer game with progression system,
 customer orders, and disaster mechanics.
 """
 
+import argparse
+import os
 import re
 
-def read_file(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return f.read()
-
-def write_file(filepath, content):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
-
-def enhance_game():
-    source_file = 'C:/Dev/Kitchen_Explorer/src/CookingGame.jsx'
-
-    # Read original content
-    content = read_file(source_file)
-
-    # Find insertion points
-    recipes_end = content.find('};', content.find('const RECIPES'))
-    state_start = content.find('export default function CookingGame()') + len('export default function CookingGame() {')
+from game_data import game_data_for, load_game_data
+from jsx_structure import ScanError
+from patch_cache import PatchCache
+from patch_io import MappedSource, write_plan
+from patch_ledger import PatchLedger
+from patch_report import PatchProfile, format_profile, plan_diff
+from render_probes import IMPORT_RE, plan_runtime, probe_hooks
+from splice import SplicePlan
+
+DEFAULT_SOURCE = 'C:/Dev/Kitchen_Explorer/src/CookingGame.jsx'
+
+# Every insertion point enhance_game() looks up, located in a single scan
+ANCHORS = [
+    'const [activeItems, setActiveItems] = useState([]);',
+    'const [expandedCategory, setExpandedCategory] = useState(null);',
+]
+
+# React hooks the game store uses, added to the `from 'react'` import
+GAME_STORE_HOOKS = ['useReducer', 'useMemo', 'useRef']
+
+REACT_IMPORT_RE = re.compile(r"""^import\s+React(?:\s*,\s*\{([^}]*)\})?\s+from\s+(['"])react\2;?""", re.MULTILINE)
+
+# Profile persistence shared with systems/useProgression.js
+PROFILE_STORAGE_IMPORT = "\nimport { loadProfile, useProfileSaver } from './systems/profileStorage';"
+
+# The restaurant timers run on the shared game loop
+GAME_LOOP_IMPORT = "\nimport { useGameLoop } from './systems/gameLoop';"
+
+# Random rolls are seeded while a session trace is recorded
+GAME_TRACE_IMPORT = "\nimport { gameRandom } from './systems/gameTrace';"
+
+# Callbacks wrapped in render probes with --instrument
+PROBED_HOOKS = ['gainXP', 'createOrder', 'checkOrderMatch', 'triggerDisaster']
+
+def react_import_with(content, hooks):
+    # (old, new) for the React import line with `hooks` added, or None
+    match = REACT_IMPORT_RE.search(content)
+    if not match:
+        return None
+    names = [name.strip() for name in (match.group(1) or '').split(',') if name.strip()]
+    missing = [hook for hook in hooks if hook not in names]
+    if not missing:
+        return None
+    quote = match.group(2)
+    line = f"import React, {{ {', '.join(names + missing)} }} from {quote}react{quote};"
+    return match.group(), line
+
+def skip_reason(structure):
+    # Why there is nothing to patch, or None. The patches target the
+    # single-file game, which declares CookingGame and RECIPES itself; the
+    # modular game already gets these systems from src/systems hooks.
+    systems = structure.imported_from('useCustomerOrders')
+    if systems:
+        return f'Restaurant systems already come from {systems!r}'
+    try:
+        structure.declaration('CookingGame')
+        structure.declaration('RECIPES')
+    except ScanError as e:
+        return str(e)
+    return None
+
+def enhance_game(source_file=DEFAULT_SOURCE, dry_run=False, cache=None, profile=None, instrument=False):
+    cache = cache or PatchCache()
+    profile = profile or PatchProfile()
+
+    # Map the original file; its text is the only full copy held in memory
+    with profile.stage('read'):
+        source = MappedSource(source_file)
+    content = source.text
+    original = {'chars': len(content), 'lines': content.count('\n')}
+
+    # Every edit is planned against the original text and applied in one pass
+    plan = SplicePlan(content)
+    ledger = PatchLedger(source_file, content, source.digest)
+    with profile.locate('(anchor index)'):
+        anchors = cache.anchor_index(content, ANCHORS, source.digest)
+    with profile.locate('(structure map)'):
+        structure = cache.structure(content, source.digest)
+    reason = skip_reason(structure)
+    if reason:
+        source.close()
+        print(reason)
+        return {'skipped': reason}
 
     # CONSTANTS TO ADD (after RECIPES)
     constants_addition = '''
@@ -56,33 +124,66 @@ const CUSTOMER_TYPES = [
 '''
 
     # Insert constants after RECIPES
-    content = content[:recipes_end + 2] + constants_addition + content[recipes_end + 2:]
-
-    # Update RECIPES to add xpReward
-    recipes_section = content[content.find('const RECIPES'):content.find('};', content.find('const RECIPES')) + 2]
-    enhanced_recipes = recipes_section.replace(
-        "emoji: '🍣' }",
-        "emoji: '🍣', xpReward: 25 }"
-    ).replace(
-        "emoji: '🍲' }",
-        "emoji: '🍲', xpReward: 35 }"
-    ).replace(
-        "emoji: '🍳' }",
-        "emoji: '🍳', xpReward: 20 }"
-    ).replace(
-        "emoji: '🍤' }",
-        "emoji: '🍤', xpReward: 30 }"
-    ).replace(
-        "emoji: '🍗' }",
-        "emoji: '🍗', xpReward: 30 }"
-    )
-    content = content.replace(recipes_section, enhanced_recipes)
-
-    # STATE VARIABLES TO ADD
-    state_additions = '''
+    with profile.locate('constants'):
+        recipes = structure.declaration('RECIPES')
+    with profile.apply('constants', plan):
+        ledger.plan_insert(plan, 'constants', constants_addition, recipes.end)
+
+    # Progression, orders and disasters share one reducer, so a timer tick or
+    # a served dish is one dispatch and one commit instead of a setState cascade
+    game_store_addition = '''
+// Disasters that can break out in the kitchen
+const DISASTERS = {
+  fire: { name: 'Pan Fire!', message: 'Quick! Grab the fire extinguisher!', duration: 10, emoji: '🔥', minigame: 'extinguish' },
+  overflow: { name: 'Pot Overflow!', message: 'Turn down the heat!', duration: 8, emoji: '💦', minigame: 'turnoff' },
+  burnt: { name: 'Food Burning!', message: 'Remove from heat immediately!', duration: 6, emoji: '🍳', minigame: 'remove' }
+};
+
+// Progression, restaurant and disaster state, updated only through gameReducer
+const GAME_STATE_KEYS = [
+  'playerProfile', 'restaurantMode', 'activeOrders', 'nextOrderId', 'reputation',
+  'activeDisaster', 'panTimer', 'warnings', 'showLevelUp', 'levelUpData'
+];
 
-  // Progression system state
-  const [playerProfile, setPlayerProfile] = useState({
+// Raise for high-volume shifts; spawning and matching cost does not grow with it
+const MAX_ACTIVE_ORDERS = 3;
+
+// Only the most recent warnings and notifications are kept, so their cost
+// stays flat however long a session runs
+const MAX_WARNINGS = 5;
+const MAX_NOTIFICATIONS = 10;
+const WARNING_TTL = 8000; // ms a warning banner stays up
+
+// Append to a capped list, dropping the oldest entries
+const pushRecent = (list, entry, capacity) =>
+  list.length < capacity ? [...list, entry] : [...list.slice(list.length - capacity + 1), entry];
+
+// Discovered recipes as a Set, plus the ones createOrder can pick in RECIPES order
+const indexDiscovered = discoveredRecipes => {
+  const set = new Set(discoveredRecipes);
+  return { source: discoveredRecipes, set, available: Object.keys(RECIPES).filter(r => set.has(r)) };
+};
+
+// Open orders per recipe, oldest first, so a dish is matched without a scan
+const indexOrders = activeOrders => {
+  const byRecipe = {};
+  for (const order of activeOrders) {
+    (byRecipe[order.recipe] ||= []).push(order);
+  }
+  return byRecipe;
+};
+
+// Refresh the lookup indexes after playerProfile or activeOrders were replaced
+const withIndexes = state => ({
+  ...state,
+  discovered: state.discovered?.source === state.playerProfile.discoveredRecipes
+    ? state.discovered
+    : indexDiscovered(state.playerProfile.discoveredRecipes),
+  ordersByRecipe: indexOrders(state.activeOrders)
+});
+
+const createGameState = () => withIndexes({
+  playerProfile: {
     level: 1,
     xp: 0,
     totalXP: 0,
@@ -90,273 +191,392 @@ const CUSTOMER_TYPES = [
     unlockedStations: ['cuttingBoard', 'sink', 'pot'],
     discoveredRecipes: ['salmonMaki', 'friedRice'],
     stats: { recipesCompleted: 0, customersServed: 0, disastersHandled: 0 }
-  });
-
-  // Restaurant mode state
-  const [restaurantMode, setRestaurantMode] = useState(false);
-  const [activeOrders, setActiveOrders] = useState([]);
-  const [nextOrderId, setNextOrderId] = useState(1);
-  const [reputation, setReputation] = useState(5.0);
-
-  // Disaster state
-  const [activeDisaster, setActiveDisaster] = useState(null);
-  const [panTimer, setPanTimer] = useState(0);
-  const [warnings, setWarnings] = useState([]);
-
-  // UI state
-  const [showLevelUp, setShowLevelUp] = useState(false);
-  const [levelUpData, setLevelUpData] = useState(null);
+  },
+  restaurantMode: false,
+  activeOrders: [],
+  nextOrderId: 1,
+  reputation: 5.0,
+  activeDisaster: null,
+  panTimer: 0,
+  warnings: [],
+  warningSeq: 0,
+  showLevelUp: false,
+  levelUpData: null,
+  // Notifications are queued here and shown by an effect after the commit
+  notifications: [],
+  notificationSeq: 0,
+  // Plate items consumed by the last served orders
+  servedDishIds: []
+});
+
+const queueNotification = (state, message, type) => ({
+  ...state,
+  notifications: pushRecent(state.notifications, { id: state.notificationSeq + 1, message, type }, MAX_NOTIFICATIONS),
+  notificationSeq: state.notificationSeq + 1
+});
+
+// Warnings get increasing IDs and expire WARNING_TTL ms after they were raised
+const raiseWarning = (state, message, type, now) => ({
+  ...state,
+  warnings: pushRecent(state.warnings, { id: state.warningSeq + 1, message, type, expiresAt: now + WARNING_TTL }, MAX_WARNINGS),
+  warningSeq: state.warningSeq + 1
+});
+
+const applyXP = (state, amount) => {
+  const prev = state.playerProfile;
+  const newXP = prev.xp + amount;
+  const newTotalXP = prev.totalXP + amount;
+  const nextLevelData = CHEF_LEVELS.find(l => l.level === prev.level + 1);
+
+  if (nextLevelData && newXP >= nextLevelData.xpRequired) {
+    const newLevel = prev.level + 1;
+    const unlocks = nextLevelData.unlocks || [];
+    return queueNotification({
+      ...state,
+      playerProfile: {
+        ...prev,
+        level: newLevel,
+        xp: newXP - nextLevelData.xpRequired,
+        totalXP: newTotalXP,
+        unlockedIngredients: [...new Set([...prev.unlockedIngredients, ...unlocks])]
+      },
+      levelUpData: { newLevel, unlocks, levelName: nextLevelData.name },
+      showLevelUp: true
+    }, `🎉 Level Up! You're now a ${nextLevelData.name}!`, 'success');
+  }
+
+  return { ...state, playerProfile: { ...prev, xp: newXP, totalXP: newTotalXP } };
+};
+
+const startDisaster = (state, type, now) => {
+  if (state.activeDisaster) return state; // Only one disaster at a time
+  const disaster = DISASTERS[type] || DISASTERS.fire;
+  return queueNotification(raiseWarning({
+    ...state,
+    activeDisaster: { ...disaster, timeLeft: disaster.duration, type }
+  }, disaster.message, 'error', now), `⚠️ ${disaster.name} ${disaster.message}`, 'error');
+};
+
+// Actions carry their random rolls and timestamps, so the reducer stays pure
+function gameReducer(state, action) {
+  switch (action.type) {
+    case 'set': {
+      const value = typeof action.update === 'function' ? action.update(state[action.key]) : action.update;
+      if (Object.is(value, state[action.key])) return state;
+      const next = { ...state, [action.key]: value };
+      return action.key === 'playerProfile' || action.key === 'activeOrders' ? withIndexes(next) : next;
+    }
+
+    case 'gainXP':
+      return applyXP(state, action.amount);
+
+    case 'createOrder': {
+      if (state.activeOrders.length >= MAX_ACTIVE_ORDERS) return state;
+      const [customerRoll, recipeRoll, preferenceRoll] = action.rolls;
+      const customerType = CUSTOMER_TYPES[Math.floor(customerRoll * CUSTOMER_TYPES.length)];
+      const availableRecipes = state.discovered.available;
+      let recipeKey = availableRecipes[Math.floor(recipeRoll * availableRecipes.length)];
+
+      // Customer preferences
+      if (customerType.orders[0] !== 'any') {
+        const preferredAvailable = customerType.orders.filter(o => state.discovered.set.has(o));
+        if (preferredAvailable.length > 0) {
+          recipeKey = preferredAvailable[Math.floor(preferenceRoll * preferredAvailable.length)];
+        }
+      }
+
+      const order = {
+        id: state.nextOrderId,
+        customer: customerType,
+        recipe: recipeKey,
+        recipeName: RECIPES[recipeKey].name,
+        timeRemaining: customerType.patience,
+        maxTime: customerType.patience,
+        tipMultiplier: customerType.tipMultiplier
+      };
+      return queueNotification({
+        ...state,
+        activeOrders: [...state.activeOrders, order],
+        ordersByRecipe: { ...state.ordersByRecipe, [recipeKey]: [...(state.ordersByRecipe[recipeKey] || []), order] },
+        nextOrderId: state.nextOrderId + 1
+      }, `${customerType.emoji} New order: ${RECIPES[recipeKey].name}!`, 'info');
+    }
+
+    case 'tick': {
+      // Count down every order's patience in one update
+      if (state.activeOrders.length === 0) return state;
+      let next = state;
+      const activeOrders = [];
+      for (const order of state.activeOrders) {
+        const timeRemaining = order.timeRemaining - 1;
+        if (timeRemaining <= 0) {
+          next = queueNotification({ ...next, reputation: Math.max(0, next.reputation - 0.5) },
+            `${order.customer.emoji} Customer left unhappy!`, 'error');
+          continue;
+        }
+        if (timeRemaining === 10) {
+          next = raiseWarning(next, `Customer ${order.customer.name} is getting impatient!`, 'warning', action.now);
+        }
+        activeOrders.push({ ...order, timeRemaining });
+      }
+      return { ...next, activeOrders, ordersByRecipe: indexOrders(activeOrders) };
+    }
+
+    case 'serveDishes': {
+      // Match every finished dish on the plate against the open orders
+      let next = state;
+      const servedDishIds = [];
+      const servedOrderIds = new Set();
+      for (const dish of action.dishes) {
+        const queue = next.ordersByRecipe[dish.recipeKey || dish.type];
+        if (!queue || queue.length === 0) continue;
+        const matchingOrder = queue[0];
+
+        const timeBonus = matchingOrder.timeRemaining / matchingOrder.maxTime;
+        const xpReward = Math.floor((RECIPES[matchingOrder.recipe].xpReward || 20) * (1 + timeBonus) * matchingOrder.tipMultiplier);
+        next = applyXP(next, xpReward);
+        next = queueNotification({
+          ...next,
+          ordersByRecipe: { ...next.ordersByRecipe, [matchingOrder.recipe]: queue.slice(1) },
+          playerProfile: {
+            ...next.playerProfile,
+            stats: { ...next.playerProfile.stats, customersServed: next.playerProfile.stats.customersServed + 1 }
+          }
+        }, `${matchingOrder.customer.emoji} Customer satisfied! +${xpReward} XP`, 'success');
+        servedOrderIds.add(matchingOrder.id);
+        servedDishIds.push(dish.id);
+      }
+      if (servedDishIds.length === 0) return state;
+      // One pass over the open orders, however many dishes were served
+      return { ...next, activeOrders: next.activeOrders.filter(o => !servedOrderIds.has(o.id)), servedDishIds };
+    }
+
+    case 'triggerDisaster':
+      return startDisaster(state, action.disaster, action.now);
+
+    case 'panTick': {
+      const panTimer = state.panTimer + 1;
+      if (panTimer >= 30 && action.roll > 0.7) {
+        return { ...startDisaster(state, 'fire', action.now), panTimer: 0 };
+      }
+      return { ...state, panTimer };
+    }
+
+    case 'expireWarnings': {
+      const warnings = state.warnings.filter(warning => warning.expiresAt > action.now);
+      return warnings.length === state.warnings.length ? state : { ...state, warnings };
+    }
+
+    case 'panReset':
+      return state.panTimer === 0 ? state : { ...state, panTimer: 0 };
+
+    default:
+      return state;
+  }
+}
+
+// setState-style setters for code that updates a single key
+const gameSetters = dispatch => Object.fromEntries(GAME_STATE_KEYS.map(key => [
+  `set${key[0].toUpperCase()}${key.slice(1)}`,
+  update => dispatch({ type: 'set', key, update })
+]));
+
 '''
+    with profile.locate('game_store'):
+        # After the constants, whether they are being added or already there
+        store_pos = recipes.end
+        if 'CUSTOMER_TYPES' in structure.by_name:
+            store_pos = structure.declaration('CUSTOMER_TYPES').end
+            if content.startswith('\n\n', store_pos):
+                store_pos += 2
+    with profile.apply('game_store', plan):
+        ledger.plan_insert(plan, 'game_store', game_store_addition, store_pos)
+
+    # Update RECIPES to add xpReward, taking each reward from gameData.js.
+    # Entries are matched by emoji, so only emojis unique to one recipe are used.
+    with profile.locate('recipe_xp_rewards'):
+        game_data = load_game_data(game_data_for(source_file), cache)
+        by_emoji = {}
+        for recipe in game_data.recipes:
+            by_emoji.setdefault(recipe.emoji, []).append(recipe)
+        xp_rewards = [
+            (f"emoji: '{emoji}' }}", f"emoji: '{emoji}', xpReward: {matches[0].xp_reward} }}")
+            for emoji, matches in by_emoji.items()
+            if emoji and len(matches) == 1 and matches[0].xp_reward is not None
+        ]
+    with profile.apply('recipe_xp_rewards', plan):
+        ledger.plan_replacements(plan, 'recipe_xp_rewards', xp_rewards, recipes.start, recipes.end)
+
+    # The store needs useReducer, useMemo and useRef from React
+    with profile.locate('react_imports'):
+        react_import = react_import_with(content, GAME_STORE_HOOKS)
+    with profile.apply('react_imports', plan):
+        ledger.plan_replacements(plan, 'react_imports', [react_import] if react_import else [])
+
+    # The effects save the profile through systems/profileStorage.js, run
+    # their timers on systems/gameLoop.js and roll dice with systems/gameTrace.js
+    with profile.locate('profile_storage_import'):
+        imports = list(IMPORT_RE.finditer(content))
+        import_pos = imports[-1].end() - 1 if imports else 0
+    with profile.apply('profile_storage_import', plan):
+        ledger.plan_insert(plan, 'profile_storage_import', PROFILE_STORAGE_IMPORT, import_pos)
+    with profile.apply('game_loop_import', plan):
+        ledger.plan_insert(plan, 'game_loop_import', GAME_LOOP_IMPORT, import_pos)
+    with profile.apply('game_trace_import', plan):
+        ledger.plan_insert(plan, 'game_trace_import', GAME_TRACE_IMPORT, import_pos)
+
+    # STATE VARIABLES TO ADD
+    state_additions = '''
 
-    # Find where to insert state (after first useState)
-    first_usestate_line = content.find('const [activeItems, setActiveItems] = useState([]);')
-    insertion_point = content.find('\n', first_usestate_line) + 1
+  // Progression, restaurant and disaster state (see gameReducer)
+  const [game, dispatch] = useReducer(gameReducer, undefined, createGameState);
+  const {
+    playerProfile, restaurantMode, activeOrders, nextOrderId, reputation,
+    activeDisaster, panTimer, warnings, showLevelUp, levelUpData
+  } = game;
+  const {
+    setPlayerProfile, setRestaurantMode, setActiveOrders, setNextOrderId, setReputation,
+    setActiveDisaster, setPanTimer, setWarnings, setShowLevelUp, setLevelUpData
+  } = useMemo(() => gameSetters(dispatch), []);
+'''
 
-    # Insert after expandedCategory state
-    expanded_cat_line = content.find('const [expandedCategory, setExpandedCategory] = useState(null);')
-    if expanded_cat_line > 0:
-        insertion_point = content.find('\n', expanded_cat_line) + 1
+    with profile.locate('state'):
+        # Find where to insert state (after first useState)
+        first_usestate_line = anchors.find('const [activeItems, setActiveItems] = useState([]);')
+        insertion_point = content.find('\n', first_usestate_line) + 1
 
-    content = content[:insertion_point] + state_additions + content[insertion_point:]
+        # Insert after expandedCategory state
+        expanded_cat_line = anchors.find('const [expandedCategory, setExpandedCategory] = useState(null);')
+        if expanded_cat_line > 0:
+            insertion_point = content.find('\n', expanded_cat_line) + 1
+
+    with profile.apply('state', plan):
+        ledger.plan_insert(plan, 'state', state_additions, insertion_point)
 
     # FUNCTIONS TO ADD (before showNotification)
     functions_addition = '''
 
   // Gain XP and check for level up
   const gainXP = useCallback((amount, reason) => {
-    setPlayerProfile(prev => {
-      const newXP = prev.xp + amount;
-      const newTotalXP = prev.totalXP + amount;
-      const currentLevelData = CHEF_LEVELS.find(l => l.level === prev.level);
-      const nextLevelData = CHEF_LEVELS.find(l => l.level === prev.level + 1);
-
-      if (nextLevelData && newXP >= nextLevelData.xpRequired) {
-        // Level up!
-        const newLevel = prev.level + 1;
-        const unlocks = nextLevelData.unlocks || [];
-
-        setLevelUpData({
-          newLevel,
-          unlocks,
-          levelName: nextLevelData.name
-        });
-        setShowLevelUp(true);
-
-        showNotification(`🎉 Level Up! You're now a ${nextLevelData.name}!`, 'success');
-
-        return {
-          ...prev,
-          level: newLevel,
-          xp: newXP - nextLevelData.xpRequired,
-          totalXP: newTotalXP,
-          unlockedIngredients: [...prev.unlockedIngredients, ...unlocks]
-        };
-      }
-
-      return { ...prev, xp: newXP, totalXP: newTotalXP };
-    });
-  }, [showNotification]);
+    dispatch({ type: 'gainXP', amount });
+  }, []);
 
   // Create a customer order
   const createOrder = useCallback(() => {
-    if (activeOrders.length >= 3) return; // Max 3 orders at once
+    dispatch({ type: 'createOrder', rolls: [gameRandom(), gameRandom(), gameRandom()] });
+  }, []);
 
-    const customerType = CUSTOMER_TYPES[Math.floor(Math.random() * CUSTOMER_TYPES.length)];
-    const availableRecipes = Object.keys(RECIPES).filter(r =>
-      playerProfile.discoveredRecipes.includes(r)
-    );
-
-    let recipeKey = availableRecipes[Math.floor(Math.random() * availableRecipes.length)];
-
-    // Customer preferences
-    if (customerType.orders[0] !== 'any') {
-      const preferredAvailable = customerType.orders.filter(o => availableRecipes.includes(o));
-      if (preferredAvailable.length > 0) {
-        recipeKey = preferredAvailable[Math.floor(Math.random() * preferredAvailable.length)];
-      }
-    }
-
-    const order = {
-      id: nextOrderId,
-      customer: customerType,
-      recipe: recipeKey,
-      recipeName: RECIPES[recipeKey].name,
-      timeRemaining: customerType.patience,
-      maxTime: customerType.patience,
-      tipMultiplier: customerType.tipMultiplier
-    };
-
-    setActiveOrders(prev => [...prev, order]);
-    setNextOrderId(prev => prev + 1);
-    showNotification(`${customerType.emoji} New order: ${RECIPES[recipeKey].name}!`, 'info');
-  }, [activeOrders, nextOrderId, playerProfile.discoveredRecipes, showNotification]);
-
-  // Check if plate matches any active order
+  // Serve every completed dish on the plate that matches an active order
   const checkOrderMatch = useCallback((plateItems) => {
-    // Simple matching logic based on completed dishes
     const completedRecipes = plateItems.filter(item =>
       item.type === 'completedDish' || item.recipeKey
     );
 
     if (completedRecipes.length === 0) return;
-
-    completedRecipes.forEach(dish => {
-      const matchingOrder = activeOrders.find(order =>
-        order.recipe === (dish.recipeKey || dish.type)
-      );
-
-      if (matchingOrder) {
-        // Serve the order!
-        const timeBonus = matchingOrder.timeRemaining / matchingOrder.maxTime;
-        const xpReward = Math.floor((RECIPES[matchingOrder.recipe].xpReward || 20) * (1 + timeBonus) * matchingOrder.tipMultiplier);
-
-        gainXP(xpReward, 'Customer served');
-        setActiveOrders(prev => prev.filter(o => o.id !== matchingOrder.id));
-        setPlayerProfile(prev => ({
-          ...prev,
-          stats: { ...prev.stats, customersServed: prev.stats.customersServed + 1 }
-        }));
-
-        showNotification(`${matchingOrder.customer.emoji} Customer satisfied! +${xpReward} XP`, 'success');
-
-        // Remove from plate
-        setPlateItems(prev => prev.filter(item => item.id !== dish.id));
-      }
-    });
-  }, [activeOrders, gainXP, showNotification]);
+    dispatch({ type: 'serveDishes', dishes: completedRecipes });
+  }, []);
 
   // Trigger a disaster
   const triggerDisaster = useCallback((type) => {
-    if (activeDisaster) return; // Only one disaster at a time
-
-    const disasters = {
-      fire: {
-        name: 'Pan Fire!',
-        message: 'Quick! Grab the fire extinguisher!',
-        duration: 10,
-        emoji: '🔥',
-        minigame: 'extinguish'
-      },
-      overflow: {
-        name: 'Pot Overflow!',
-        message: 'Turn down the heat!',
-        duration: 8,
-        emoji: '💦',
-        minigame: 'turnoff'
-      },
-      burnt: {
-        name: 'Food Burning!',
-        message: 'Remove from heat immediately!',
-        duration: 6,
-        emoji: '🍳',
-        minigame: 'remove'
-      }
-    };
-
-    const disaster = disasters[type] || disasters.fire;
-    setActiveDisaster({ ...disaster, timeLeft: disaster.duration, type });
-    setWarnings(prev => [...prev, { id: Date.now(), message: disaster.message, type: 'error' }]);
-    showNotification(`⚠️ ${disaster.name} ${disaster.message}`, 'error');
-  }, [activeDisaster, showNotification]);
+    dispatch({ type: 'triggerDisaster', disaster: type, now: Date.now() });
+  }, []);
 
 '''
 
+    # With and without probes are two versions of one unit; the unwanted one is upgraded away
+    probed_functions = probe_hooks(functions_addition, PROBED_HOOKS)
+    with profile.apply('render_probes', plan):
+        plan_runtime(plan, ledger, content, instrument, [probed_functions])
+    if instrument:
+        functions_addition, variant = probed_functions, functions_addition
+    else:
+        variant = probed_functions
+
     # Find showNotification and insert before it
-    show_notif_pos = content.find('const showNotification = useCallback')
-    content = content[:show_notif_pos] + functions_addition + content[show_notif_pos:]
+    with profile.locate('functions'):
+        show_notif_pos = structure.hook('CookingGame', 'showNotification').start
+        functions_pos = content.rfind('\n', 0, show_notif_pos) + 1
+    with profile.apply('functions', plan):
+        ledger.plan_insert(plan, 'functions', functions_addition, functions_pos, [variant])
 
     # Add useEffect hooks (before existing useEffects or before return statement)
     useeffects_addition = '''
 
-  // Restaurant mode - spawn customers periodically
-  useEffect(() => {
-    if (!restaurantMode) return;
+  // Timers run on the shared game loop (systems/gameLoop.js): one wake-up
+  // and one render for everything due at the same moment
 
-    const interval = setInterval(() => {
-      if (Math.random() > 0.5 && activeOrders.length < 3) {
-        createOrder();
-      }
-    }, 15000); // New order every 15 seconds
-
-    return () => clearInterval(interval);
-  }, [restaurantMode, activeOrders, createOrder]);
-
-  // Order timers - countdown patience
-  useEffect(() => {
-    if (activeOrders.length === 0) return;
-
-    const interval = setInterval(() => {
-      setActiveOrders(prev => prev.map(order => {
-        const newTime = order.timeRemaining - 1;
-
-        if (newTime <= 0) {
-          showNotification(`${order.customer.emoji} Customer left unhappy!`, 'error');
-          setReputation(r => Math.max(0, r - 0.5));
-          return null;
-        }
-
-        if (newTime === 10) {
-          setWarnings(w => [...w, { id: Date.now(), message: `Customer ${order.customer.name} is getting impatient!`, type: 'warning' }]);
-        }
-
-        return { ...order, timeRemaining: newTime };
-      }).filter(Boolean));
-    }, 1000);
+  // Restaurant mode - spawn customers periodically
+  useGameLoop(15000, () => {
+    if (gameRandom() > 0.5) {
+      createOrder();
+    }
+  }, restaurantMode); // New order every 15 seconds
 
-    return () => clearInterval(interval);
-  }, [activeOrders, showNotification]);
+  // Order timers - one countdown dispatch per second for all orders
+  const hasActiveOrders = activeOrders.length > 0;
+  useGameLoop(1000, () => {
+    dispatch({ type: 'tick', now: Date.now() });
+  }, hasActiveOrders);
 
   // Pan timer for disasters
+  const panIsHot = panItems.length > 0 && panHeat;
   useEffect(() => {
-    if (panItems.length === 0 || !panHeat) {
-      setPanTimer(0);
-      return;
-    }
-
-    const interval = setInterval(() => {
-      setPanTimer(prev => {
-        const newTime = prev + 1;
-
-        if (newTime >= 30 && Math.random() > 0.7) {
-          triggerDisaster('fire');
-          return 0;
-        }
-
-        return newTime;
-      });
-    }, 1000);
-
-    return () => clearInterval(interval);
-  }, [panItems, panHeat, triggerDisaster]);
+    if (!panIsHot) dispatch({ type: 'panReset' });
+  }, [panIsHot]);
+  useGameLoop(1000, () => {
+    dispatch({ type: 'panTick', roll: gameRandom(), now: Date.now() });
+  }, panIsHot);
+
+  // Show notifications queued by the game reducer, once each
+  const shownNotificationSeq = useRef(0);
+  useEffect(() => {
+    game.notifications.forEach(({ id, message, type }) => {
+      if (id > shownNotificationSeq.current) {
+        showNotification(message, type);
+      }
+    });
+    shownNotificationSeq.current = game.notificationSeq;
+  }, [game.notifications, game.notificationSeq, showNotification]);
 
-  // Auto-save progress
+  // Take each warning down when it expires; warnings are oldest first
   useEffect(() => {
-    const saveInterval = setInterval(() => {
-      localStorage.setItem('kitchenExplorerProfile', JSON.stringify(playerProfile));
-    }, 30000); // Save every 30 seconds
+    if (warnings.length === 0) return;
+    const timeout = setTimeout(() => {
+      dispatch({ type: 'expireWarnings', now: Date.now() });
+    }, Math.max(0, warnings[0].expiresAt - Date.now()));
+    return () => clearTimeout(timeout);
+  }, [warnings]);
+
+  // Take served dishes off the plate
+  useEffect(() => {
+    if (game.servedDishIds.length === 0) return;
+    setPlateItems(prev => prev.filter(item => !game.servedDishIds.includes(item.id)));
+  }, [game.servedDishIds]);
 
-    return () => clearInterval(saveInterval);
-  }, [playerProfile]);
+  // Auto-save progress when it changes, at most every 30 seconds, while idle
+  useProfileSaver(playerProfile);
 
   // Load saved progress on mount
   useEffect(() => {
-    const saved = localStorage.getItem('kitchenExplorerProfile');
-    if (saved) {
-      try {
-        const profile = JSON.parse(saved);
+    try {
+      const profile = loadProfile();
+      if (profile) {
         setPlayerProfile(profile);
         showNotification('Welcome back, chef!', 'success');
-      } catch (e) {
-        console.error('Failed to load profile:', e);
       }
+    } catch (e) {
+      console.error('Failed to load profile:', e);
     }
   }, [showNotification]);
 
 '''
 
-    # Find the return statement and insert useEffects before it
-    return_pos = content.find('return (', show_notif_pos)
-    content = content[:return_pos] + useeffects_addition + content[return_pos:]
+    # Find the component's return statement and insert useEffects before it
+    with profile.locate('effects'):
+        component = structure.declaration('CookingGame')
+        effects_pos = content.rfind('\n', 0, component.return_offset) + 1
+    with profile.apply('effects', plan):
+        ledger.plan_insert(plan, 'effects', useeffects_addition, effects_pos)
 
     # Enhance salmon SVG (find and replace)
     salmon_enhanced = '''
@@ -400,20 +620,55 @@ const CUSTOMER_TYPES = [
     # Find and replace salmon case (simplified - just update the existing one with minor enhancements)
     # Due to complexity, we'll add a note about the SVG enhancement
 
-    # Write the enhanced file
-    write_file(source_file, content)
+    # Dry runs only report what would change
+    diff = None
+    if dry_run:
+        diff = plan_diff(plan, source_file)
+        source.close()
+
+    # Stream all planned edits to disk in a single pass
+    else:
+        digest = source.digest
+        if plan:
+            with profile.stage('write'):
+                digest = write_plan(source, plan)
+        source.close()
+        if plan or not ledger.trusted:
+            ledger.save(digest)
 
     # Return stats
+    backup_file = source_file + '.backup'
+    if os.path.exists(backup_file):
+        original = cache.text_stats(backup_file)
     return {
-        'original_size': len(read_file('C:/Dev/Kitchen_Explorer/src/CookingGame.jsx.backup')),
-        'enhanced_size': len(content),
-        'lines_added': content.count('\n') - read_file('C:/Dev/Kitchen_Explorer/src/CookingGame.jsx.backup').count('\n')
+        'original_size': original['chars'],
+        'enhanced_size': len(content) + plan.size_delta(),
+        'lines_added': content.count('\n') + plan.line_delta() - original['lines'],
+        'units': ledger.status,
+        'profile': profile.units,
+        'diff': diff
     }
 
 if __name__ == '__main__':
-    stats = enhance_game()
+    parser = argparse.ArgumentParser(description='Add progression, orders and disasters to CookingGame.jsx')
+    parser.add_argument('source_file', nargs='?', default=DEFAULT_SOURCE)
+    parser.add_argument('--dry-run', action='store_true', help='print a unified diff and patch timings, write nothing')
+    parser.add_argument('--instrument', action='store_true',
+                        help='wrap the injected callbacks in render probes; rerun without it to strip them')
+    args = parser.parse_args()
+
+    stats = enhance_game(args.source_file, dry_run=args.dry_run, instrument=args.instrument)
+    if 'skipped' in stats:
+        raise SystemExit(1)
+    if args.dry_run:
+        print(stats['diff'], end='')
+        print(format_profile(stats['profile']))
+        raise SystemExit(0)
+
     print("Enhancement Complete!")
     print(f"Original size: {stats['original_size']:,} chars")
     print(f"Enhanced size: {stats['enhanced_size']:,} chars")
     print(f"Lines added: {stats['lines_added']}")
+    for name, status in stats['units'].items():
+        print(f"  {name}: {status}")
     print("\nBackup saved to: CookingGame.jsx.backup")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Compact, indexed view of src/data/gameData.js for the Python tooling.
+
+The exported object literals (INGREDIENTS, RECIPES, CHEF_LEVELS,
+STARTER_INGREDIENTS, INGREDIENT_UNLOCKS, CUSTOMER_TYPES) are parsed once
+from the token stream into small __slots__ records with integer IDs.
+Lookups by key, category, state, unlock level and ingredient are
+precomputed dicts, so questions like "which ingredients unlock at level
+3" or "which recipes use salmon" need no scanning. The parsed result is
+stored in the patch cache, keyed by the hash of the file, so later runs
+load it from disk without re-reading the JS.
+
+    python game_data.py --unlocks 3
+    python game_data.py --uses salmon
+"""
+
+import argparse
+import ast
+import os
+import sys
+from bisect import bisect_right
+
+from jsx_structure import ScanError, tokenize
+from patch_cache import PatchCache, content_hash
+
+DEFAULT_GAME_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'data', 'gameData.js')
+
+EXPORTS = ('INGREDIENTS', 'RECIPES', 'CHEF_LEVELS', 'STARTER_INGREDIENTS', 'INGREDIENT_UNLOCKS', 'CUSTOMER_TYPES')
+
+LITERAL_IDENTS = {'true': True, 'false': False, 'null': None, 'undefined': None}
+
+
+class GameDataError(ValueError):
+    pass
+
+
+class Ingredient:
+    __slots__ = ('id', 'key', 'name', 'category', 'states', 'unlock_level')
+
+    def __init__(self, id, key, name, category, states, unlock_level):
+        self.id = id
+        self.key = key
+        self.name = name
+        self.category = category
+        self.states = states
+        self.unlock_level = unlock_level  # None when nothing unlocks it
+
+    def __repr__(self):
+        return f'Ingredient({self.id}, {self.key!r})'
+
+
+class Recipe:
+    __slots__ = ('id', 'key', 'name', 'description', 'required', 'optional', 'action', 'emoji', 'xp_reward')
+
+    def __init__(self, id, key, name, description, required, optional, action, emoji, xp_reward):
+        self.id = id
+        self.key = key
+        self.name = name
+        self.description = description
+        self.required = required  # ((ingredient id, state), ...)
+        self.optional = optional  # (ingredient id, ...)
+        self.action = action
+        self.emoji = emoji
+        self.xp_reward = xp_reward
+
+    def __repr__(self):
+        return f'Recipe({self.id}, {self.key!r})'
+
+
+class ChefLevel:
+    __slots__ = ('level', 'title', 'xp_required', 'unlocks_message')
+
+    def __init__(self, level, title, xp_required, unlocks_message):
+        self.level = level
+        self.title = title
+        self.xp_required = xp_required
+        self.unlocks_message = unlocks_message
+
+    def __repr__(self):
+        return f'ChefLevel({self.level}, {self.title!r})'
+
+
+class CustomerType:
+    __slots__ = ('id', 'key', 'name', 'patience', 'tip_multiplier', 'emoji', 'color', 'probability',
+                 'unlock_level', 'forgiving', 'any_order', 'preferred_dishes')
+
+    def __init__(self, id, key, name, patience, tip_multiplier, emoji, color, probability,
+                 unlock_level, forgiving, any_order, preferred_dishes):
+        self.id = id
+        self.key = key
+        self.name = name
+        self.patience = patience
+        self.tip_multiplier = tip_multiplier
+        self.emoji = emoji
+        self.color = color
+        self.probability = probability
+        self.unlock_level = unlock_level
+        self.forgiving = forgiving
+        self.any_order = any_order
+        self.preferred_dishes = preferred_dishes  # (recipe id, ...)
+
+    def __repr__(self):
+        return f'CustomerType({self.id}, {self.key!r})'
+
+
+def _line_of(text, offset):
+    return text.count('\n', 0, offset) + 1
+
+
+def _parse_value(text, tokens, i):
+    # Parse the JS literal starting at tokens[i]; returns (value, next index)
+    token = tokens[i]
+    if token.kind == 'string':
+        return sys.intern(ast.literal_eval(token.value)), i + 1
+    if token.kind == 'number':
+        return (float(token.value) if '.' in token.value else int(token.value, 0)), i + 1
+    if token.kind == 'ident' and token.value in LITERAL_IDENTS:
+        return LITERAL_IDENTS[token.value], i + 1
+    if token.value == '-' and tokens[i + 1].kind == 'number':
+        value, i = _parse_value(text, tokens, i + 1)
+        return -value, i
+    if token.value == '[':
+        items = []
+        i += 1
+        while tokens[i].value != ']':
+            value, i = _parse_value(text, tokens, i)
+            items.append(value)
+            if tokens[i].value == ',':
+                i += 1
+        return items, i + 1
+    if token.value == '{':
+        fields = {}
+        i += 1
+        while tokens[i].value != '}':
+            key = tokens[i]
+            if key.kind not in ('ident', 'string', 'number') or tokens[i + 1].value != ':':
+                raise GameDataError(f'Unsupported object entry {key.value!r} at line {_line_of(text, key.start)}')
+            name = ast.literal_eval(key.value) if key.kind == 'string' else key.value
+            fields[sys.intern(str(name))], i = _parse_value(text, tokens, i + 2)
+            if tokens[i].value == ',':
+                i += 1
+        return fields, i + 1
+    raise GameDataError(f'Unsupported expression {token.value!r} at line {_line_of(text, token.start)}')
+
+
+def parse_exports(text, names=EXPORTS):
+    # {name: value} for every top-level `const NAME = <literal>` in `names`
+    try:
+        tokens = [t for t in tokenize(text) if t.kind not in ('ws', 'comment')]
+    except ScanError as e:
+        raise GameDataError(str(e)) from None
+    values = {}
+    for i, token in enumerate(tokens):
+        if (token.depth == 0 and token.kind == 'ident' and token.value == 'const'
+                and tokens[i + 1].value in names and tokens[i + 2].value == '='):
+            values[tokens[i + 1].value] = _parse_value(text, tokens, i + 3)[0]
+    missing = [name for name in names if name not in values]
+    if missing:
+        raise GameDataError(f"Missing export(s): {', '.join(missing)}")
+    return values
+
+
+def _index(records, key_fn):
+    index = {}
+    for record in records:
+        for key in key_fn(record):
+            index.setdefault(key, []).append(record.id)
+    return {key: tuple(ids) for key, ids in index.items()}
+
+
+class GameData:
+    def __init__(self, values):
+        starters = set(values['STARTER_INGREDIENTS'])
+        unlock_levels = {key: int(level) for level, keys in values['INGREDIENT_UNLOCKS'].items() for key in keys}
+
+        self.ingredients = []
+        self.ingredient_ids = {}
+        for key, fields in values['INGREDIENTS'].items():
+            level = 1 if key in starters else unlock_levels.get(key)
+            record = Ingredient(len(self.ingredients), key, fields['name'], fields['category'],
+                                tuple(fields.get('states', ())), level)
+            self.ingredients.append(record)
+            self.ingredient_ids[key] = record.id
+
+        self.recipes = []
+        self.recipe_ids = {}
+        for key, fields in values['RECIPES'].items():
+            required = tuple((self._ingredient_id(item['ingredient'], key), item['state'])
+                             for item in fields.get('required', ()))
+            optional = tuple(self._ingredient_id(item, key) for item in fields.get('optional', ()))
+            record = Recipe(len(self.recipes), key, fields['name'], fields.get('description'), required,
+                            optional, fields.get('action'), fields.get('emoji'), fields.get('xpReward'))
+            self.recipes.append(record)
+            self.recipe_ids[key] = record.id
+
+        self.chef_levels = [ChefLevel(fields['level'], fields['title'], fields['xpRequired'],
+                                      fields.get('unlocksMessage'))
+                            for fields in sorted(values['CHEF_LEVELS'], key=lambda f: f['xpRequired'])]
+        self._xp_thresholds = [level.xp_required for level in self.chef_levels]
+
+        self.customer_types = []
+        self.customer_ids = {}
+        for key, fields in values['CUSTOMER_TYPES'].items():
+            orders = fields.get('orders', ())
+            record = CustomerType(len(self.customer_types), key, fields['name'], fields['patience'],
+                                  fields['tipMultiplier'], fields.get('emoji'), fields.get('color'),
+                                  fields.get('probability', 0.0), fields.get('unlockLevel', 1),
+                                  bool(fields.get('forgiving')), 'any' in orders,
+                                  tuple(self.recipe_ids[dish] for dish in fields.get('preferredDishes', ())))
+            self.customer_types.append(record)
+            self.customer_ids[key] = record.id
+
+        self.starter_ingredients = tuple(self.ingredient_ids[key] for key in values['STARTER_INGREDIENTS'])
+
+        # Precomputed lookups; every value is a tuple of record IDs
+        self.by_category = _index(self.ingredients, lambda r: (r.category,))
+        self.by_state = _index(self.ingredients, lambda r: r.states)
+        self.by_unlock_level = _index(self.ingredients, lambda r: () if r.unlock_level is None else (r.unlock_level,))
+        self.recipes_by_ingredient = _index(
+            self.recipes, lambda r: dict.fromkeys([i for i, _ in r.required] + list(r.optional)))
+        self.recipes_by_action = _index(self.recipes, lambda r: (r.action,))
+        self.customers_by_unlock_level = _index(self.customer_types, lambda r: (r.unlock_level,))
+
+    def _ingredient_id(self, key, recipe_key):
+        try:
+            return self.ingredient_ids[key]
+        except KeyError:
+            raise GameDataError(f'Recipe {recipe_key!r} uses unknown ingredient {key!r}') from None
+
+    def ingredient(self, key):
+        return self.ingredients[self.ingredient_ids[key]]
+
+    def recipe(self, key):
+        return self.recipes[self.recipe_ids[key]]
+
+    def customer_type(self, key):
+        return self.customer_types[self.customer_ids[key]]
+
+    def unlocked_at(self, level):
+        # Ingredients that become available exactly at `level`
+        return [self.ingredients[i] for i in self.by_unlock_level.get(level, ())]
+
+    def recipes_using(self, ingredient_key):
+        ingredient_id = self.ingredient_ids.get(ingredient_key)
+        return [self.recipes[i] for i in self.recipes_by_ingredient.get(ingredient_id, ())]
+
+    def in_category(self, category):
+        return [self.ingredients[i] for i in self.by_category.get(category, ())]
+
+    def with_state(self, state):
+        return [self.ingredients[i] for i in self.by_state.get(state, ())]
+
+    def level_for_xp(self, xp):
+        return self.chef_levels[max(0, bisect_right(self._xp_thresholds, xp) - 1)]
+
+
+def load_game_data(path=DEFAULT_GAME_DATA, cache=None):
+    # Parsed records come from the patch cache while gameData.js is unchanged
+    cache = cache or PatchCache()
+    with open(path, 'rb') as f:
+        data = f.read()
+    key = content_hash(data)
+    game_data = cache.get('game_data', key)
+    if game_data is None:
+        game_data = GameData(parse_exports(data.decode('utf-8')))
+        cache.put('game_data', key, game_data)
+    return game_data
+
+
+def game_data_for(source_file):
+    # The gameData.js next to a patch target, else the one in this checkout
+    path = os.path.join(os.path.dirname(os.path.abspath(source_file)), 'data', 'gameData.js')
+    return path if os.path.exists(path) else DEFAULT_GAME_DATA
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data', default=DEFAULT_GAME_DATA, help='path to gameData.js')
+    parser.add_argument('--unlocks', type=int, metavar='LEVEL', help='ingredients unlocked at a chef level')
+    parser.add_argument('--uses', metavar='INGREDIENT', help='recipes that use an ingredient')
+    parser.add_argument('--category', help='ingredients in a category')
+    parser.add_argument('--state', help='ingredients that can be in a state')
+    args = parser.parse_args(argv)
+
+    game_data = load_game_data(args.data)
+    if args.unlocks is not None:
+        print(' '.join(r.key for r in game_data.unlocked_at(args.unlocks)))
+    elif args.uses:
+        print(' '.join(r.key for r in game_data.recipes_using(args.uses)))
+    elif args.category:
+        print(' '.join(r.key for r in game_data.in_category(args.category)))
+    elif args.state:
+        print(' '.join(r.key for r in game_data.with_state(args.state)))
+    else:
+        print(f'{len(game_data.ingredients)} ingredients in {len(game_data.by_category)} categories, '
+              f'{len(game_data.recipes)} recipes, {len(game_data.chef_levels)} chef levels, '
+              f'{len(game_data.customer_types)} customer types')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
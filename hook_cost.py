@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Static analyzer for React hook churn in components and custom hooks.
+
+Built on the structural map the patch scripts use. For every function
+component and custom hook it finds:
+
+  interval-churn   an effect owning a setInterval/setTimeout whose
+                   dependencies change on a timer tick, so the timer is
+                   torn down and recreated on every tick. A timer slower
+                   than the tick that resets it never fires at all.
+  effect-loop      an effect that sets state it depends on outside any
+                   timer, so every run schedules another run.
+  callback-churn   a useCallback/useMemo whose dependencies change on a
+                   timer tick (or that sets state it depends on), so its
+                   identity, and every hook that depends on it, changes
+                   with each tick.
+
+Dependencies are expanded through local useCallback/useMemo bindings,
+and timer callbacks are followed into the local callbacks they call.
+Tasks on the shared game loop (`useGameLoop(ms, callback, ...)`) tick
+like a setInterval of the same period.
+Findings are ranked by estimated re-subscriptions per minute. A
+dependency on a derived value such as `orders.length` only changes when
+that value does, so its estimate is an upper bound and ranks below exact
+matches.
+
+    python hook_cost.py src
+    python hook_cost.py patched/CookingGame.jsx --max-rate 10
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+from patch_cache import PatchCache
+
+EFFECT_HOOKS = {'useEffect', 'useLayoutEffect', 'useInsertionEffect'}
+MEMO_HOOKS = {'useCallback', 'useMemo'}
+LOOP_HOOKS = {'useGameLoop'}
+STATE_BINDING_RE = re.compile(r'^\[\s*([\w$]+)\s*,\s*([\w$]+)\s*\]$')
+TIMER_RE = re.compile(r'\b(setInterval|setTimeout)\s*\(')
+DELAY_RE = re.compile(r',\s*(\d[\d_]*)\s*,?\s*$')
+LOOP_DELAY_RE = re.compile(r'\(\s*(\d[\d_]*)\s*,')
+DEP_ROOT_RE = re.compile(r'^[\w$]+')
+FUNCTION_RE = re.compile(r'=>\s*|\bfunction\b[\w$\s]*\([^)]*\)\s*')
+SOURCE_EXTENSIONS = ('.js', '.jsx')
+
+Finding = namedtuple('Finding', [
+    'kind',      # interval-churn | effect-loop | callback-churn
+    'path',
+    'line',
+    'function',  # component or custom hook
+    'hook',      # useEffect, or the useCallback/useMemo binding
+    'per_minute',  # estimated re-subscriptions per minute, None if per run or call
+    'exact',     # False when only derived values (x.length) are involved
+    'reason',
+])
+
+# A state updated on a timer: which timer, how often, via which setter
+Tick = namedtuple('Tick', ['delay', 'line', 'setter'])
+
+
+def _dep_roots(dep_names):
+    # {root identifier: exact}; `a.length` and `a?.b` depend on `a` inexactly
+    roots = {}
+    for dep in dep_names:
+        match = DEP_ROOT_RE.match(dep)
+        if match:
+            exact = match.end() == len(dep)
+            roots[match.group()] = roots.get(match.group(), False) or exact
+    return roots
+
+
+def _calls(text, start, end, names, skip=()):
+    # Names in `names` called in text[start:end], outside the `skip` ranges
+    if not names:
+        return set()
+    pattern = re.compile(r'(?<![\w$.])(' + '|'.join(re.escape(n) for n in sorted(names)) + r')\s*\(')
+    return {m.group(1) for m in pattern.finditer(text, start, end)
+            if not any(s <= m.start() < e for s, e in skip)}
+
+
+def _function_bodies(structure, start, end):
+    # (start, end) of every arrow or function body in text[start:end], outermost first
+    text = structure.text
+    bodies = []
+    for match in FUNCTION_RE.finditer(text, start, end):
+        pos = match.end()
+        if pos in structure.pairs and text[pos] in '{(':
+            bodies.append((pos, structure.pairs[pos]))
+        elif match.group().startswith('=>'):
+            # Concise arrow body: up to the end of the statement or line
+            stop = re.compile(r'[;\n]').search(text, pos, end)
+            bodies.append((pos, stop.start() if stop else end))
+    return bodies
+
+
+class FunctionHooks:
+    """Hook facts for one component or custom hook."""
+
+    def __init__(self, structure, declaration):
+        text = structure.text
+        self.structure = structure
+        self.name = declaration.name
+        self.setters = {}    # setter -> state
+        self.memos = {}      # binding -> Hook
+        self.effects = []
+        self.loops = []
+        for hook in declaration.hooks:
+            if hook.name in ('useState', 'useReducer') and hook.binding:
+                match = STATE_BINDING_RE.match(hook.binding)
+                if match:
+                    self.setters[match.group(2)] = match.group(1)
+            elif hook.name in MEMO_HOOKS and hook.binding:
+                self.memos[hook.binding] = hook
+            elif hook.name in EFFECT_HOOKS:
+                self.effects.append(hook)
+            elif hook.name in LOOP_HOOKS:
+                self.loops.append(hook)
+
+        # Setters each memoized callback reaches, directly or through other callbacks
+        direct = {name: _calls(text, hook.call[0], hook.call[1], set(self.setters) | set(self.memos))
+                  for name, hook in self.memos.items()}
+        self.reaches = {}
+        for name in self.memos:
+            seen, stack, setters = {name}, [name], set()
+            while stack:
+                for callee in direct[stack.pop()]:
+                    if callee in self.setters:
+                        setters.add(callee)
+                    elif callee not in seen:
+                        seen.add(callee)
+                        stack.append(callee)
+            self.reaches[name] = setters
+
+    def setters_called(self, start, end, skip=()):
+        # Setters reached from text[start:end], following local callbacks
+        text = self.structure.text
+        found = set()
+        for name in _calls(text, start, end, set(self.setters) | set(self.memos), skip):
+            found |= self.reaches.get(name, {name})
+        return found
+
+    def expanded_deps(self, hook, seen=None):
+        # {state or prop name: exact}, looking through memoized bindings
+        seen = seen or set()
+        roots = {}
+        for root, exact in _dep_roots(hook.dep_names).items():
+            if root in self.memos and root not in seen:
+                seen.add(root)
+                for inner, inner_exact in self.expanded_deps(self.memos[root], seen).items():
+                    roots[inner] = roots.get(inner, False) or (exact and inner_exact)
+            else:
+                roots[root] = roots.get(root, False) or exact
+        return roots
+
+    def timers(self, hook):
+        # (kind, delay ms or None, callback start, callback end, offset) per timer in the hook
+        text = self.structure.text
+        found = []
+        for match in TIMER_RE.finditer(text, hook.call[0], hook.call[1]):
+            open_paren = match.end() - 1
+            close_paren = self.structure.pairs.get(open_paren)
+            if close_paren is None:
+                continue
+            delay = DELAY_RE.search(text[open_paren + 1:close_paren])
+            found.append((match.group(1), int(delay.group(1).replace('_', '')) if delay else None,
+                          open_paren + 1, close_paren, match.start()))
+        return found
+
+    def ticks(self):
+        # {state: fastest Tick updating it} for states set from setInterval
+        # callbacks or game loop tasks; one-shot timeouts are not ticks
+        periodic = []
+        for hook in self.effects:
+            periodic.extend((delay, start, end, offset) for kind, delay, start, end, offset in self.timers(hook)
+                            if kind == 'setInterval' and delay is not None)
+        for hook in self.loops:
+            delay = LOOP_DELAY_RE.match(self.structure.text, hook.call[0])
+            if delay:
+                periodic.append((int(delay.group(1).replace('_', '')), hook.call[0], hook.call[1], hook.start))
+
+        updated = {}
+        for delay, start, end, offset in periodic:
+            for setter in self.setters_called(start, end):
+                state = self.setters[setter]
+                if state not in updated or delay < updated[state].delay:
+                    updated[state] = Tick(delay, self.structure.line_of(offset), setter)
+        return updated
+
+
+def _churn(deps, ticks):
+    # Fastest tick among the dependencies: (tick, state, exact) or None
+    best = None
+    for state, exact in deps.items():
+        tick = ticks.get(state)
+        if tick and (best is None or (exact, -tick.delay) > (best[2], -best[0].delay)):
+            best = (tick, state, exact)
+    return best
+
+
+def analyze_function(path, structure, declaration):
+    hooks = FunctionHooks(structure, declaration)
+    ticks = hooks.ticks()
+    findings = []
+
+    def finding(kind, hook, per_minute, exact, reason):
+        findings.append(Finding(kind, path, structure.line_of(hook.start), hooks.name,
+                                hook.binding if hook.name in MEMO_HOOKS else hook.name, per_minute, exact, reason))
+
+    for hook in hooks.effects:
+        if hook.deps is None:
+            continue
+        deps = hooks.expanded_deps(hook)
+        timers = hooks.timers(hook)
+        churn = _churn(deps, ticks)
+        if timers and churn:
+            tick, state, exact = churn
+            delay = min((t[1] for t in timers if t[1] is not None), default=None)
+            reason = (f'depends on {state}, which {tick.setter}() updates every {tick.delay} ms '
+                      f'(timer at line {tick.line})')
+            if delay is not None and delay > tick.delay:
+                reason += f'; its own {delay} ms timer is reset before it can fire'
+            finding('interval-churn', hook, 60000 / tick.delay, exact, reason)
+            continue
+
+        # Setters the effect calls as it runs, not from timers or handlers it installs
+        bodies = _function_bodies(structure, hook.call[0], hook.call[1])
+        if not bodies:
+            continue
+        run = hooks.setters_called(bodies[0][0], bodies[0][1], bodies[1:])
+        looped = sorted(hooks.setters[s] for s in run if hooks.setters[s] in deps)
+        if looped:
+            exact = any(deps[state] for state in looped)
+            finding('effect-loop', hook, None, exact,
+                    f"sets {', '.join(looped)} that it depends on; each run can schedule another")
+
+    for name, hook in hooks.memos.items():
+        if hook.deps is None:
+            continue
+        deps = hooks.expanded_deps(hook)
+        churn = _churn(deps, ticks)
+        own = sorted(hooks.setters[s] for s in hooks.reaches[name] if hooks.setters[s] in _dep_roots(hook.dep_names))
+        if churn:
+            tick, state, exact = churn
+            reason = f'depends on {state}, which {tick.setter}() updates every {tick.delay} ms (timer at line {tick.line})'
+            if own:
+                reason += f"; also sets {', '.join(own)} that it depends on"
+            finding('callback-churn', hook, 60000 / tick.delay, exact, reason)
+        elif own:
+            finding('callback-churn', hook, None, any(deps.get(state) for state in own),
+                    f"sets {', '.join(own)} that it depends on, so it is recreated after every call")
+    return findings
+
+
+def analyze(paths, cache=None):
+    cache = cache or PatchCache()
+    findings = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        structure = cache.structure(text)
+        for declaration in structure.components + structure.custom_hooks:
+            findings.extend(analyze_function(path, structure, declaration))
+    return rank(findings)
+
+
+def _bucket(finding):
+    # Render loops, then timer-driven churn, then churn on every call
+    if finding.per_minute is not None:
+        return 1
+    return 0 if finding.kind == 'effect-loop' else 2
+
+
+def rank(findings):
+    # Exact matches first, then by bucket and rate
+    order = {'effect-loop': 0, 'interval-churn': 1, 'callback-churn': 2}
+    return sorted(findings, key=lambda f: (not f.exact, _bucket(f), -(f.per_minute or 0),
+                                           order[f.kind], f.path, f.line))
+
+
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, '**', '*'), recursive=True))
+            paths.extend(p for p in matches if p.endswith(SOURCE_EXTENSIONS) and os.path.isfile(p))
+        elif glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def print_report(findings):
+    if not findings:
+        print('No hook churn found.')
+        return
+    print(f"{'#':>3} {'per min':>8}  {'kind':15} location")
+    for i, f in enumerate(findings, 1):
+        rate = f'{f.per_minute:.0f}' if f.per_minute is not None else ('loop' if _bucket(f) == 0 else 'call')
+        if not f.exact:
+            rate = '<=' + rate
+        print(f'{i:3} {rate:>8}  {f.kind:15} {f.path}:{f.line}  {f.function} > {f.hook}')
+        print(f'{"":29}{f.reason}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', default=['src'], help='files, directories or globs (default: src)')
+    parser.add_argument('--json', dest='json_path', help='also write the findings as JSON')
+    parser.add_argument('--max-rate', type=float,
+                        help='exit with status 1 if an exact finding re-subscribes more often than this per minute, '
+                             'or loops')
+    args = parser.parse_args(argv)
+
+    findings = analyze(expand_paths(args.paths))
+    print_report(findings)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump([f._asdict() for f in findings], f, indent=2)
+
+    if args.max_rate is not None:
+        over = [f for f in findings if f.exact and (f.per_minute is None or f.per_minute > args.max_rate)]
+        return 1 if over else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
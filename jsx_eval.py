@@ -0,0 +1,1035 @@
+"""
+Build-time evaluator for the small subset of JS/JSX that render code uses.
+
+Parses one top-level statement (a component, a constant) from the
+jsx_structure token stream into plain tuples and runs it against given
+globals. Supported: const/let destructuring, if/else, switch with
+fallthrough, arrow functions, ternaries, short-circuit operators, template
+literals, object/array literals with spreads, optional chaining, the
+common Array/String methods and Math. JSX evaluates to Element tuples;
+components are not called, they stay Elements with a capitalized tag.
+
+Anything else (loops, assignment, `new`, Math.random(), unknown names)
+raises Unsupported instead of guessing, so callers can fall back to
+leaving that code alone. Assignment, `new`, `await` and try/throw still
+parse, so free_names() can report what a block of code refers to before
+it is moved somewhere else.
+"""
+
+import ast
+import math
+import re
+from collections import namedtuple
+
+from jsx_structure import tokenize
+
+Element = namedtuple('Element', ['tag', 'attrs', 'children'])  # tag is None for fragments
+
+EXPONENT_RE = re.compile(r'e([+-])0*(\d)')
+
+
+class Unsupported(ValueError):
+    """Code the evaluator cannot run at build time."""
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def js_str(value):
+    if value is None:
+        return 'undefined'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if is_number(value):
+        if value != value:
+            return 'NaN'
+        if math.isinf(value):
+            return 'Infinity' if value > 0 else '-Infinity'
+        if float(value).is_integer() and abs(value) < 1e21:
+            return str(int(value))
+        return EXPONENT_RE.sub(r'e\1\2', repr(float(value)))
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return ','.join('' if item is None else js_str(item) for item in value)
+    raise Unsupported(f'cannot convert {type(value).__name__} to a string')
+
+
+def truthy(value):
+    if value is None or value is False:
+        return False
+    if is_number(value):
+        return value != 0 and value == value
+    if isinstance(value, str):
+        return value != ''
+    return True
+
+
+def strict_equal(a, b):
+    if is_number(a) and is_number(b):
+        return a == b
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, (str, bool)) or a is None:
+        return a == b
+    return a is b
+
+
+def _number(value):
+    if is_number(value):
+        return value
+    if value is None:
+        return float('nan')
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip() or 0)
+        except ValueError:
+            return float('nan')
+    raise Unsupported(f'cannot convert {type(value).__name__} to a number')
+
+
+def _index(value):
+    number = _number(value)
+    return int(number) if number == number else 0
+
+
+def _slice_bounds(length, start=None, end=None):
+    start = 0 if start is None else _index(start)
+    end = length if end is None else _index(end)
+    start = max(length + start, 0) if start < 0 else min(start, length)
+    end = max(length + end, 0) if end < 0 else min(end, length)
+    return start, end
+
+
+def _js_round(value):
+    return math.floor(_number(value) + 0.5)
+
+
+def _no_randomness(*args):
+    raise Unsupported('uses Math.random()')
+
+
+MATH = {
+    'PI': math.pi, 'E': math.e,
+    'floor': lambda x: math.floor(_number(x)), 'ceil': lambda x: math.ceil(_number(x)),
+    'round': _js_round, 'abs': lambda x: abs(_number(x)), 'sqrt': lambda x: math.sqrt(_number(x)),
+    'sin': lambda x: math.sin(_number(x)), 'cos': lambda x: math.cos(_number(x)),
+    'min': lambda *xs: min(map(_number, xs), default=math.inf),
+    'max': lambda *xs: max(map(_number, xs), default=-math.inf),
+    'pow': lambda x, y: _number(x) ** _number(y), 'random': _no_randomness,
+}
+
+
+def _array_from(source, fn=None):
+    items = list(source) if isinstance(source, (list, str)) else [None] * _index(source.get('length', 0))
+    return [fn(item, i) for i, item in enumerate(items)] if fn else items
+
+
+class _ArrayGlobal(dict):
+    # `Array(n)` makes n empty slots; `Array.from` and `Array.isArray` are its fields
+    def __call__(self, length=0):
+        return [None] * _index(length)
+
+
+GLOBALS = {
+    'Math': MATH,
+    'Object': {'keys': lambda o: list(o), 'values': lambda o: list(o.values()),
+               'entries': lambda o: [[k, v] for k, v in o.items()]},
+    'Array': _ArrayGlobal({'from': _array_from, 'isArray': lambda v: isinstance(v, list)}),
+    'String': lambda value='': js_str(value),
+    'Number': lambda value=0: _number(value),
+    'Boolean': lambda value=None: truthy(value),
+}
+
+
+def _array_method(items, name):
+    methods = {
+        'map': lambda fn: [fn(item, i, items) for i, item in enumerate(items)],
+        'filter': lambda fn: [item for i, item in enumerate(items) if truthy(fn(item, i, items))],
+        'some': lambda fn: any(truthy(fn(item, i, items)) for i, item in enumerate(items)),
+        'every': lambda fn: all(truthy(fn(item, i, items)) for i, item in enumerate(items)),
+        'find': lambda fn: next((item for i, item in enumerate(items) if truthy(fn(item, i, items))), None),
+        'includes': lambda value: any(strict_equal(item, value) for item in items),
+        'indexOf': lambda value: next((i for i, item in enumerate(items) if strict_equal(item, value)), -1),
+        'slice': lambda start=None, end=None: items[slice(*_slice_bounds(len(items), start, end))],
+        'join': lambda sep=',': js_str(sep).join('' if item is None else js_str(item) for item in items),
+        'concat': lambda *more: items + [x for m in more for x in (m if isinstance(m, list) else [m])],
+        'fill': lambda value: [value] * len(items),
+        'reduce': lambda fn, *initial: _reduce(items, fn, initial),
+    }
+    if name not in methods:
+        raise Unsupported(f'array method .{name}()')
+    return methods[name]
+
+
+def _reduce(items, fn, initial):
+    items = list(enumerate(items))
+    if initial:
+        accumulator = initial[0]
+    elif items:
+        accumulator = items.pop(0)[1]
+    else:
+        raise Unsupported('reduce of an empty array')
+    for i, item in items:
+        accumulator = fn(accumulator, item, i)
+    return accumulator
+
+
+def _string_method(text, name):
+    methods = {
+        'charAt': lambda i=0: text[_index(i)] if 0 <= _index(i) < len(text) else '',
+        'toUpperCase': text.upper, 'toLowerCase': text.lower, 'trim': text.strip,
+        'includes': lambda part: js_str(part) in text,
+        'startsWith': lambda part: text.startswith(js_str(part)),
+        'endsWith': lambda part: text.endswith(js_str(part)),
+        'slice': lambda start=None, end=None: text[slice(*_slice_bounds(len(text), start, end))],
+        'split': lambda sep=None: [text] if sep is None else (list(text) if sep == '' else text.split(js_str(sep))),
+        'repeat': lambda count: text * _index(count),
+        'padStart': lambda width, fill=' ': text.rjust(_index(width), js_str(fill)[:1] or ' '),
+        'replace': lambda old, new: text.replace(js_str(old), js_str(new), 1),
+    }
+    if name not in methods:
+        raise Unsupported(f'string method .{name}()')
+    return methods[name]
+
+
+def get_member(value, key):
+    if isinstance(value, dict):
+        return value.get(js_str(key) if not isinstance(key, str) else key)
+    if isinstance(value, list):
+        if key == 'length':
+            return len(value)
+        if is_number(key):
+            return value[int(key)] if 0 <= key < len(value) and float(key).is_integer() else None
+        return _array_method(value, key)
+    if isinstance(value, str):
+        if key == 'length':
+            return len(value)
+        if is_number(key):
+            return value[int(key)] if 0 <= key < len(value) else None
+        return _string_method(value, key)
+    if value is None:
+        raise Unsupported(f'reads .{js_str(key)} of undefined')
+    raise Unsupported(f'reads .{js_str(key)} of a {type(value).__name__}')
+
+
+class Scope:
+    __slots__ = ('names', 'parent')
+
+    def __init__(self, names=None, parent=None):
+        self.names = names or {}
+        self.parent = parent
+
+    def lookup(self, name):
+        scope = self
+        while scope is not None:
+            if name in scope.names:
+                return scope.names[name]
+            scope = scope.parent
+        raise Unsupported(f'uses {name!r}, which is not defined at build time')
+
+
+class _Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+class _Break(Exception):
+    pass
+
+
+class JsFunction:
+    def __init__(self, params, body, scope, evaluator):
+        self.params = params
+        self.body = body  # ('block', statements) or an expression node
+        self.scope = scope
+        self.evaluator = evaluator
+
+    def __call__(self, *args):
+        scope = Scope({}, self.scope)
+        for i, param in enumerate(self.params):
+            self.evaluator.bind(param, args[i] if i < len(args) else None, scope)
+        if self.body[0] != 'block':
+            return self.evaluator.eval(self.body, scope)
+        try:
+            self.evaluator.exec_block(self.body[1], scope)
+        except _Return as result:
+            return result.value
+        return None
+
+
+ASSIGNMENT_OPS = {'=', '+=', '-=', '*=', '/=', '%=', '**=', '&&=', '||=', '??='}
+BINARY_PRECEDENCE = {
+    '??': 1, '||': 2, '&&': 3,
+    '==': 6, '!=': 6, '===': 6, '!==': 6,
+    '<': 7, '>': 7, '<=': 7, '>=': 7,
+    '+': 8, '-': 8, '*': 9, '/': 9, '%': 9,
+}
+EOF = ('eof', '')
+
+
+def _jsx_text(text):
+    # React's JSX whitespace rule: trim around line breaks, drop blank lines
+    lines = re.split(r'\r\n|\n|\r', text)
+    if len(lines) == 1:
+        return text
+    kept = []
+    for i, line in enumerate(lines):
+        if i > 0:
+            line = line.lstrip(' \t')
+        if i < len(lines) - 1:
+            line = line.rstrip(' \t')
+        if line:
+            kept.append(line)
+    return ' '.join(kept)
+
+
+class Parser:
+    def __init__(self, text, tokens, first_line=1):
+        self.text = text
+        self.tokens = tokens
+        self.first_line = first_line
+        self.i = 0
+        self.pairs = {}
+        stack = []
+        for index, token in enumerate(tokens):
+            if token.kind == 'punct':
+                if token.value in ('(', '[', '{', '${'):
+                    stack.append(index)
+                elif token.value in (')', ']', '}'):
+                    self.pairs[stack.pop()] = index
+
+    def error(self, message):
+        token = self.tokens[min(self.i, len(self.tokens) - 1)]
+        line = self.text.count('\n', 0, token.start) + self.first_line
+        return Unsupported(f'{message} at line {line}')
+
+    def peek(self, offset=0):
+        index = self.i + offset
+        if index < len(self.tokens):
+            token = self.tokens[index]
+            return token.kind, token.value
+        return EOF
+
+    def at(self, value, offset=0):
+        kind, token_value = self.peek(offset)
+        return token_value == value and kind in ('punct', 'ident')
+
+    def take(self, value=None):
+        kind, token_value = self.peek()
+        if value is not None and (token_value != value or kind not in ('punct', 'ident')):
+            raise self.error(f'expected {value!r}, found {token_value!r}')
+        self.i += 1
+        return self.tokens[self.i - 1]
+
+    def skip(self, value):
+        if self.at(value):
+            self.i += 1
+            return True
+        return False
+
+    # Statements
+
+    def statement(self):
+        kind, value = self.peek()
+        if kind == 'ident' and value == 'export':
+            self.i += 1
+            return self.statement()
+        if kind == 'punct' and value == '{':
+            return ('block', self.block())
+        if kind == 'punct' and value == ';':
+            self.i += 1
+            return ('empty',)
+        if kind == 'ident' and value in ('const', 'let', 'var'):
+            self.i += 1
+            declarations = []
+            while True:
+                target = self.pattern()
+                init = None
+                if self.skip('='):
+                    init = self.assignment()
+                declarations.append((target, init))
+                if not self.skip(','):
+                    break
+            self.skip(';')
+            return ('declare', declarations)
+        if kind == 'ident' and value == 'if':
+            self.i += 1
+            self.take('(')
+            test = self.expression()
+            self.take(')')
+            then = self.statement()
+            otherwise = self.statement() if self.skip('else') else None
+            return ('if', test, then, otherwise)
+        if kind == 'ident' and value == 'switch':
+            self.i += 1
+            self.take('(')
+            discriminant = self.expression()
+            self.take(')')
+            self.take('{')
+            cases = []
+            while not self.at('}'):
+                if self.skip('default'):
+                    test = None
+                else:
+                    self.take('case')
+                    test = self.expression()
+                self.take(':')
+                body = []
+                while not (self.at('case') or self.at('default') or self.at('}')):
+                    body.append(self.statement())
+                cases.append((test, body))
+            self.take('}')
+            return ('switch', discriminant, cases)
+        if kind == 'ident' and value == 'return':
+            self.i += 1
+            argument = None
+            if not (self.at(';') or self.at('}')):
+                argument = self.expression()
+            self.skip(';')
+            return ('return', argument)
+        if kind == 'ident' and value == 'break':
+            self.i += 1
+            self.skip(';')
+            return ('break',)
+        if kind == 'ident' and value == 'throw':
+            self.i += 1
+            argument = self.expression()
+            self.skip(';')
+            return ('throw', argument)
+        if kind == 'ident' and value == 'try':
+            self.i += 1
+            body = self.block()
+            param = handler = finalizer = None
+            if self.skip('catch'):
+                if self.skip('('):
+                    param = self.pattern()
+                    self.take(')')
+                handler = self.block()
+            if self.skip('finally'):
+                finalizer = self.block()
+            return ('try', body, param, handler, finalizer)
+        if kind == 'ident' and value in ('for', 'while', 'do', 'function', 'class'):
+            raise self.error(f'`{value}` statement')
+        expression = self.expression()
+        self.skip(';')
+        return ('expression', expression)
+
+    def block(self):
+        self.take('{')
+        statements = []
+        while not self.at('}'):
+            statements.append(self.statement())
+        self.take('}')
+        return statements
+
+    def pattern(self):
+        kind, value = self.peek()
+        if kind == 'ident':
+            self.i += 1
+            return ('name', value)
+        if self.skip('{'):
+            fields = []
+            while not self.at('}'):
+                if self.skip('...'):
+                    raise self.error('rest pattern')
+                key = self.take().value
+                if key[0] in '\'"':
+                    key = ast.literal_eval(key)
+                target = self.pattern() if self.skip(':') else ('name', key)
+                default = self.assignment() if self.skip('=') else None
+                fields.append((key, target, default))
+                self.skip(',')
+            self.take('}')
+            return ('object_pattern', fields)
+        if self.skip('['):
+            items = []
+            while not self.at(']'):
+                if self.at(','):
+                    items.append(None)
+                else:
+                    target = self.pattern()
+                    default = self.assignment() if self.skip('=') else None
+                    items.append((target, default))
+                if not self.skip(','):
+                    break
+            self.take(']')
+            return ('array_pattern', items)
+        raise self.error(f'unsupported binding {value!r}')
+
+    # Expressions
+
+    def expression(self):
+        node = self.assignment()
+        if self.at(','):
+            raise self.error('comma expression')
+        return node
+
+    def _arrow_ahead(self, offset=0):
+        kind, value = self.peek(offset)
+        if kind == 'ident' and self.at('=>', offset + 1):
+            return True
+        if kind == 'punct' and value == '(':
+            close = self.pairs.get(self.i + offset)
+            if close is not None and close + 1 < len(self.tokens):
+                token = self.tokens[close + 1]
+                return token.kind == 'punct' and token.value == '=>'
+        return False
+
+    def assignment(self):
+        if self.at('async') and (self._arrow_ahead(1) or self.at('function', 1)):
+            self.i += 1
+        if self._arrow_ahead():
+            return self.arrow()
+        node = self.binary(0)
+        if self.skip('?'):
+            consequent = self.assignment()
+            self.take(':')
+            alternate = self.assignment()
+            return ('cond', node, consequent, alternate)
+        kind, value = self.peek()
+        if kind == 'punct' and value in ASSIGNMENT_OPS:
+            self.i += 1
+            return ('assign', value, node, self.assignment())
+        return node
+
+    def arrow(self):
+        params = []
+        if self.skip('('):
+            while not self.at(')'):
+                target = self.pattern()
+                default = self.assignment() if self.skip('=') else None
+                params.append((target, default))
+                self.skip(',')
+            self.take(')')
+        else:
+            params.append((('name', self.take().value), None))
+        self.take('=>')
+        body = ('block', self.block()) if self.at('{') else self.assignment()
+        return ('arrow', params, body)
+
+    def binary(self, min_precedence):
+        left = self.unary()
+        while True:
+            kind, value = self.peek()
+            precedence = BINARY_PRECEDENCE.get(value) if kind == 'punct' else None
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.i += 1
+            right = self.binary(precedence + 1)
+            left = ('binary', value, left, right)
+
+    def unary(self):
+        kind, value = self.peek()
+        if (kind == 'punct' and value in ('!', '-', '+')) or (kind == 'ident' and value in ('typeof', 'await')):
+            self.i += 1
+            return ('unary', value, self.unary())
+        if kind == 'punct' and value in ('++', '--'):
+            self.i += 1
+            return ('update', value, self.unary())
+        if kind == 'ident' and value == 'new':
+            self.i += 1
+            callee = self.primary()
+            while self.skip('.'):
+                callee = ('member', callee, ('literal', self.take().value), False)
+            return self.postfix(('new', callee, self.arguments() if self.at('(') else []))
+        return self.postfix(self.primary())
+
+    def arguments(self):
+        self.take('(')
+        args = []
+        while not self.at(')'):
+            args.append(('spread', self.assignment()) if self.skip('...') else self.assignment())
+            self.skip(',')
+        self.take(')')
+        return args
+
+    def postfix(self, node):
+        while True:
+            if self.skip('.'):
+                node = ('member', node, ('literal', self.take().value), False)
+            elif self.skip('?.'):
+                if self.at('('):
+                    node = ('call', node, self.arguments(), True)
+                elif self.skip('['):
+                    node = ('member', node, self.expression(), True)
+                    self.take(']')
+                else:
+                    node = ('member', node, ('literal', self.take().value), True)
+            elif self.at('['):
+                self.i += 1
+                node = ('member', node, self.expression(), False)
+                self.take(']')
+            elif self.at('('):
+                node = ('call', node, self.arguments(), False)
+            elif self.at('++') or self.at('--'):
+                node = ('update', self.take().value, node)
+            else:
+                return node
+
+    def primary(self):
+        kind, value = self.peek()
+        if kind == 'number':
+            self.i += 1
+            number = float(int(value, 0)) if value[:2].lower() in ('0x', '0o', '0b') else float(value)
+            return ('literal', int(number) if number.is_integer() else number)
+        if kind == 'string':
+            self.i += 1
+            return ('literal', ast.literal_eval(value))
+        if kind == 'template' and value == '`':
+            return self.template()
+        if kind == 'jsx_tag' and value in ('<', '<>'):
+            return self.jsx()
+        if kind == 'ident':
+            self.i += 1
+            literals = {'true': True, 'false': False, 'null': None, 'undefined': None}
+            if value in literals:
+                return ('literal', literals[value])
+            if value in ('function', 'this', 'yield', 'class'):
+                raise self.error(f'`{value}` expression')
+            return ('name', value)
+        if kind == 'punct' and value == '(':
+            self.i += 1
+            node = self.expression()
+            self.take(')')
+            return node
+        if kind == 'punct' and value == '[':
+            self.i += 1
+            items = []
+            while not self.at(']'):
+                items.append(('spread', self.assignment()) if self.skip('...') else self.assignment())
+                self.skip(',')
+            self.take(']')
+            return ('array', items)
+        if kind == 'punct' and value == '{':
+            return self.object()
+        raise self.error(f'unexpected {value!r}')
+
+    def object(self):
+        self.take('{')
+        entries = []
+        while not self.at('}'):
+            if self.skip('...'):
+                entries.append(('spread', self.assignment()))
+            elif self.skip('['):
+                key = self.expression()
+                self.take(']')
+                self.take(':')
+                entries.append((key, self.assignment()))
+            else:
+                kind, key = self.peek()
+                self.i += 1
+                if kind == 'string':
+                    key = ast.literal_eval(key)
+                if self.skip(':'):
+                    entries.append((('literal', key), self.assignment()))
+                elif self.at('('):
+                    raise self.error('object method')
+                else:
+                    entries.append((('literal', key), ('name', key)))
+            self.skip(',')
+        self.take('}')
+        return ('object', entries)
+
+    def template(self):
+        self.i += 1
+        parts = []
+        while True:
+            kind, value = self.peek()
+            if kind == 'template' and value == '`':
+                self.i += 1
+                return ('template', parts)
+            if kind == 'template':
+                self.i += 1
+                parts.append(('literal', re.sub(r'\\(.)', r'\1', value)))
+            elif kind == 'punct' and value == '${':
+                self.i += 1
+                parts.append(self.expression())
+                self.take('}')
+            else:
+                raise self.error('unterminated template literal')
+
+    def jsx(self):
+        kind, value = self.peek()
+        self.i += 1
+        if value == '<>':
+            return ('jsx', None, [], self.jsx_children())
+        tag = self.take().value
+        attrs = []
+        while True:
+            kind, value = self.peek()
+            if kind == 'jsx_tag' and value == '/>':
+                self.i += 1
+                return ('jsx', tag, attrs, [])
+            if kind == 'jsx_tag' and value == '>':
+                self.i += 1
+                return ('jsx', tag, attrs, self.jsx_children())
+            if kind == 'punct' and value == '{':
+                self.i += 1
+                self.take('...')
+                attrs.append(('...', self.assignment()))
+                self.take('}')
+            elif kind == 'jsx_attr':
+                self.i += 1
+                if not self.skip('='):
+                    attrs.append((value, ('literal', True)))
+                elif self.peek()[0] == 'string':
+                    attrs.append((value, ('literal', self.take().value[1:-1])))
+                else:
+                    self.take('{')
+                    attrs.append((value, self.assignment()))
+                    self.take('}')
+            else:
+                raise self.error(f'unexpected {value!r} in a JSX tag')
+
+    def jsx_children(self):
+        children = []
+        while True:
+            kind, value = self.peek()
+            if kind == 'jsx_tag' and value.startswith('</'):
+                self.i += 1
+                return children
+            if kind == 'jsx_text':
+                self.i += 1
+                text = _jsx_text(value)
+                if text:
+                    children.append(('literal', text))
+            elif kind == 'jsx_tag':
+                children.append(self.jsx())
+            elif kind == 'punct' and value == '{':
+                self.i += 1
+                if not self.skip('}'):
+                    children.append(self.assignment())
+                    self.take('}')
+            else:
+                raise self.error(f'unexpected {value!r} in JSX children')
+
+
+class Evaluator:
+    def exec_block(self, statements, scope):
+        for statement in statements:
+            self.exec(statement, scope)
+
+    def exec(self, node, scope):
+        kind = node[0]
+        if kind == 'block':
+            self.exec_block(node[1], Scope({}, scope))
+        elif kind == 'declare':
+            for target, init in node[1]:
+                self.bind(target, None if init is None else self.eval(init, scope), scope)
+        elif kind == 'if':
+            if truthy(self.eval(node[1], scope)):
+                self.exec(node[2], scope)
+            elif node[3] is not None:
+                self.exec(node[3], scope)
+        elif kind == 'switch':
+            value = self.eval(node[1], scope)
+            cases = node[2]
+            start = next((i for i, (test, _) in enumerate(cases)
+                          if test is not None and strict_equal(self.eval(test, scope), value)), None)
+            if start is None:
+                start = next((i for i, (test, _) in enumerate(cases) if test is None), None)
+            if start is None:
+                return
+            inner = Scope({}, scope)
+            try:
+                for _, body in cases[start:]:
+                    self.exec_block(body, inner)
+            except _Break:
+                pass
+        elif kind == 'return':
+            raise _Return(None if node[1] is None else self.eval(node[1], scope))
+        elif kind == 'break':
+            raise _Break()
+        elif kind == 'expression':
+            self.eval(node[1], scope)
+        elif kind != 'empty':
+            raise Unsupported(f'{kind} statement')
+
+    def bind(self, target, value, scope):
+        if isinstance(target, tuple) and len(target) == 2 and isinstance(target[0], tuple):
+            target, default = target  # (pattern, default) from a parameter list
+            if value is None and default is not None:
+                value = self.eval(default, scope)
+        kind = target[0]
+        if kind == 'name':
+            scope.names[target[1]] = value
+        elif kind == 'object_pattern':
+            for key, field_target, default in target[1]:
+                field = get_member(value, key)
+                if field is None and default is not None:
+                    field = self.eval(default, scope)
+                self.bind(field_target, field, scope)
+        elif kind == 'array_pattern':
+            for i, item in enumerate(target[1]):
+                if item is not None:
+                    self.bind(item, get_member(value, i), scope)
+
+    def eval(self, node, scope):
+        kind = node[0]
+        if kind == 'literal':
+            return node[1]
+        if kind == 'name':
+            return scope.lookup(node[1])
+        if kind == 'template':
+            return ''.join(js_str(self.eval(part, scope)) for part in node[1])
+        if kind == 'cond':
+            return self.eval(node[2] if truthy(self.eval(node[1], scope)) else node[3], scope)
+        if kind == 'binary':
+            return self.binary(node[1], node[2], node[3], scope)
+        if kind == 'unary':
+            value = self.eval(node[2], scope)
+            if node[1] == '!':
+                return not truthy(value)
+            if node[1] == '-':
+                return -_number(value)
+            if node[1] == '+':
+                return _number(value)
+            if node[1] == 'typeof':
+                return self.typeof(value)
+            raise Unsupported(f'{node[1]} expression')
+        if kind == 'member':
+            target = self.eval(node[1], scope)
+            if target is None and node[3]:
+                return None
+            return get_member(target, self.eval(node[2], scope))
+        if kind == 'call':
+            callee = self.eval(node[1], scope)
+            if callee is None and node[3]:
+                return None
+            if not callable(callee):
+                raise Unsupported('calls something that is not a function')
+            return callee(*self.items(node[2], scope))
+        if kind == 'array':
+            return self.items(node[1], scope)
+        if kind == 'object':
+            result = {}
+            for key, value in node[1]:
+                if key == 'spread':
+                    result.update(self.eval(value, scope) or {})
+                else:
+                    result[js_str(self.eval(key, scope))] = self.eval(value, scope)
+            return result
+        if kind == 'arrow':
+            return JsFunction(node[1], node[2], scope, self)
+        if kind == 'jsx':
+            return self.element(node, scope)
+        raise Unsupported(f'{kind} expression')
+
+    def items(self, nodes, scope):
+        values = []
+        for node in nodes:
+            if node[0] == 'spread':
+                spread = self.eval(node[1], scope)
+                values.extend(list(spread) if isinstance(spread, (list, str)) else [])
+            else:
+                values.append(self.eval(node, scope))
+        return values
+
+    def typeof(self, value):
+        if value is None:
+            return 'undefined'
+        if isinstance(value, bool):
+            return 'boolean'
+        if is_number(value):
+            return 'number'
+        if isinstance(value, str):
+            return 'string'
+        return 'function' if callable(value) else 'object'
+
+    def binary(self, op, left_node, right_node, scope):
+        left = self.eval(left_node, scope)
+        if op == '&&':
+            return self.eval(right_node, scope) if truthy(left) else left
+        if op == '||':
+            return left if truthy(left) else self.eval(right_node, scope)
+        if op == '??':
+            return self.eval(right_node, scope) if left is None else left
+        right = self.eval(right_node, scope)
+        if op in ('===', '=='):
+            return strict_equal(left, right)
+        if op in ('!==', '!='):
+            return not strict_equal(left, right)
+        if op == '+':
+            if isinstance(left, (str, list)) or isinstance(right, (str, list)):
+                return js_str(left) + js_str(right)
+            return _number(left) + _number(right)
+        if op in ('<', '>', '<=', '>=') and isinstance(left, str) and isinstance(right, str):
+            a, b = left, right
+        else:
+            a, b = _number(left), _number(right)
+        if op == '-':
+            return a - b
+        if op == '*':
+            return a * b
+        if op == '/':
+            return a / b if b else (math.nan if a == 0 or a != a else math.copysign(math.inf, a) * math.copysign(1, b))
+        if op == '%':
+            return math.fmod(a, b) if b else math.nan
+        if op == '<':
+            return a < b
+        if op == '>':
+            return a > b
+        if op == '<=':
+            return a <= b
+        return a >= b
+
+    def element(self, node, scope):
+        _, tag, attr_nodes, child_nodes = node
+        attrs = {}
+        for name, value in attr_nodes:
+            if name == '...':
+                attrs.update(self.eval(value, scope) or {})
+            else:
+                attrs[name] = self.eval(value, scope)
+        children = [self.eval(child, scope) for child in child_nodes]
+        return Element(tag, attrs, children)
+
+
+def _tokens(text):
+    return [t for t in tokenize(text) if t.kind not in ('ws', 'comment')]
+
+
+def evaluate_declaration(source, name, names=None, first_line=1):
+    # Run the top-level statement in `source` and return the value bound to `name`
+    scope = Scope(dict(GLOBALS, **(names or {})))
+    evaluator = Evaluator()
+    evaluator.exec(Parser(source, _tokens(source), first_line).statement(), scope)
+    return scope.lookup(name)
+
+
+def evaluate_jsx(source, names=None):
+    # Element tree of a standalone JSX element
+    return Evaluator().eval(Parser(source, _tokens(source)).jsx(), Scope(dict(GLOBALS, **(names or {}))))
+
+
+def parse_statements(source, first_line=1):
+    # Every top-level statement in `source`, as parsed tuples
+    parser = Parser(source, _tokens(source), first_line)
+    statements = []
+    while parser.peek() != EOF:
+        statements.append(parser.statement())
+    return statements
+
+
+def pattern_names(pattern):
+    # Names a binding pattern declares, in order
+    if pattern is None:
+        return []
+    if pattern[0] == 'name':
+        return [pattern[1]]
+    if pattern[0] == 'object_pattern':
+        return [name for _, target, _ in pattern[1] for name in pattern_names(target)]
+    return [name for item in pattern[1] if item is not None for name in pattern_names(item[0])]
+
+
+def _pattern_defaults(pattern):
+    if pattern is None or pattern[0] == 'name':
+        return []
+    if pattern[0] == 'object_pattern':
+        fields = [(target, default) for _, target, default in pattern[1]]
+    else:
+        fields = [item for item in pattern[1] if item is not None]
+    defaults = []
+    for target, default in fields:
+        if default is not None:
+            defaults.append(default)
+        defaults.extend(_pattern_defaults(target))
+    return defaults
+
+
+def _declared(statements):
+    names = set()
+    for statement in statements:
+        if statement[0] == 'declare':
+            for target, _ in statement[1]:
+                names.update(pattern_names(target))
+    return names
+
+
+def _collect(node, bound, out):
+    kind = node[0]
+    if kind == 'name':
+        if node[1] not in bound:
+            out.add(node[1])
+    elif kind == 'block':
+        _collect_block(node[1], bound, out)
+    elif kind == 'declare':
+        for target, init in node[1]:
+            for default in _pattern_defaults(target):
+                _collect(default, bound, out)
+            if init is not None:
+                _collect(init, bound, out)
+    elif kind == 'switch':
+        _collect(node[1], bound, out)
+        inner = bound | _declared([s for _, body in node[2] for s in body])
+        for test, body in node[2]:
+            if test is not None:
+                _collect(test, inner, out)
+            for statement in body:
+                _collect(statement, inner, out)
+    elif kind == 'try':
+        _, body, param, handler, finalizer = node
+        _collect_block(body, bound, out)
+        if handler is not None:
+            _collect_block(handler, bound | set(pattern_names(param)), out)
+        if finalizer is not None:
+            _collect_block(finalizer, bound, out)
+    elif kind == 'member':
+        _collect(node[1], bound, out)
+        _collect(node[2], bound, out)
+    elif kind == 'object':
+        for key, value in node[1]:
+            if key != 'spread':
+                _collect(key, bound, out)
+            _collect(value, bound, out)
+    elif kind == 'arrow':
+        inner = set(bound)
+        for target, _ in node[1]:
+            inner.update(pattern_names(target))
+        for target, default in node[1]:
+            for value in ([default] if default is not None else []) + _pattern_defaults(target):
+                _collect(value, inner, out)
+        _collect(node[2], inner, out)
+    elif kind == 'jsx':
+        tag = node[1]
+        if tag and (tag[0].isupper() or '.' in tag) and tag.split('.')[0] not in bound:
+            out.add(tag.split('.')[0])
+        for _, value in node[2]:
+            _collect(value, bound, out)
+        for child in node[3]:
+            _collect(child, bound, out)
+    elif kind in ('call', 'new'):
+        _collect(node[1], bound, out)
+        for argument in node[2]:
+            _collect(argument, bound, out)
+    elif kind in ('template', 'array'):
+        for part in node[1]:
+            _collect(part, bound, out)
+    elif kind in ('assign', 'update', 'binary'):
+        for part in node[2:]:
+            _collect(part, bound, out)
+    else:
+        # if, cond, unary, return, throw, expression, spread: every tuple part is a node
+        for part in node[1:]:
+            if isinstance(part, tuple):
+                _collect(part, bound, out)
+
+
+def _collect_block(statements, bound, out):
+    inner = bound | _declared(statements)
+    for statement in statements:
+        _collect(statement, inner, out)
+
+
+def free_names(nodes, bound=()):
+    # Names `nodes` (statements or expressions) read from the enclosing scopes;
+    # capitalized JSX tags count as names
+    out = set()
+    _collect_block(list(nodes), frozenset(bound), out)
+    return out
@@ -0,0 +1,368 @@
+"""
+Lookup-table and common-subexpression passes for injected JSX blocks.
+
+index_lookups() rewrites `TABLE.find(x => x.key === expr)` on a
+module-level array constant into `TABLE_BY_KEY[expr]` and returns the
+tables it used; lookup_table() declares them. So a linear scan per render becomes
+one property read.
+
+hoist_repeated() finds pure subexpressions that occur more than once in
+the same scope of a block: member/call chains such as
+`TABLE[level + 1]?.xpRequired`, parenthesized arithmetic and object
+property values such as a style color ternary. The most frequent one is
+replaced by a named value and the block is rescanned, until nothing
+repeats. Values that only use component state become derived values
+computed once per render before the component's `return`; values that
+use an arrow parameter (`order` in `activeOrders.map(order => ...)`) are
+declared at the top of that arrow's body, turning a `=> (...)` body into
+a block. Calls are only considered pure for a fixed set of non-mutating
+methods, and anything calling a setter or assigning is left alone.
+"""
+
+import re
+from collections import namedtuple
+
+from jsx_structure import scan
+
+# Methods and functions whose calls have no side effects
+PURE_METHODS = {
+    'find', 'filter', 'map', 'some', 'every', 'includes', 'indexOf', 'slice', 'join', 'concat',
+    'toFixed', 'toString', 'padStart', 'padEnd', 'charAt', 'toUpperCase', 'toLowerCase',
+    'startsWith', 'endsWith', 'trim', 'floor', 'ceil', 'round', 'min', 'max', 'abs', 'keys', 'values',
+}
+PURE_FUNCTIONS = {'String', 'Number', 'Boolean'}
+IMPURE_PUNCT = {'=', '+=', '-=', '*=', '/=', '%=', '||=', '&&=', '??=', '++', '--'}
+IMPURE_KEYWORDS = {'new', 'await', 'delete', 'yield', 'function'}
+GROUP_KEYWORDS = {'if', 'while', 'for', 'switch', 'catch', 'return', 'typeof'}
+NON_OPERATORS = {'.', '?.', ',', '(', ')', '[', ']', '{', '}', '${', '=>', ':', ';'}
+CONSTANT_RE = re.compile(r'^[A-Z][A-Z0-9_]*$')
+
+LOOKUP_RE = re.compile(
+    r'\b([A-Z][A-Z0-9_]*)\.find\(\s*\(?\s*([A-Za-z_$][\w$]*)\s*\)?\s*=>\s*\2\.([A-Za-z_$][\w$]*)\s*===\s*')
+
+# A value pulled out of a block; `deps` is set for useMemo'd values
+Derived = namedtuple('Derived', ['name', 'expression', 'deps'])
+
+# A repeated subexpression: token spans (i, j) of every occurrence, and
+# the arrow whose parameters it uses (token index of `=>`, or None)
+_Candidate = namedtuple('_Candidate', ['key', 'spans', 'scope'])
+
+
+def _upper_snake(name):
+    return re.sub(r'(?<=[a-z0-9])([A-Z])', r'_\1', name).upper()
+
+
+def lookup_table(table, constant, key):
+    # Declaration of `table`; the first entry for a key wins, like find()
+    return (f'\n\n// {constant} keyed by {key}, for lookups during render\n'
+            f'const {table} = Object.fromEntries([...{constant}].reverse().map(entry => [entry.{key}, entry]));')
+
+
+def index_lookups(text, constants):
+    # Returns (text, {table: (constant, key)}) for lookups on `constants`
+    tables = {}
+    while True:
+        pairs = scan(text).pairs
+        for match in LOOKUP_RE.finditer(text):
+            constant, param, key = match.groups()
+            open_paren = match.start() + len(constant) + len('.find')
+            close_paren = pairs.get(open_paren)
+            expression = text[match.end():close_paren].strip() if close_paren else ''
+            if (constant in constants and expression
+                    and not re.search(r'(?<![\w$.])' + re.escape(param) + r'\b', expression)):
+                break
+        else:
+            return text, tables
+        table = f'{constant}_BY_{_upper_snake(key)}'
+        tables[table] = (constant, key)
+        text = f'{text[:match.start()]}{table}[{expression}]{text[close_paren + 1:]}'
+
+
+class _Block:
+    """Tokens of one JSX block with index-based bracket pairs and arrow scopes."""
+
+    def __init__(self, text):
+        # A fragment wrapper lets the tokenizer start in JSX children mode
+        self.text = text
+        self.wrapped = f'<>{text}</>'
+        structure = scan(self.wrapped)
+        self.tokens = structure.tokens
+        index = {token.start: i for i, token in enumerate(self.tokens)}
+        self.pairs = {index[o]: index[c] for o, c in structure.pairs.items() if o in index and c in index}
+        self.arrows = self._arrows()
+
+    def offset(self, i):
+        return self.tokens[i].start - 2
+
+    def end_offset(self, i):
+        return self.tokens[i].end - 2
+
+    def _arrows(self):
+        # {index of `=>`: (params, body first token, body last token, block body?)}
+        arrows = {}
+        for k, token in enumerate(self.tokens):
+            if token.value != '=>' or token.kind != 'punct':
+                continue
+            before = self.tokens[k - 1]
+            if before.kind == 'ident':
+                params = {before.value}
+            elif before.value == ')':
+                start = self.pairs[k - 1]
+                params = {t.value for t in self.tokens[start + 1:k - 1] if t.kind == 'ident'}
+            else:
+                continue
+            body = k + 1
+            if self.tokens[body].value in ('(', '{'):
+                arrows[k] = (params, body, self.pairs[body], self.tokens[body].value)
+            else:
+                arrows[k] = (params, body, self._expression_end(body) - 1, None)
+        return arrows
+
+    def _expression_end(self, i):
+        # Index just past the expression starting at token i
+        depth = self.tokens[i].depth
+        while i < len(self.tokens):
+            token = self.tokens[i]
+            if token.depth < depth or (token.depth == depth and token.value in (',', ';')):
+                return i
+            if token.value in ('}', ')', ']') and token.depth == depth and token.kind == 'punct':
+                return i
+            i = self.pairs.get(i, i) + 1 if token.value in ('(', '[', '{', '${') else i + 1
+        return i
+
+    def _after_member(self, i):
+        return i > 0 and self.tokens[i - 1].value in ('.', '?.')
+
+    def _is_key(self, i):
+        return (i + 1 < len(self.tokens) and self.tokens[i + 1].value == ':'
+                and self.tokens[i - 1].value in ('{', ','))
+
+    def free_names(self, i, j):
+        # Identifiers read in tokens[i:j] that are not bound inside that span
+        names, bound = set(), set()
+        for k in range(i, j):
+            token = self.tokens[k]
+            if token.value == '=>' and k in self.arrows:
+                bound |= self.arrows[k][0]
+            elif token.kind == 'ident' and not self._after_member(k) and not self._is_key(k):
+                names.add(token.value)
+        return names - bound - GROUP_KEYWORDS - {'true', 'false', 'null', 'undefined'}
+
+    def is_pure(self, i, j):
+        for k in range(i, j):
+            token = self.tokens[k]
+            if token.kind == 'punct' and token.value in IMPURE_PUNCT:
+                return False
+            if token.kind == 'ident' and token.value in IMPURE_KEYWORDS:
+                return False
+            if token.value == '(' and token.kind == 'punct' and k > i:
+                callee = self.tokens[k - 1]
+                if callee.kind != 'ident':
+                    continue
+                if self._after_member(k - 1):
+                    if callee.value not in PURE_METHODS:
+                        return False
+                elif callee.value not in PURE_FUNCTIONS and callee.value not in GROUP_KEYWORDS:
+                    return False
+        return True
+
+    def _has_operator(self, i, j):
+        return any(t.kind == 'punct' and t.value not in NON_OPERATORS for t in self.tokens[i:j])
+
+    def spans(self):
+        # (i, j) token spans of every hoistable subexpression shape
+        tokens = self.tokens
+        for i, token in enumerate(tokens):
+            previous = tokens[i - 1] if i else None
+            if token.kind == 'ident' and not self._after_member(i) and not self._is_key(i):
+                # Member/call/index chain
+                j, accessed = i + 1, False
+                while j < len(tokens):
+                    if tokens[j].value in ('.', '?.') and j + 1 < len(tokens) and tokens[j + 1].kind == 'ident':
+                        j += 2
+                    elif tokens[j].value in ('(', '[') and tokens[j].kind == 'punct' and j in self.pairs:
+                        j, accessed = self.pairs[j] + 1, True
+                    else:
+                        break
+                following = tokens[j].value if j < len(tokens) else None
+                if accessed and following not in IMPURE_PUNCT and following != '=>':
+                    yield i, j
+            elif token.value == '(' and token.kind == 'punct' and i in self.pairs:
+                # Parenthesized expression that is not a call, a condition or parameters
+                close = self.pairs[i]
+                if previous is not None and (previous.kind == 'ident' or previous.value in (')', ']', '=>')):
+                    continue
+                if close + 1 < len(tokens) and tokens[close + 1].value == '=>':
+                    continue
+                inner_commas = any(t.value == ',' and t.depth == token.depth + 1 for t in tokens[i + 1:close])
+                if not inner_commas and self._has_operator(i + 1, close):
+                    yield i, close + 1
+            elif token.value == ':' and self._is_key(i - 1):
+                # Object property value
+                j = self._expression_end(i + 1)
+                if j > i + 1 and self._has_operator(i + 1, j):
+                    yield i + 1, j
+
+    def scope_of(self, i, j, names):
+        # Innermost arrow around tokens[i:j] whose parameters are used, or None
+        best = None
+        for k, (params, body, last, kind) in self.arrows.items():
+            if body <= i and j - 1 <= last and params & names:
+                if best is None or k > best:
+                    best = k
+        return best
+
+    def candidates(self):
+        found = {}
+        for i, j in self.spans():
+            if not self.is_pure(i, j):
+                continue
+            names = self.free_names(i, j)
+            if any(name.startswith('set') and name[3:4].isupper() for name in names):
+                continue
+            scope = self.scope_of(i, j, names)
+            key = (tuple(t.value for t in self.tokens[i:j]), scope)
+            found.setdefault(key, []).append((i, j))
+        repeated = []
+        for (key, scope), spans in found.items():
+            spans = _disjoint(spans)
+            if len(spans) > 1 and (scope is None or self.arrows[scope][3] is not None):
+                repeated.append(_Candidate(key, spans, scope))
+        return repeated
+
+
+def _disjoint(spans):
+    kept = []
+    for i, j in sorted(spans):
+        if not kept or i >= kept[-1][1]:
+            kept.append((i, j))
+    return kept
+
+
+def _flatten(expression):
+    return re.sub(r'\s*\n\s*', ' ', expression.strip())
+
+
+def _unwrap(expression):
+    # Drop one pair of parentheses around the whole expression
+    if expression.startswith('(') and expression.endswith(')'):
+        pairs = scan(expression).pairs
+        if pairs.get(0) == len(expression) - 1:
+            return expression[1:-1].strip()
+    return expression
+
+
+def _auto_name(block, candidate, taken):
+    words = [t.value for t in block.tokens[candidate.spans[0][0]:candidate.spans[0][1]]
+             if t.kind == 'ident' and not CONSTANT_RE.match(t.value) and t.value not in PURE_METHODS]
+    words = list(dict.fromkeys(words))[-2:] or ['derived']
+    name = words[0] + ''.join(w[:1].upper() + w[1:] for w in words[1:])
+    return _unique(name, taken)
+
+
+def _unique(name, taken):
+    candidate, n = name, 2
+    while candidate in taken:
+        candidate, n = f'{name}{n}', n + 1
+    taken.add(candidate)
+    return candidate
+
+
+def _line_indent(text, offset):
+    line_start = text.rfind('\n', 0, offset) + 1
+    return re.match(r'[ \t]*', text[line_start:]).group()
+
+
+def _deps(block, i, j, derived_names):
+    # useMemo dependencies: component-scope member paths read in tokens[i:j]
+    deps = set()
+    names = block.free_names(i, j)
+    k = i
+    while k < j:
+        token = block.tokens[k]
+        if token.kind == 'ident' and token.value in names and not block._after_member(k):
+            path, m = token.value, k + 1
+            while (m + 2 <= j and block.tokens[m].value == '.' and block.tokens[m + 1].kind == 'ident'
+                   and (m + 2 == j or block.tokens[m + 2].value != '(')):
+                path, m = f'{path}.{block.tokens[m + 1].value}', m + 2
+            if not CONSTANT_RE.match(token.value) and (token.value not in PURE_FUNCTIONS | {'Math'}):
+                deps.add(path)
+            k = m
+        else:
+            k += 1
+    return tuple(sorted(deps | (names & derived_names)))
+
+
+def hoist_repeated(blocks, names=None, taken=()):
+    # Returns ({block name: text}, [Derived]) for {block name: text}.
+    # `names` maps flattened expressions to preferred value names, used as
+    # given; generated names avoid the identifiers in `taken`.
+    names = names or {}
+    taken = set(taken)
+    blocks = dict(blocks)
+    derived = []
+    by_expression = {}
+    while True:
+        best = None
+        for block_name, text in blocks.items():
+            block = _Block(text)
+            for candidate in block.candidates():
+                size = candidate.spans[0][1] - candidate.spans[0][0]
+                rank = (len(candidate.spans), size)
+                if best is None or rank > best[0]:
+                    best = (rank, block_name, block, candidate)
+        if best is None:
+            return blocks, derived
+        _, block_name, block, candidate = best
+        i, j = candidate.spans[0]
+        expression = _flatten(block.text[block.offset(i):block.end_offset(j - 1)])
+        value = _unwrap(expression)
+
+        if candidate.scope is None and value in by_expression:
+            name = by_expression[value]
+        elif expression in names or value in names:
+            name = names.get(expression) or names[value]
+            taken.add(name)
+        else:
+            name = _auto_name(block, candidate, taken)
+
+        text = block.text
+        for i, j in reversed(candidate.spans):
+            text = text[:block.offset(i)] + name + text[block.end_offset(j - 1):]
+
+        if candidate.scope is None:
+            if value not in by_expression:
+                calls = any(t.value == '(' and block._after_member(k - 1)
+                            for k, t in enumerate(block.tokens[i:j], i) if k > i)
+                deps = _deps(block, i, j, set(by_expression.values())) if calls else None
+                derived.append(Derived(name, value, deps))
+                by_expression[value] = name
+            blocks[block_name] = text
+            continue
+
+        # Declare the value at the top of the arrow body that binds its parameters;
+        # every replaced span lies inside that body
+        params, body, last, kind = block.arrows[candidate.scope]
+        shrink = sum(block.end_offset(j - 1) - block.offset(i) - len(name) for i, j in candidate.spans)
+        open_at, close_at = block.offset(body), block.offset(last) - shrink
+        indent = _line_indent(text, open_at)
+        declaration = f'const {name} = {value};'
+        if kind == '{':
+            text = f'{text[:open_at + 1]}\n{indent}  {declaration}{text[open_at + 1:]}'
+        else:
+            inner = text[open_at + 1:close_at].rstrip()
+            inner = '\n'.join('  ' + line if line.strip() else line for line in inner.split('\n'))
+            text = (f'{text[:open_at]}{{\n{indent}  {declaration}\n{indent}  return ({inner}\n'
+                    f'{indent}  );\n{indent}}}{text[close_at + 1:]}')
+        blocks[block_name] = text
+
+
+def derived_unit(derived, comment):
+    # Statements declaring the component-scope derived values
+    lines = [f'  // {comment}\n']
+    for value in derived:
+        if value.deps is None:
+            lines.append(f'  const {value.name} = {value.expression};\n')
+        else:
+            lines.append(f"  const {value.name} = React.useMemo(() => {value.expression}, [{', '.join(value.deps)}]);\n")
+    return ''.join(lines) + '\n'
@@ -0,0 +1,494 @@
+"""
+Lightweight JSX/JS tokenizer and brace-matched structural map.
+
+tokenize() streams tokens in one linear pass while tracking strings,
+template literals, comments, regex literals, JSX tags and JSX text, so a
+`};` inside a string or a `'` in "Let's cook" never confuses the patch
+scripts. scan() turns that stream into a map of the file: top-level
+declarations, function components and custom hooks, the hooks called in
+their bodies with dependency arrays, and every matched bracket pair.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+Token = namedtuple('Token', ['kind', 'value', 'start', 'end', 'depth'])
+
+Declaration = namedtuple('Declaration', [
+    'kind',           # const | let | var | function | class | import
+    'name',           # binding name, or the destructuring pattern text
+    'start',          # offset of the statement (including `export`)
+    'end',            # offset just past the statement
+    'exported',
+    'is_function',
+    'body',           # (open, close) offsets of the body braces, or None
+    'hooks',          # hooks called at the top level of the body
+    'return_offset',  # offset of the last top-level `return`, or -1
+])
+
+Hook = namedtuple('Hook', [
+    'name',       # useEffect, useCallback, useState, ...
+    'binding',    # `showNotification`, `[a, setA]`, or None
+    'start',      # offset of the statement
+    'end',        # offset just past the statement
+    'call',       # (open, close) offsets of the call parentheses
+    'deps',       # (open, close) offsets of the dependency array, or None
+    'dep_names',  # tuple of dependency expressions
+])
+
+
+class ScanError(ValueError):
+    pass
+
+
+CODE_RE = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*")
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<number>\d[\w.]*|\.\d\w*)
+  | (?P<punct>=>|\.\.\.|\?\?=?|\?\.|&&=?|\|\|=?|[=!]==?|<<=?|>>>?=?|[<>]=?|\*\*=?|[-+*/%&|^]=?|\+\+|--|[{}()\[\];,?:.~!@#`=])
+''', re.S | re.X)
+
+REGEX_RE = re.compile(r'/(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[a-z]*')
+TEMPLATE_RE = re.compile(r'(?:[^`\\$]|\\.|\$(?!\{))*', re.S)
+TAG_RE = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<comment>/\*.*?\*/)
+  | (?P<name>[\w$.:-]+)
+  | (?P<string>"[^"]*"|'[^']*')
+  | (?P<punct>/>|[={>])
+''', re.S | re.X)
+JSX_TEXT_RE = re.compile(r'[^<{]+')
+CLOSE_TAG_RE = re.compile(r'</\s*[\w$.:-]*\s*>')
+JSX_START_RE = re.compile(r'<[A-Za-z_$>]')
+
+OPENERS = {'{': '}', '(': ')', '[': ']'}
+CLOSERS = {'}': '{', ')': '(', ']': '['}
+
+# Tokens after which `/` starts a regex literal and `<` starts a JSX tag
+EXPRESSION_START_PUNCT = {
+    None, '(', ',', '=', ':', '[', '!', '&', '|', '?', '{', '}', ';', '+', '-', '*', '%',
+    '~', '^', '<', '>', '=>', '&&', '||', '??', '==', '===', '!=', '!==', '+=', '-=',
+    '*=', '/=', '...',
+}
+EXPRESSION_START_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'yield', 'await', 'default',
+}
+
+DECLARATION_KEYWORDS = {'const', 'let', 'var', 'function', 'class', 'import'}
+HOOK_NAME_RE = re.compile(r'^use[A-Z0-9]\w*$')
+IMPORT_FROM_RE = re.compile(r'''import\s+(?P<bindings>[^'";]*?)\s*from\s*(['"])(?P<source>[^'"]+)\2''')
+
+
+def _line_of(text, offset):
+    return text.count('\n', 0, offset) + 1
+
+
+def _import_names(bindings):
+    # Local names bound by `React, { useState, x as y }` or `* as ns`
+    names = []
+    for part in bindings.replace('{', ',').replace('}', ',').split(','):
+        words = part.split()
+        if words:
+            names.append(words[-1])
+    return names
+
+
+def _expression_can_start(prev):
+    if prev is None:
+        return True
+    if prev.kind == 'punct':
+        return prev.value in EXPRESSION_START_PUNCT
+    if prev.kind == 'ident':
+        return prev.value in EXPRESSION_START_KEYWORDS
+    return False
+
+
+def tokenize(text):
+    # Mode stack: bracket frames ('{', '(', '[') hold code; 'template',
+    # 'tag' and 'children' frames switch the scanner into that mode.
+    stack = []
+    depth = 0
+    pos = 0
+    prev = None  # last significant code token, for regex/JSX decisions
+    length = len(text)
+
+    while pos < length:
+        mode = stack[-1][0] if stack else '{'
+
+        if mode == 'template':
+            match = TEMPLATE_RE.match(text, pos)
+            if match.end() > pos:
+                yield Token('template', match.group(), pos, match.end(), depth)
+                pos = match.end()
+            if pos >= length:
+                break
+            if text[pos] == '`':
+                stack.pop()
+                prev = Token('template', '`', pos, pos + 1, depth)
+                yield prev
+                pos += 1
+            else:  # `${`
+                stack.append(('{', pos))
+                yield Token('punct', '${', pos, pos + 2, depth)
+                depth += 1
+                pos += 2
+                prev = None
+            continue
+
+        if mode == 'children':
+            char = text[pos]
+            if char == '{':
+                stack.append(('{', pos))
+                yield Token('punct', '{', pos, pos + 1, depth)
+                depth += 1
+                pos += 1
+                prev = None
+            elif char == '<':
+                close = CLOSE_TAG_RE.match(text, pos)
+                if close:
+                    stack.pop()
+                    yield Token('jsx_tag', close.group(), pos, close.end(), depth)
+                    pos = close.end()
+                    prev = Token('jsx_tag', close.group(), close.start(), close.end(), depth)
+                else:
+                    pos = yield from _open_tag(text, pos, stack, depth)
+            else:
+                match = JSX_TEXT_RE.match(text, pos)
+                yield Token('jsx_text', match.group(), pos, match.end(), depth)
+                pos = match.end()
+            continue
+
+        if mode == 'tag':
+            match = TAG_RE.match(text, pos)
+            if not match:
+                raise ScanError(f'Unexpected character in JSX tag at line {_line_of(text, pos)}')
+            kind = match.lastgroup
+            value = match.group()
+            if kind == 'punct' and value == '{':
+                stack.append(('{', pos))
+                yield Token('punct', '{', pos, pos + 1, depth)
+                depth += 1
+                prev = None
+            elif kind == 'punct' and value == '/>':
+                stack.pop()
+                prev = Token('jsx_tag', value, pos, match.end(), depth)
+                yield prev
+            elif kind == 'punct' and value == '>':
+                stack[-1] = ('children', stack[-1][1])
+                yield Token('jsx_tag', value, pos, match.end(), depth)
+            elif kind != 'ws':
+                yield Token('jsx_attr' if kind == 'name' else kind, value, pos, match.end(), depth)
+            pos = match.end()
+            continue
+
+        # Code mode
+        char = text[pos]
+        if char == '/' and text[pos + 1:pos + 2] not in ('/', '*') and _expression_can_start(prev):
+            match = REGEX_RE.match(text, pos)
+            if match:
+                prev = Token('regex', match.group(), pos, match.end(), depth)
+                yield prev
+                pos = match.end()
+                continue
+        if char == '<' and _expression_can_start(prev) and JSX_START_RE.match(text, pos):
+            pos = yield from _open_tag(text, pos, stack, depth)
+            continue
+
+        match = CODE_RE.match(text, pos)
+        if not match:
+            raise ScanError(f'Unexpected character {char!r} at line {_line_of(text, pos)}')
+        kind = match.lastgroup
+        value = match.group()
+        end = match.end()
+
+        if kind == 'ws' or kind == 'comment':
+            yield Token(kind, value, pos, end, depth)
+            pos = end
+            continue
+
+        if value == '`':
+            stack.append(('template', pos))
+            token = Token('template', '`', pos, end, depth)
+        elif value in OPENERS:
+            stack.append((value, pos))
+            token = Token('punct', value, pos, end, depth)
+            depth += 1
+        elif value in CLOSERS:
+            if not stack or stack[-1][0] != CLOSERS[value]:
+                raise ScanError(f'Unmatched {value!r} at line {_line_of(text, pos)}')
+            stack.pop()
+            depth -= 1
+            token = Token('punct', value, pos, end, depth)
+        else:
+            token = Token(kind, value, pos, end, depth)
+        prev = token
+        yield token
+        pos = end
+
+    if stack:
+        kind, offset = stack[-1]
+        raise ScanError(f'Unclosed {kind!r} opened at line {_line_of(text, offset)}')
+
+
+def _open_tag(text, pos, stack, depth):
+    # `<>` opens a fragment straight into children mode
+    if text.startswith('<>', pos):
+        stack.append(('children', pos))
+        yield Token('jsx_tag', '<>', pos, pos + 2, depth)
+        return pos + 2
+    stack.append(('tag', pos))
+    yield Token('jsx_tag', '<', pos, pos + 1, depth)
+    return pos + 1
+
+
+class Structure:
+    def __init__(self, text, tokens, pairs, declarations):
+        self.text = text
+        self.tokens = tokens  # None when restored from the patch cache
+        self.pairs = pairs
+        self.declarations = declarations
+        self.by_name = {d.name: d for d in declarations if d.name}
+
+    def declaration(self, name):
+        declaration = self.by_name.get(name)
+        if declaration is None:
+            source = self.imported_from(name)
+            where = f' (it is imported from {source!r})' if source else ''
+            raise ScanError(f'No top-level declaration named {name!r}{where}')
+        return declaration
+
+    def imported_from(self, name):
+        # Module that `name` is imported from, or None
+        for declaration in self.declarations:
+            if declaration.kind != 'import':
+                continue
+            match = IMPORT_FROM_RE.match(self.text, declaration.start, declaration.end)
+            if match and name in _import_names(match.group('bindings')):
+                return match.group('source')
+        return None
+
+    @property
+    def components(self):
+        return [d for d in self.declarations if d.body and d.name and d.name[0].isupper()]
+
+    @property
+    def custom_hooks(self):
+        return [d for d in self.declarations if d.body and d.name and HOOK_NAME_RE.match(d.name)]
+
+    def hooks(self, function_name, hook_name=None):
+        hooks = self.declaration(function_name).hooks
+        return [h for h in hooks if hook_name is None or h.name == hook_name]
+
+    def hook(self, function_name, binding):
+        for hook in self.declaration(function_name).hooks:
+            if hook.binding == binding:
+                return hook
+        raise ScanError(f'{function_name} has no hook bound to {binding!r}')
+
+    def match(self, offset):
+        # Offset of the bracket matching the one at `offset`
+        return self.pairs[offset]
+
+    def line_of(self, offset):
+        return _line_of(self.text, offset)
+
+
+def _build(text):
+    tokens = []
+    pairs = {}
+    open_stack = []
+    for token in tokenize(text):
+        if token.kind in ('ws', 'comment'):
+            continue
+        index = len(tokens)
+        tokens.append(token)
+        if token.kind == 'punct':
+            if token.value in OPENERS or token.value == '${':
+                open_stack.append(index)
+            elif token.value in CLOSERS:
+                pairs[open_stack.pop()] = index
+    openers = {close: open_ for open_, close in pairs.items()}
+    return tokens, pairs, openers
+
+
+def _declarations(text, tokens, pairs, openers):
+    declarations = []
+    count = len(tokens)
+    i = 0
+    while i < count:
+        token = tokens[i]
+        if token.depth != 0 or token.kind != 'ident' or token.value not in DECLARATION_KEYWORDS:
+            i += 1
+            continue
+        prev = tokens[i - 1] if i else None
+        if prev is not None and prev.value not in (';', '}', 'export', 'default'):
+            i += 1
+            continue
+
+        exported = prev is not None and prev.value in ('export', 'default')
+        start = token.start
+        if exported:
+            start = tokens[i - 2].start if prev.value == 'default' and i >= 2 else prev.start
+
+        declaration, i = _parse_declaration(text, tokens, pairs, openers, i, start, exported)
+        declarations.append(declaration)
+    return declarations
+
+
+def _parse_declaration(text, tokens, pairs, openers, i, start, exported):
+    count = len(tokens)
+    kind = tokens[i].value
+    name = None
+    body = None
+    is_function = False
+    j = i + 1
+
+    if kind == 'import':
+        while j < count and tokens[j].value != ';' and not (tokens[j].depth == 0 and tokens[j].value in DECLARATION_KEYWORDS):
+            j = pairs.get(j, j) + 1
+        end_index = j if j < count and tokens[j].value == ';' else j - 1
+
+    elif kind in ('function', 'class'):
+        if j < count and tokens[j].kind == 'ident':
+            name = tokens[j].value
+            j += 1
+        # Skip parameters / heritage up to the body brace
+        while j < count and tokens[j].value != '{':
+            j = pairs.get(j, j) + 1
+        is_function = kind == 'function'
+        end_index = pairs[j] if j < count else count - 1
+        body = (j, end_index) if j < count else None
+
+    else:
+        # const / let / var: binding, then the initializer up to `;`
+        binding_start = j
+        while j < count and tokens[j].value != '=' and tokens[j].value != ';':
+            j = pairs.get(j, j) + 1
+        if binding_start < count:
+            name = text[tokens[binding_start].start:tokens[j - 1].end].strip()
+        init = j + 1
+        if init < count:
+            first = tokens[init]
+            if first.value in ('function', 'async'):
+                is_function = True
+            elif first.value == '(' and tokens[pairs[init] + 1].value == '=>':
+                is_function = True
+            elif first.kind == 'ident' and init + 1 < count and tokens[init + 1].value == '=>':
+                is_function = True
+        j = init
+        while j < count:
+            value = tokens[j].value
+            if value == ';':
+                break
+            if tokens[j].depth == 0 and value in DECLARATION_KEYWORDS and tokens[j - 1].value not in ('=', '(', ',', ':', 'async'):
+                break
+            if tokens[j].depth == 0 and value == 'export':
+                break
+            if is_function and body is None and value == '{' and tokens[j - 1].value in ('=>', ')'):
+                body = (j, pairs[j])
+            j = pairs.get(j, j) + 1
+        end_index = j if j < count and tokens[j].value == ';' else j - 1
+
+    end_index = min(end_index, count - 1)
+    end = tokens[end_index].end
+    next_index = end_index + 1
+    if next_index < count and tokens[next_index].value == ';' and kind in ('function', 'class'):
+        next_index += 1
+
+    hooks = []
+    return_offset = -1
+    body_offsets = None
+    if body is not None:
+        hooks, return_offset = _body_hooks(text, tokens, pairs, openers, body)
+        body_offsets = (tokens[body[0]].start, tokens[body[1]].start)
+
+    declaration = Declaration(
+        kind, name, start, end, exported, is_function, body_offsets, hooks, return_offset
+    )
+    return declaration, next_index
+
+
+def _body_hooks(text, tokens, pairs, openers, body):
+    open_index, close_index = body
+    inner_depth = tokens[open_index].depth + 1
+    hooks = []
+    return_offset = -1
+    j = open_index + 1
+    while j < close_index:
+        token = tokens[j]
+        if token.depth != inner_depth:
+            j = pairs.get(j, j) + 1
+            continue
+        if token.value == 'return':
+            return_offset = token.start
+
+        statement_start = token.start
+        binding = None
+        call_index = None
+        if token.value in ('const', 'let', 'var'):
+            k = j + 1
+            while k < close_index and tokens[k].value not in ('=', ';'):
+                k = pairs.get(k, k) + 1
+            if k + 2 < close_index and tokens[k].value == '=' and HOOK_NAME_RE.match(tokens[k + 1].value) \
+                    and tokens[k + 2].value == '(':
+                binding = text[tokens[j + 1].start:tokens[k - 1].end].strip()
+                call_index = k + 1
+        elif token.kind == 'ident' and HOOK_NAME_RE.match(token.value) and tokens[j + 1].value == '(':
+            call_index = j
+
+        if call_index is None:
+            j = pairs.get(j, j) + 1
+            continue
+
+        open_paren = call_index + 1
+        close_paren = pairs[open_paren]
+        deps = None
+        dep_names = ()
+        last = close_paren - 1
+        if tokens[last].value == ',':  # trailing comma after the deps array
+            last -= 1
+        if tokens[last].value == ']':
+            deps_open = openers[last]
+            if tokens[deps_open - 1].value == ',':
+                deps = (tokens[deps_open].start, tokens[last].start)
+                dep_names = _split_list(text, tokens, pairs, deps_open, last)
+
+        end_index = close_paren
+        if end_index + 1 < close_index and tokens[end_index + 1].value == ';':
+            end_index += 1
+        hooks.append(Hook(
+            tokens[call_index].value, binding, statement_start, tokens[end_index].end,
+            (tokens[open_paren].start, tokens[close_paren].start), deps, dep_names,
+        ))
+        j = end_index + 1
+    return hooks, return_offset
+
+
+def _split_list(text, tokens, pairs, open_index, close_index):
+    items = []
+    item_start = open_index + 1
+    k = item_start
+    while k <= close_index:
+        if k == close_index or tokens[k].value == ',':
+            if k > item_start:
+                items.append(text[tokens[item_start].start:tokens[k - 1].end].strip())
+            item_start = k + 1
+            k += 1
+        else:
+            k = pairs.get(k, k) + 1
+    return tuple(items)
+
+
+@lru_cache(maxsize=8)
+def scan(text):
+    tokens, pairs, openers = _build(text)
+    declarations = _declarations(text, tokens, pairs, openers)
+    offset_pairs = {}
+    for open_index, close_index in pairs.items():
+        offset_pairs[tokens[open_index].start] = tokens[close_index].start
+        offset_pairs[tokens[close_index].start] = tokens[open_index].start
+    return Structure(text, tokens, offset_pairs, declarations)
@@ -0,0 +1,130 @@
+"""
+On-disk cache for parsed source, keyed by a BLAKE2 hash of the content.
+
+Each entry holds one analysis result for one input (structural map,
+anchor offsets or line-count statistics). Entries are pickled to
+individual files, touched on every hit, and the least recently used ones
+are evicted once the cache grows past its size cap.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from anchors import AnchorIndex
+from jsx_structure import Structure, scan
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.patch_cache')
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Bump when the pickled layout of any cached result changes
+CACHE_VERSION = 1
+
+
+def content_hash(*parts):
+    digest = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        digest.update(part.encode('utf-8') if isinstance(part, str) else part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class PatchCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, kind, key):
+        return os.path.join(self.directory, f'{kind}-v{CACHE_VERSION}-{key}.pickle')
+
+    def get(self, kind, key):
+        path = self._path(kind, key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Missing, torn, or pickled from a class that has since moved
+            # (such as one defined in a script run as __main__)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, kind, key, value):
+        # Write through a temp file so a concurrent reader never sees half an entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(kind, key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith('.pickle'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # evicted by a concurrent run
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith('.pickle'):
+                os.remove(entry.path)
+
+    def structure(self, text, key=None):
+        # `key` lets callers that already hashed the source skip rehashing it
+        key = key or content_hash(text)
+        cached = self.get('structure', key)
+        if cached is not None:
+            pairs, declarations = cached
+            return Structure(text, None, pairs, declarations)
+        structure = scan(text)
+        self.put('structure', key, (structure.pairs, structure.declarations))
+        return structure
+
+    def anchor_index(self, text, anchors, key=None):
+        key = content_hash(key or text, *anchors)
+        occurrences = self.get('anchors', key)
+        if occurrences is not None:
+            return AnchorIndex(text, anchors, occurrences)
+        index = AnchorIndex(text, anchors)
+        self.put('anchors', key, index.occurrences)
+        return index
+
+    def text_stats(self, path):
+        # Size and line count of a file; the file is only hashed, never re-counted
+        with open(path, 'rb') as f:
+            data = f.read()
+        key = content_hash(data)
+        stats = self.get('stats', key)
+        if stats is None:
+            text = data.decode('utf-8')
+            stats = {'chars': len(text), 'lines': text.count('\n')}
+            self.put('stats', key, stats)
+        return stats
@@ -0,0 +1,124 @@
+"""
+Memory-mapped source reads and streamed, atomic patch writes.
+
+MappedSource maps the target file and decodes it once for analysis.
+write_plan() streams a splice plan to disk as untouched slices of the
+mapped original interleaved with the encoded insertions, so no second
+full copy of the patched file is ever built. Output goes to a temp file
+in the same directory and is renamed over the target only once it is
+complete, so a crash mid-write leaves the original file intact.
+"""
+
+import hashlib
+import mmap
+import os
+import stat
+import tempfile
+
+from patch_cache import content_hash
+
+
+class MappedSource:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.data = b''
+        self.digest = content_hash(self.data)
+        text = str(self.data, 'utf-8')
+        # Analysis and inserted blocks use '\n'; uniformly CRLF files are
+        # normalized here and get CRLF back when the plan is written.
+        crlf = text.count('\r\n')
+        self.newline = '\r\n' if crlf and crlf == text.count('\n') else '\n'
+        self.text = text.replace('\r\n', '\n') if self.newline == '\r\n' else text
+        self.ascii = len(self.data) == len(text)
+
+    def byte_length(self, start, end):
+        # Bytes taken on disk by text[start:end]
+        if self.ascii and self.newline == '\n':
+            return end - start
+        segment = self.text[start:end]
+        size = len(segment.encode('utf-8'))
+        if self.newline == '\r\n':
+            size += segment.count('\n')
+        return size
+
+    def encode(self, text):
+        if self.newline != '\n':
+            text = text.replace('\n', self.newline)
+        return text.encode('utf-8')
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def plan_chunks(source, plan):
+    # Byte chunks of the patched file: mapped original slices plus insertions
+    char_pos = 0
+    byte_pos = 0
+    for start, end, _, new_text in plan.ordered_edits():
+        byte_start = byte_pos + source.byte_length(char_pos, start)
+        if byte_start > byte_pos:
+            yield source.data[byte_pos:byte_start]
+        if new_text:
+            yield source.encode(new_text)
+        byte_pos = byte_start + source.byte_length(start, end)
+        char_pos = end
+    if byte_pos < len(source.data):
+        yield source.data[byte_pos:]
+
+
+def _new_file_mode():
+    # Mode open() would give a new file: 0o666 less the umask, which can
+    # only be read by setting it
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def write_atomic(path, chunks):
+    # Stream chunks into a temp file next to `path`, then rename it over
+    # `path`. Returns the content_hash() of the bytes written.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    digest = hashlib.blake2b(digest_size=20)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp() creates the file 0600; keep the target's mode, or give a
+        # new file the usual one
+        if os.path.exists(path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        else:
+            os.chmod(tmp_path, _new_file_mode())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    digest.update(b'\0')  # same framing as content_hash() for a single part
+    return digest.hexdigest()
+
+
+def write_plan(source, plan, path=None):
+    path = path or source.path
+
+    def chunks():
+        yield from plan_chunks(source, plan)
+        # Windows refuses to replace a file that is still mapped
+        source.close()
+
+    return write_atomic(path, chunks())
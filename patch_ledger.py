@@ -0,0 +1,115 @@
+"""
+Ledger of named patch units applied to a target file.
+
+Each unit (a constants block, a hook block, a UI block, ...) is
+fingerprinted by its text. The ledger is stored next to the target as
+`<target>.patches.json` and records the fingerprint and text of every
+applied unit together with the digest of the file it produced. A rerun
+on an unchanged file is answered from the ledger alone; otherwise units
+are looked up in the text, so only the missing ones get applied and an
+older recorded version of a unit is upgraded in place instead of being
+inserted a second time.
+"""
+
+import json
+import os
+
+from patch_cache import content_hash
+
+APPLIED = 'applied'
+PRESENT = 'present'
+UPGRADED = 'upgraded'
+MODIFIED = 'modified'  # recorded as applied, but edited by hand since; left alone
+REMOVED = 'removed'
+
+
+class PatchLedger:
+    def __init__(self, target_path, content, digest=None):
+        self.path = target_path + '.patches.json'
+        self.content = content
+        self.units = {}
+        self.digest = None
+        self.status = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.units = data.get('units', {})
+            self.digest = data.get('digest')
+        # The file is exactly what the last run wrote, so the ledger is authoritative
+        self.trusted = self.digest == (digest or content_hash(content))
+
+    def plan_insert(self, plan, name, text, offset, variants=()):
+        # Insert `text` at `offset` unless the unit is already in the file.
+        # `variants` are other known versions of the unit (with and without
+        # probes, say) that are upgraded in place even if never recorded.
+        fingerprint = content_hash(text)
+        previous = self.units.get(name)
+        old_texts = [previous.get('text', '')] if previous else []
+        old_texts = [t.strip() for t in old_texts + list(variants) if t.strip()]
+        found = [t for t in old_texts if t in self.content]
+        if previous and previous['fingerprint'] == fingerprint and self.trusted:
+            status = PRESENT
+        elif text.strip() in self.content:
+            status = PRESENT
+        elif found:
+            old_pos = self.content.find(found[0])
+            plan.replace(old_pos, old_pos + len(found[0]), text.strip())
+            status = UPGRADED
+        elif previous:
+            self.status[name] = MODIFIED
+            return False
+        else:
+            plan.insert(offset, text)
+            status = APPLIED
+        self.status[name] = status
+        self.units[name] = {'fingerprint': fingerprint, 'text': text}
+        return status != PRESENT
+
+    def plan_replacements(self, plan, name, replacements, start=0, end=None):
+        # Apply (old, new) replacements in text[start:end], upgrading the
+        # replacement strings recorded by an earlier version of the unit
+        fingerprint = content_hash(*[part for pair in replacements for part in pair])
+        previous = self.units.get(name)
+        if previous and previous['fingerprint'] == fingerprint and self.trusted:
+            self.status[name] = PRESENT
+            return False
+        count = 0
+        if previous and previous['fingerprint'] != fingerprint:
+            current = dict(replacements)
+            for old, old_new in previous['replacements']:
+                if old in current and current[old] != old_new:
+                    count += plan.replace_all(old_new, current[old], start, end)
+        for old, new in replacements:
+            count += plan.replace_all(old, new, start, end)
+        self.status[name] = (UPGRADED if previous else APPLIED) if count else PRESENT
+        self.units[name] = {'fingerprint': fingerprint, 'replacements': [list(pair) for pair in replacements]}
+        return count > 0
+
+    def plan_remove(self, plan, name, text=None):
+        # Take a unit back out of the file and forget it; `text` is the
+        # version to look for when the ledger has no record of the unit
+        previous = self.units.get(name)
+        old_text = previous.get('text') if previous else text
+        if not old_text:
+            return False
+        for old_text in (old_text, old_text.strip()):
+            old_pos = self.content.find(old_text)
+            if old_pos != -1:
+                plan.replace(old_pos, old_pos + len(old_text), '')
+                break
+        else:
+            self.status[name] = MODIFIED
+            return False
+        self.status[name] = REMOVED
+        self.units.pop(name, None)
+        return True
+
+    @property
+    def pending(self):
+        return [name for name, status in self.status.items() if status in (APPLIED, UPGRADED, REMOVED)]
+
+    def save(self, digest):
+        # `digest` is the content_hash() of the file as written
+        data = {'digest': digest, 'units': self.units}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
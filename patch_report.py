@@ -0,0 +1,193 @@
+"""
+Dry-run reporting for the patch scripts.
+
+plan_diff() renders a splice plan as a unified diff straight from its
+edit records, without diffing the whole file, and diff_path() names the
+files a stage writes next to its target the same way the target was
+named, so one dry run gives a diff that applies as a whole. PatchProfile times how
+long each patch unit spends locating its insertion point and planning
+its edit, and how many bytes it adds, plus whole-run stages such as
+reading and writing the target.
+"""
+
+import os
+import re
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+
+
+def _lines(text):
+    lines = text.split('\n')
+    tail = lines.pop()
+    result = [line + '\n' for line in lines]
+    if tail:
+        result.append(tail)
+    return result
+
+
+def _format_range(start, count):
+    # Unified diff convention: an empty range names the line before it
+    if count == 0:
+        return f'{start},0'
+    if count == 1:
+        return f'{start + 1}'
+    return f'{start + 1},{count}'
+
+
+def _changes(plan, line_starts):
+    # Group edits touching the same lines, then render each group as
+    # (first old line, old lines, new lines) with common lines trimmed
+    text = plan.text
+    groups = []
+    for edit in plan.ordered_edits():
+        start, end = edit[0], edit[1]
+        first = bisect_right(line_starts, start) - 1
+        last = bisect_right(line_starts, end - 1) - 1 if end > start else first
+        if groups and first <= groups[-1][1]:
+            groups[-1][1] = max(groups[-1][1], last)
+            groups[-1][2].append(edit)
+        else:
+            groups.append([first, last, [edit]])
+
+    changes = []
+    for first, last, edits in groups:
+        seg_start = line_starts[first]
+        seg_end = line_starts[last + 1] if last + 1 < len(line_starts) else len(text)
+        pieces = []
+        cursor = seg_start
+        for start, end, _, new_text in edits:
+            pieces.append(text[cursor:start])
+            pieces.append(new_text)
+            cursor = end
+        pieces.append(text[cursor:seg_end])
+        old_lines = _lines(text[seg_start:seg_end])
+        new_lines = _lines(''.join(pieces))
+
+        prefix = 0
+        while prefix < min(len(old_lines), len(new_lines)) and old_lines[prefix] == new_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < min(len(old_lines), len(new_lines)) - prefix
+               and old_lines[-1 - suffix] == new_lines[-1 - suffix]):
+            suffix += 1
+        changes.append((
+            first + prefix,
+            old_lines[prefix:len(old_lines) - suffix],
+            new_lines[prefix:len(new_lines) - suffix],
+        ))
+    return changes
+
+
+def diff_path(path, source_file):
+    # `path` relative to the directory the target was given relative to
+    base = os.path.dirname(os.path.abspath(source_file))
+    try:
+        relative = os.path.relpath(os.path.abspath(path), base)
+    except ValueError:
+        # Another drive on Windows
+        return path
+    return os.path.normpath(os.path.join(os.path.dirname(source_file), relative))
+
+
+def plan_diff(plan, path, context=3, new=False):
+    text = plan.text
+    line_starts = [0] + [m.end() for m in re.finditer('\n', text)]
+    line_count = len(line_starts) - (1 if line_starts[-1] == len(text) else 0)
+
+    def line(i):
+        return text[line_starts[i]:line_starts[i + 1] if i + 1 < len(line_starts) else len(text)]
+
+    hunks = []
+    for change in _changes(plan, line_starts):
+        if not change[1] and not change[2]:
+            continue
+        if hunks and change[0] - hunks[-1][-1][0] - len(hunks[-1][-1][1]) <= 2 * context:
+            hunks[-1].append(change)
+        else:
+            hunks.append([change])
+
+    path = path.replace('\\', '/').lstrip('/')
+    out = ['--- /dev/null\n' if new else f'--- a/{path}\n', f'+++ b/{path}\n']
+    shift = 0  # new-file line offset caused by earlier hunks
+    for hunk in hunks:
+        old_start = max(0, hunk[0][0] - context)
+        old_end = min(line_count, hunk[-1][0] + len(hunk[-1][1]) + context)
+        body = []
+        cursor = old_start
+        hunk_shift = 0
+        for first, old_lines, new_lines in hunk:
+            body.extend(' ' + line(i) for i in range(cursor, first))
+            body.extend('-' + l for l in old_lines)
+            body.extend('+' + l for l in new_lines)
+            cursor = first + len(old_lines)
+            hunk_shift += len(new_lines) - len(old_lines)
+        body.extend(' ' + line(i) for i in range(cursor, old_end))
+        old_count = old_end - old_start
+        new_count = old_count + hunk_shift
+        out.append(f'@@ -{_format_range(old_start, old_count)} '
+                   f'+{_format_range(old_start + shift, new_count)} @@\n')
+        out.extend(l if l.endswith('\n') else l + '\n\\ No newline at end of file\n' for l in body)
+        shift += hunk_shift
+    return ''.join(out) if hunks else ''
+
+
+class PatchProfile:
+    def __init__(self):
+        self.units = {}
+        self.stages = {}
+
+    def _unit(self, name):
+        if name not in self.units:
+            self.units[name] = {'locate_ms': 0.0, 'apply_ms': 0.0, 'bytes_added': 0}
+        return self.units[name]
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def totals(self):
+        # Milliseconds per pipeline stage: read, locate, splice, write
+        return {
+            'read': self.stages.get('read', 0.0),
+            'locate': sum(unit['locate_ms'] for unit in self.units.values()),
+            'splice': sum(unit['apply_ms'] for unit in self.units.values()),
+            'write': self.stages.get('write', 0.0),
+        }
+
+    @contextmanager
+    def locate(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._unit(name)['locate_ms'] += (time.perf_counter() - start) * 1000
+
+    @contextmanager
+    def apply(self, name, plan):
+        # Everything the unit adds to `plan` inside the block is credited to it
+        first_edit = len(plan.edits)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            unit = self._unit(name)
+            unit['apply_ms'] += (time.perf_counter() - start) * 1000
+            for edit_start, edit_end, _, new_text in plan.edits[first_edit:]:
+                unit['bytes_added'] += (len(new_text.encode('utf-8'))
+                                        - len(plan.text[edit_start:edit_end].encode('utf-8')))
+
+    def format(self):
+        return format_profile(self.units)
+
+
+def format_profile(units):
+    # `units` as collected by PatchProfile; plain dicts so worker results can be reported too
+    rows = [f"{'unit':24} {'locate ms':>10} {'apply ms':>10} {'bytes added':>12}"]
+    for name, unit in units.items():
+        rows.append(f"{name:24} {unit['locate_ms']:10.2f} {unit['apply_ms']:10.2f} {unit['bytes_added']:12,}")
+    return '\n'.join(rows)
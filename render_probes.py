@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Render-cost probes for the blocks and hooks the patch scripts inject.
+
+With `--instrument`, add_ui_components wraps the XP bar, Active Orders
+row, Warning Banners, Level Up modal and Disaster overlay in a
+`<RenderProbe>` (a React.Profiler that records every commit), and
+enhance_game wraps gainXP, createOrder, checkOrderMatch and
+triggerDisaster in `probeHook()`. Both write performance.measure entries
+and per-block commit counts into a small runtime injected after the
+imports. In the browser, `window.__renderProbes.download()` saves the
+trace as JSON; `reset()` starts a new capture.
+
+Probes are ordinary patch units: rerunning the same scripts without
+`--instrument` upgrades every unit back to its plain text and removes
+the runtime once nothing uses it, so production builds carry none of it.
+React only calls Profiler callbacks in development and profiling builds.
+
+This module also merges exported traces into per-block summaries and
+folded stacks for flame graph tools:
+
+    python render_probes.py trace-*.json
+    python render_probes.py trace.json --folded probes.folded
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import namedtuple
+
+from jsx_structure import scan
+
+RUNTIME_UNIT = 'render_probes'
+
+RUNTIME = '''
+// Render-cost probes; rerun the patch scripts without --instrument to remove
+const renderProbes = { commits: {}, startedAt: typeof performance !== 'undefined' ? performance.now() : 0 };
+
+const recordRender = (id, phase, actualDuration, baseDuration, startTime, commitTime) => {
+  renderProbes.commits[id] = (renderProbes.commits[id] || 0) + 1;
+  performance.measure(`render:${id}`, {
+    start: startTime,
+    duration: actualDuration,
+    detail: { phase, baseDuration, commitTime }
+  });
+};
+
+const RenderProbe = ({ id, children }) => (
+  <React.Profiler id={id} onRender={recordRender}>{children}</React.Profiler>
+);
+
+const probeHook = (name, fn) => (...args) => {
+  const mark = performance.mark(`hook:${name}`);
+  try {
+    return fn(...args);
+  } finally {
+    performance.measure(`hook:${name}`, { start: mark.startTime, detail: { phase: 'call' } });
+  }
+};
+
+if (typeof window !== 'undefined') {
+  window.__renderProbes = {
+    export: () => ({
+      version: 1,
+      startedAt: renderProbes.startedAt,
+      endedAt: performance.now(),
+      commits: { ...renderProbes.commits },
+      measures: performance.getEntriesByType('measure')
+        .filter(m => m.name.startsWith('render:') || m.name.startsWith('hook:'))
+        .map(m => ({ name: m.name, start: m.startTime, duration: m.duration, phase: m.detail?.phase }))
+    }),
+    download: (filename = 'render-probes.json') => {
+      const link = document.createElement('a');
+      link.href = URL.createObjectURL(new Blob([JSON.stringify(window.__renderProbes.export())], { type: 'application/json' }));
+      link.download = filename;
+      link.click();
+      URL.revokeObjectURL(link.href);
+    },
+    reset: () => {
+      renderProbes.commits = {};
+      renderProbes.startedAt = performance.now();
+      performance.clearMarks();
+      performance.clearMeasures();
+    }
+  };
+}
+'''
+
+PROBE_SITE_RE = re.compile(r'<RenderProbe\b|\bprobeHook\(')
+IMPORT_RE = re.compile(r'^import\b[^;]*;[ \t]*\n', re.MULTILINE)
+BLOCK_COMMENT_RE = re.compile(r'^([ \t]*)\{/\*.*\*/\}[ \t]*\n', re.MULTILINE)
+
+
+class ProbeError(ValueError):
+    pass
+
+
+def probe_block(name, block):
+    # Wrap the JSX after a block's `{/* Title */}` comment in <RenderProbe id=name>
+    comment = BLOCK_COMMENT_RE.search(block)
+    if not comment:
+        raise ProbeError(f'UI block {name!r} has no {{/* ... */}} title comment')
+    indent = comment.group(1)
+    body = block[comment.end():]
+    nested = '\n'.join('  ' + line if line.strip() else line for line in body.split('\n'))
+    return (f'{block[:comment.end()]}{indent}<RenderProbe id="{name}">\n'
+            f'{nested}\n{indent}</RenderProbe>')
+
+
+def probe_hooks(text, names):
+    # Wrap the callbacks of `const name = useCallback(...)` in probeHook('name', ...)
+    structure = scan(text)
+    edits = []
+    for name in names:
+        match = re.search(r'\bconst\s+' + re.escape(name) + r'\s*=\s*useCallback\s*\(', text)
+        if not match:
+            raise ProbeError(f'No useCallback bound to {name!r}')
+        arrow = text.find('=>', match.end())
+        body = re.compile(r'\S').search(text, arrow + 2).start()
+        end = structure.match(body) + 1 if text[body] in '{(' else None
+        if end is None:
+            raise ProbeError(f'{name} must have a block body to be probed')
+        edits.append((match.end(), f"probeHook('{name}', "))
+        edits.append((end, ')'))
+    for offset, insert in sorted(edits, reverse=True):
+        text = text[:offset] + insert + text[offset:]
+    return text
+
+
+def plan_runtime(plan, ledger, content, instrument, probed_units):
+    # Add the probe runtime when instrumenting. Otherwise remove it, unless
+    # probes other than the caller's own (`probed_units`, the instrumented
+    # texts about to be stripped) still use it.
+    if instrument:
+        imports = list(IMPORT_RE.finditer(content))
+        ledger.plan_insert(plan, RUNTIME_UNIT, RUNTIME, imports[-1].end() if imports else 0)
+        return
+    if RUNTIME_UNIT not in ledger.units and RUNTIME.strip() not in content:
+        return
+    own = sum(len(PROBE_SITE_RE.findall(text)) for text in probed_units if text.strip() in content)
+    if len(PROBE_SITE_RE.findall(content)) <= own:
+        ledger.plan_remove(plan, RUNTIME_UNIT, RUNTIME)
+
+
+# Aggregated timings for one probe: a UI block or a hook
+ProbeSummary = namedtuple('ProbeSummary', [
+    'name', 'kind', 'count', 'commits', 'total_ms', 'mean_ms', 'p95_ms', 'max_ms', 'share', 'phases'])
+
+
+def load_trace(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        trace = json.load(f)
+    if trace.get('version') != 1 or 'measures' not in trace:
+        raise ProbeError(f'{path} is not a render probe trace')
+    return trace
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def summarize_traces(traces):
+    # Merge traces into one ProbeSummary per probe, costliest first
+    durations = {}
+    phases = {}
+    commits = {}
+    for trace in traces:
+        for measure in trace['measures']:
+            durations.setdefault(measure['name'], []).append(measure['duration'])
+            by_phase = phases.setdefault(measure['name'], {})
+            phase = measure.get('phase') or 'render'
+            by_phase[phase] = by_phase.get(phase, 0.0) + measure['duration']
+        for name, count in trace.get('commits', {}).items():
+            commits[f'render:{name}'] = commits.get(f'render:{name}', 0) + count
+
+    grand_total = sum(sum(values) for values in durations.values()) or 1.0
+    summaries = []
+    for key, values in durations.items():
+        kind, name = key.split(':', 1)
+        total = sum(values)
+        summaries.append(ProbeSummary(
+            name, 'block' if kind == 'render' else 'hook', len(values), commits.get(key, 0), total,
+            total / len(values), _percentile(values, 0.95), max(values), total / grand_total, phases[key]))
+    summaries.sort(key=lambda s: -s.total_ms)
+    return summaries
+
+
+def capture_seconds(traces):
+    return sum(max(0.0, t.get('endedAt', 0) - t.get('startedAt', 0)) for t in traces) / 1000
+
+
+def folded_stacks(summaries):
+    # One `frame;frame microseconds` line per probe and phase
+    lines = []
+    for s in summaries:
+        root = 'CookingGame;render' if s.kind == 'block' else 'CookingGame;hooks'
+        for phase, ms in sorted(s.phases.items()):
+            lines.append(f'{root};{s.name};{phase} {round(ms * 1000)}')
+    return '\n'.join(lines) + '\n'
+
+
+def print_summary(summaries, seconds):
+    if not summaries:
+        print('No probe measures in the trace(s).')
+        return
+    print(f"{'probe':18} {'kind':6} {'count':>7} {'commits':>8} {'total ms':>10} {'mean':>8} "
+          f"{'p95':>8} {'max':>8} {'share':>6}")
+    for s in summaries:
+        print(f'{s.name:18} {s.kind:6} {s.count:7,} {s.commits:8,} {s.total_ms:10.1f} {s.mean_ms:8.2f} '
+              f'{s.p95_ms:8.2f} {s.max_ms:8.2f} {s.share:6.1%}')
+    if seconds:
+        total = sum(s.total_ms for s in summaries)
+        print(f'\n{seconds:.1f}s captured, {total / seconds / 10:.2f}% of wall time inside probes')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Merge render probe traces into per-block summaries')
+    parser.add_argument('traces', nargs='+', help='JSON traces saved with window.__renderProbes.download()')
+    parser.add_argument('--folded', help='also write folded stacks (flamegraph.pl, speedscope) to this file')
+    parser.add_argument('--json', dest='json_path', help='also write the summaries as JSON')
+    args = parser.parse_args(argv)
+
+    traces = [load_trace(path) for path in args.traces]
+    summaries = summarize_traces(traces)
+    print_summary(summaries, capture_seconds(traces))
+    if args.folded:
+        with open(args.folded, 'w', encoding='utf-8') as f:
+            f.write(folded_stacks(summaries))
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump([s._asdict() for s in summaries], f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""
+Versioned binary save format for the player profile.
+
+Generates src/systems/profileCodec.js, which profileStorage.js uses to
+write the `kitchenExplorerProfile` localStorage entry, and reads the
+same format offline. A save is base64 of:
+
+    varint  format (3)
+    varint  level, xp, totalXP
+    keyset  unlocked ingredients      bytes: bit N set = ID N unlocked,
+    keyset  discovered recipes        then keys that have no ID yet
+    varint  stat count, then per stat (ID + 1, or 0 and its name) and value
+    string  JSON of any other profile fields, or empty
+
+Varints are unsigned LEB128 and strings are UTF-8 with a varint length.
+Ingredient, recipe and stat IDs are assigned from gameData.js in
+declaration order. They are append-only: regenerating keeps the IDs
+already in the codec and numbers new keys after them, so every save
+ever written still decodes. Fields that are not non-negative integers
+are kept exactly in the JSON tail.
+
+Older saves migrate on load: format 1 is the plain JSON profile (which
+could hold duplicate unlocks), format 2 the JSON with hex bitsets.
+
+    python save_codec.py --generate
+    python save_codec.py save.txt
+    python save_codec.py --verify saves/*.txt
+    python save_codec.py --migrate saves/*.txt
+"""
+
+import argparse
+import ast
+import base64
+import json
+import os
+import re
+import sys
+import textwrap
+
+from game_data import DEFAULT_GAME_DATA, load_game_data
+from patch_io import write_atomic
+
+DEFAULT_CODEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'systems', 'profileCodec.js')
+
+SAVE_FORMAT = 3
+ID_TABLES = ('ingredients', 'recipes', 'stats')
+COUNTERS = ('level', 'xp', 'totalXP')
+STAT_KEYS = ('recipesCompleted', 'customersServed', 'disastersHandled', 'perfectDishes')
+
+SAVE_IDS_RE = re.compile(r'^export const SAVE_IDS = (\{.*?^\});', re.MULTILINE | re.DOTALL)
+
+CODEC_TEMPLATE = '''// Generated by save_codec.py from data/gameData.js.
+// IDs are append-only so every old save still decodes; after editing gameData.js,
+// re-run `python save_codec.py --generate` instead of editing this file.
+
+export const SAVE_FORMAT = __SAVE_FORMAT__;
+
+export const SAVE_IDS = __SAVE_IDS__;
+
+const INDEX = Object.fromEntries(
+  Object.entries(SAVE_IDS).map(([table, keys]) => [table, new Map(keys.map((key, id) => [key, id]))])
+);
+const COUNTERS = ['level', 'xp', 'totalXP'];
+const textEncoder = new TextEncoder();
+const textDecoder = new TextDecoder();
+
+const isCount = (value) => Number.isSafeInteger(value) && value >= 0;
+
+// Bytes per String.fromCharCode call; spreading a whole save into one call
+// overflows the stack once it holds a long stats history
+const BASE64_CHUNK = 0x8000;
+
+function toBase64(bytes) {
+  let binary = '';
+  for (let i = 0; i < bytes.length; i += BASE64_CHUNK) {
+    binary += String.fromCharCode.apply(null, bytes.subarray(i, i + BASE64_CHUNK));
+  }
+  return btoa(binary);
+}
+
+class SaveWriter {
+  constructor() {
+    this.bytes = [];
+  }
+
+  varint(value) {
+    let n = value;
+    while (n >= 0x80) {
+      this.bytes.push((n % 0x80) | 0x80);
+      n = Math.floor(n / 0x80);
+    }
+    this.bytes.push(n);
+  }
+
+  raw(bytes) {
+    this.varint(bytes.length);
+    for (const byte of bytes) this.bytes.push(byte);
+  }
+
+  string(text) {
+    this.raw(textEncoder.encode(text));
+  }
+
+  keys(keys, table) {
+    const index = INDEX[table];
+    const bits = new Uint8Array(Math.ceil(SAVE_IDS[table].length / 8));
+    const extra = [];
+    for (const key of new Set(keys)) {
+      const id = index.get(key);
+      if (id === undefined) {
+        extra.push(key);
+      } else {
+        bits[id >> 3] |= 1 << (id & 7);
+      }
+    }
+    let length = bits.length;
+    while (length > 0 && bits[length - 1] === 0) length--;
+    this.raw(bits.subarray(0, length));
+    this.varint(extra.length);
+    extra.forEach((key) => this.string(key));
+  }
+}
+
+class SaveReader {
+  constructor(bytes) {
+    this.bytes = bytes;
+    this.pos = 0;
+  }
+
+  varint() {
+    let value = 0;
+    let scale = 1;
+    let byte;
+    do {
+      if (this.pos >= this.bytes.length) throw new Error('Truncated save');
+      byte = this.bytes[this.pos++];
+      value += (byte & 0x7f) * scale;
+      scale *= 0x80;
+    } while (byte & 0x80);
+    return value;
+  }
+
+  raw() {
+    const length = this.varint();
+    if (this.pos + length > this.bytes.length) throw new Error('Truncated save');
+    this.pos += length;
+    return this.bytes.subarray(this.pos - length, this.pos);
+  }
+
+  string() {
+    return textDecoder.decode(this.raw());
+  }
+
+  keys(table) {
+    const keys = [];
+    this.raw().forEach((byte, i) => {
+      for (let bit = 0; bit < 8; bit++) {
+        if (byte & (1 << bit)) {
+          const key = SAVE_IDS[table][i * 8 + bit];
+          if (key === undefined) throw new Error(`Unknown ${table} ID ${i * 8 + bit}`);
+          keys.push(key);
+        }
+      }
+    });
+    const extra = this.varint();
+    for (let i = 0; i < extra; i++) keys.push(this.string());
+    return keys;
+  }
+}
+
+function hexKeys(bits = '', table) {
+  const keys = [];
+  [...bits].forEach((digit, i) => {
+    for (let bit = 0; bit < 4; bit++) {
+      if (parseInt(digit, 16) & (1 << bit) && SAVE_IDS[table][i * 4 + bit] !== undefined) {
+        keys.push(SAVE_IDS[table][i * 4 + bit]);
+      }
+    }
+  });
+  return keys;
+}
+
+// JSON saves from before the binary format, by their `v` (none = 1)
+const MIGRATIONS = {
+  1: (saved) => saved,
+  2: ({ v, ingredients, recipes, extraIngredients = [], extraRecipes = [], ...rest }) => ({
+    ...rest,
+    unlockedIngredients: [...hexKeys(ingredients, 'ingredients'), ...extraIngredients],
+    discoveredRecipes: [...hexKeys(recipes, 'recipes'), ...extraRecipes],
+  }),
+};
+
+function migrate(saved) {
+  const version = saved.v ?? 1;
+  if (!MIGRATIONS[version]) throw new Error(`Unsupported save version ${version}`);
+  const profile = MIGRATIONS[version](saved);
+  for (const field of ['unlockedIngredients', 'discoveredRecipes']) {
+    if (Array.isArray(profile[field])) profile[field] = [...new Set(profile[field])];
+  }
+  return profile;
+}
+
+/**
+ * Serialize a profile in the current binary format
+ * @param {Object} profile - Player profile
+ * @returns {string} base64 save
+ */
+export function encodeProfile({ unlockedIngredients = [], discoveredRecipes = [], stats = {}, ...rest }) {
+  const writer = new SaveWriter();
+  const other = { ...rest };
+  writer.varint(SAVE_FORMAT);
+  for (const field of COUNTERS) {
+    writer.varint(isCount(rest[field]) ? rest[field] : 0);
+    if (isCount(rest[field])) delete other[field];
+  }
+  writer.keys(unlockedIngredients, 'ingredients');
+  writer.keys(discoveredRecipes, 'recipes');
+
+  const entries = Object.entries(stats);
+  if (entries.every(([, value]) => isCount(value))) {
+    writer.varint(entries.length);
+    for (const [name, value] of entries) {
+      const id = INDEX.stats.get(name);
+      writer.varint(id === undefined ? 0 : id + 1);
+      if (id === undefined) writer.string(name);
+      writer.varint(value);
+    }
+  } else {
+    writer.varint(0);
+    other.stats = stats;
+  }
+  writer.string(Object.keys(other).length > 0 ? JSON.stringify(other) : '');
+  return toBase64(Uint8Array.from(writer.bytes));
+}
+
+/**
+ * Parse a save in any format, migrating older ones
+ * @param {string} text - Saved text
+ * @returns {Object} Player profile
+ */
+export function decodeProfile(text) {
+  if (text.trimStart().startsWith('{')) {
+    return migrate(JSON.parse(text));
+  }
+  const reader = new SaveReader(Uint8Array.from(atob(text), (c) => c.charCodeAt(0)));
+  const format = reader.varint();
+  if (format !== SAVE_FORMAT) throw new Error(`Unsupported save format ${format}`);
+  const profile = {};
+  for (const field of COUNTERS) profile[field] = reader.varint();
+  profile.unlockedIngredients = reader.keys('ingredients');
+  profile.discoveredRecipes = reader.keys('recipes');
+  profile.stats = {};
+  const count = reader.varint();
+  for (let i = 0; i < count; i++) {
+    const id = reader.varint();
+    const name = id === 0 ? reader.string() : SAVE_IDS.stats[id - 1];
+    profile.stats[name] = reader.varint();
+  }
+  const other = reader.string();
+  return other ? { ...profile, ...JSON.parse(other) } : profile;
+}
+'''
+
+
+class SaveError(ValueError):
+    pass
+
+
+def assign_ids(game_data, previous=None):
+    # {table: [key, ...]}; keys keep their previous IDs, new keys are appended
+    current = {
+        'ingredients': [record.key for record in game_data.ingredients],
+        'recipes': [record.key for record in game_data.recipes],
+        'stats': list(STAT_KEYS),
+    }
+    ids = {}
+    for table in ID_TABLES:
+        keys = list((previous or {}).get(table, ()))
+        known = set(keys)
+        keys.extend(key for key in current[table] if key not in known)
+        ids[table] = keys
+    return ids
+
+
+def render_codec(ids):
+    tables = []
+    for table in ID_TABLES:
+        keys = textwrap.fill(', '.join(f"'{key}'" for key in ids[table]), 96,
+                             initial_indent='    ', subsequent_indent='    ', break_on_hyphens=False)
+        tables.append(f'  {table}: [\n{keys}\n  ]')
+    return (CODEC_TEMPLATE.replace('__SAVE_FORMAT__', str(SAVE_FORMAT))
+            .replace('__SAVE_IDS__', '{\n' + ',\n'.join(tables) + '\n}'))
+
+
+def load_save_ids(codec_path=DEFAULT_CODEC):
+    # The ID tables of a generated codec, or None if it does not exist yet
+    if not os.path.exists(codec_path):
+        return None
+    with open(codec_path, 'r', encoding='utf-8') as f:
+        match = SAVE_IDS_RE.search(f.read())
+    if not match:
+        raise SaveError(f'{codec_path} has no SAVE_IDS table')
+    body = re.sub(r'^(\s*)(\w+):', r"\1'\2':", match.group(1), flags=re.MULTILINE)
+    return ast.literal_eval(body)
+
+
+def generate_codec(game_data_path=DEFAULT_GAME_DATA, codec_path=DEFAULT_CODEC):
+    # Write the codec; returns (ids, {table: number of new keys})
+    previous = load_save_ids(codec_path)
+    ids = assign_ids(load_game_data(game_data_path), previous)
+    added = {table: len(ids[table]) - len((previous or {}).get(table, ())) for table in ID_TABLES}
+    os.makedirs(os.path.dirname(os.path.abspath(codec_path)), exist_ok=True)
+    write_atomic(codec_path, [render_codec(ids).encode('utf-8')])
+    return ids, added
+
+
+def _is_count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _raw(out, data):
+    _varint(out, len(data))
+    out.extend(data)
+
+
+def _keys(out, keys, table):
+    index = {key: i for i, key in enumerate(table)}
+    bits = bytearray((len(table) + 7) // 8)
+    extra = []
+    for key in dict.fromkeys(keys):
+        if key in index:
+            bits[index[key] >> 3] |= 1 << (index[key] & 7)
+        else:
+            extra.append(key)
+    _raw(out, bytes(bits).rstrip(b'\0'))
+    _varint(out, len(extra))
+    for key in extra:
+        _raw(out, key.encode('utf-8'))
+
+
+def _json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def encode_save(profile, ids):
+    # The base64 save profileCodec.js would write for `profile`
+    other = dict(profile)
+    ingredients = other.pop('unlockedIngredients', [])
+    recipes = other.pop('discoveredRecipes', [])
+    stats = other.pop('stats', {})
+    out = bytearray()
+    _varint(out, SAVE_FORMAT)
+    for field in COUNTERS:
+        value = profile.get(field)
+        _varint(out, value if _is_count(value) else 0)
+        if _is_count(value):
+            del other[field]
+    _keys(out, ingredients, ids['ingredients'])
+    _keys(out, recipes, ids['recipes'])
+    if all(_is_count(value) for value in stats.values()):
+        _varint(out, len(stats))
+        for name, value in stats.items():
+            stat_id = ids['stats'].index(name) + 1 if name in ids['stats'] else 0
+            _varint(out, stat_id)
+            if not stat_id:
+                _raw(out, name.encode('utf-8'))
+            _varint(out, value)
+    else:
+        _varint(out, 0)
+        other['stats'] = stats
+    _raw(out, _json(other).encode('utf-8') if other else b'')
+    return base64.b64encode(bytes(out)).decode('ascii')
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def varint(self):
+        value = shift = 0
+        while True:
+            if self.pos >= len(self.data):
+                raise SaveError('truncated save')
+            byte = self.data[self.pos]
+            self.pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value
+
+    def raw(self):
+        length = self.varint()
+        if self.pos + length > len(self.data):
+            raise SaveError('truncated save')
+        self.pos += length
+        return self.data[self.pos - length:self.pos]
+
+    def string(self):
+        return self.raw().decode('utf-8')
+
+    def keys(self, table, name):
+        keys = []
+        for i, byte in enumerate(self.raw()):
+            for bit in range(8):
+                if byte & (1 << bit):
+                    if i * 8 + bit >= len(table):
+                        raise SaveError(f'unknown {name} ID {i * 8 + bit}')
+                    keys.append(table[i * 8 + bit])
+        keys.extend(self.string() for _ in range(self.varint()))
+        return keys
+
+
+def _hex_keys(bits, table):
+    return [table[i * 4 + bit] for i, digit in enumerate(bits or '') for bit in range(4)
+            if int(digit, 16) & (1 << bit) and i * 4 + bit < len(table)]
+
+
+def decode_save(text, ids):
+    # (profile, format) for a save in any format, migrated to the current shape
+    text = text.strip()
+    if text.startswith('{'):
+        saved = json.loads(text)
+        version = saved.get('v', 1)
+        if version == 1:
+            profile = dict(saved)
+        elif version == 2:
+            profile = {key: value for key, value in saved.items()
+                       if key not in ('v', 'ingredients', 'recipes', 'extraIngredients', 'extraRecipes')}
+            profile['unlockedIngredients'] = (_hex_keys(saved.get('ingredients'), ids['ingredients'])
+                                              + saved.get('extraIngredients', []))
+            profile['discoveredRecipes'] = (_hex_keys(saved.get('recipes'), ids['recipes'])
+                                            + saved.get('extraRecipes', []))
+        else:
+            raise SaveError(f'unsupported save version {version}')
+        for field in ('unlockedIngredients', 'discoveredRecipes'):
+            if isinstance(profile.get(field), list):
+                profile[field] = list(dict.fromkeys(profile[field]))
+        return profile, version
+
+    try:
+        reader = _Reader(base64.b64decode(text, validate=True))
+    except ValueError:
+        raise SaveError('not a JSON or base64 save') from None
+    version = reader.varint()
+    if version != SAVE_FORMAT:
+        raise SaveError(f'unsupported save format {version}')
+    profile = {field: reader.varint() for field in COUNTERS}
+    profile['unlockedIngredients'] = reader.keys(ids['ingredients'], 'ingredient')
+    profile['discoveredRecipes'] = reader.keys(ids['recipes'], 'recipe')
+    stats = {}
+    for _ in range(reader.varint()):
+        stat_id = reader.varint()
+        if stat_id > len(ids['stats']):
+            raise SaveError(f'unknown stat ID {stat_id - 1}')
+        name = reader.string() if stat_id == 0 else ids['stats'][stat_id - 1]
+        stats[name] = reader.varint()
+    profile['stats'] = stats
+    other = reader.string()
+    if other:
+        profile.update(json.loads(other))
+    if reader.pos != len(reader.data):
+        raise SaveError(f'{len(reader.data) - reader.pos} trailing bytes')
+    return profile, version
+
+
+def verify_save(text, ids, game_data):
+    # Problems found in one save; an empty list means it is current and sound
+    problems = []
+    profile, version = decode_save(text, ids)
+    if version != SAVE_FORMAT:
+        problems.append(f'format {version}, needs migrating to {SAVE_FORMAT}')
+        if version == 1:
+            saved = json.loads(text)
+            for field in ('unlockedIngredients', 'discoveredRecipes'):
+                duplicates = len(saved.get(field, [])) - len(set(saved.get(field, [])))
+                if duplicates:
+                    problems.append(f'{duplicates} duplicate {field}')
+
+    for field, known in (('unlockedIngredients', game_data.ingredient_ids),
+                         ('discoveredRecipes', game_data.recipe_ids)):
+        missing = [key for key in profile.get(field, []) if key not in known]
+        if missing:
+            problems.append(f"{field} not in gameData.js: {', '.join(missing)}")
+    for field in COUNTERS:
+        if not _is_count(profile.get(field)):
+            problems.append(f'{field} is {profile.get(field)!r}, not a non-negative integer')
+    if _is_count(profile.get('xp')) and _is_count(profile.get('totalXP')) and profile['xp'] > profile['totalXP']:
+        problems.append(f"xp {profile['xp']} exceeds totalXP {profile['totalXP']}")
+
+    if decode_save(encode_save(profile, ids), ids)[0] != profile:
+        problems.append('does not survive an encode/decode round trip')
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('saves', nargs='*', help='files holding a saved kitchenExplorerProfile value')
+    parser.add_argument('--generate', action='store_true', help='write the JS codec from gameData.js')
+    parser.add_argument('--verify', action='store_true', help='check saves; exit with status 1 if any has problems')
+    parser.add_argument('--migrate', action='store_true', help='rewrite saves in the current format')
+    parser.add_argument('--data', default=DEFAULT_GAME_DATA, help='path to gameData.js')
+    parser.add_argument('--codec', default=DEFAULT_CODEC, help='generated codec (default: src/systems/profileCodec.js)')
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        ids, added = generate_codec(args.data, args.codec)
+        print(f'Codec written to: {args.codec}')
+        for table in ID_TABLES:
+            print(f'  {table}: {len(ids[table])} IDs ({added[table]} new)')
+        if not args.saves:
+            return 0
+    elif not args.saves:
+        parser.error('no saves given')
+
+    ids = load_save_ids(args.codec)
+    if ids is None:
+        parser.error(f'{args.codec} does not exist; run with --generate first')
+    game_data = load_game_data(args.data) if args.verify else None
+    status = 0
+    for path in args.saves:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        try:
+            if args.verify:
+                problems = verify_save(text, ids, game_data)
+                print(f"{path}: {'ok' if not problems else '; '.join(problems)}")
+                status = status or (1 if problems else 0)
+            elif args.migrate:
+                profile, version = decode_save(text, ids)
+                migrated = encode_save(profile, ids)
+                write_atomic(path, [migrated.encode('ascii')])
+                print(f'{path}: format {version} -> {SAVE_FORMAT}, {len(text.strip()):,} -> {len(migrated):,} chars')
+            else:
+                print(json.dumps(decode_save(text, ids)[0], indent=2, ensure_ascii=False))
+        except (SaveError, ValueError) as e:
+            print(f'{path}: {e}', file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Single-pass splice engine for patching large source files.
+
+Edits are recorded as (offset, insert/replace) records against the
+original text and applied together in one linear pass, so an anchor
+found in the original never drifts because of an earlier edit.
+"""
+
+
+class SpliceError(ValueError):
+    pass
+
+
+class SplicePlan:
+    def __init__(self, text):
+        self.text = text
+        self.edits = []  # (start, end, seq, new_text)
+
+    def __len__(self):
+        return len(self.edits)
+
+    def _check_range(self, start, end):
+        if not 0 <= start <= end <= len(self.text):
+            raise SpliceError(f'Edit range {start}:{end} outside of text (length {len(self.text)})')
+
+    def insert(self, offset, new_text):
+        self._check_range(offset, offset)
+        self.edits.append((offset, offset, len(self.edits), new_text))
+
+    def replace(self, start, end, new_text):
+        self._check_range(start, end)
+        self.edits.append((start, end, len(self.edits), new_text))
+
+    def replace_all(self, old, new, start=0, end=None):
+        # Plan a replacement for every occurrence of `old` in text[start:end]
+        end = len(self.text) if end is None else end
+        count = 0
+        pos = self.text.find(old, start, end)
+        while pos != -1:
+            self.replace(pos, pos + len(old), new)
+            count += 1
+            pos = self.text.find(old, pos + len(old), end)
+        return count
+
+    def ordered_edits(self):
+        # Inserts at the same offset keep the order they were planned in
+        edits = sorted(self.edits)
+        last_end = 0
+        for start, end, _, _ in edits:
+            if start < last_end:
+                raise SpliceError(f'Overlapping edits at offset {start}')
+            last_end = max(last_end, end)
+        return edits
+
+    def segments(self):
+        # Yield output pieces in order: untouched original slices and new text
+        cursor = 0
+        for start, end, _, new_text in self.ordered_edits():
+            if start > cursor:
+                yield self.text[cursor:start]
+            if new_text:
+                yield new_text
+            cursor = end
+        if cursor < len(self.text):
+            yield self.text[cursor:]
+
+    def apply(self):
+        return ''.join(self.segments())
+
+    def size_delta(self):
+        # Length change of the output, without building it
+        return sum(len(new_text) - (end - start) for start, end, _, new_text in self.edits)
+
+    def line_delta(self):
+        return sum(new_text.count('\n') - self.text.count('\n', start, end)
+                   for start, end, _, new_text in self.edits)
+
+    def map_offset(self, offset):
+        # Translate an offset in the original text to its position in the output
+        shift = 0
+        for start, end, _, new_text in self.ordered_edits():
+            if start > offset or (start == offset and end > start):
+                break
+            if end > offset:
+                raise SpliceError(f'Offset {offset} falls inside a replaced range')
+            shift += len(new_text) - (end - start)
+        return offset + shift
@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+Build stage that rasterizes every ingredient state of IngredientSVG into a
+packed sprite atlas.
+
+Each (ingredient, state) pair listed in INGREDIENTS in gameData.js is run
+through the component offline: a small evaluator walks its switch/if
+branches, constants, style objects, template strings and `.map()` calls
+and yields the exact SVG the browser would build. Definitions an earlier
+svg_sprite.py run moved into IngredientSprite are pulled back in, so the
+markup is self-contained. Every tile is rendered at a few sizes with
+resvg, and identical tiles share one cell of the atlas.
+
+Rendered PNGs are stored in the patch cache, keyed by the hash of the
+tile's SVG source, so a rebuild only rasterizes ingredients whose markup
+changed. The stage writes one sheet per size, a JSON map of tile cells
+and a generated IngredientAtlas component that draws a tile from the
+sheets; IngredientSVG is patched to return it whenever a tile exists, so
+feTurbulence/feDisplacementMap filters and gradients are composited once
+at build time instead of on every frame of a drag.
+
+Branches that cannot be resolved offline (calls into other components,
+animations, text that depends on installed fonts, randomness) stay live
+SVG and are listed in the report.
+
+The evaluator (jsx_eval.py) is used instead of react-dom/server because
+rendering is the easy half: renderToStaticMarkup would just as happily
+render a Math.random() branch or one frame of an animation, and the
+atlas would freeze it. The evaluator refuses anything it cannot
+reproduce exactly, and that refusal is what decides whether a tile may be
+rasterized. It reads the JSX straight from the patch target, in the same
+process as the patch cache and ledger, and code_split.py reuses its
+parser for scope analysis.
+
+This stage needs resvg_py and Pillow (pip install -r requirements.txt).
+
+    python sprite_atlas.py src/CookingGame.jsx --dry-run
+    python sprite_atlas.py src/CookingGame.jsx --sizes 32,64,128
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import re
+import sys
+
+import resvg_py
+from PIL import Image
+
+from game_data import game_data_for, load_game_data
+from jsx_eval import Element, Unsupported, evaluate_declaration, evaluate_jsx, is_number, js_str
+from patch_cache import PatchCache, content_hash
+from patch_io import MappedSource, write_atomic, write_plan
+from patch_ledger import PatchLedger
+from patch_report import PatchProfile, diff_path, format_profile, plan_diff
+from splice import SplicePlan
+from svg_sprite import ID_RE, REF_RE, read_sprite, sprite_path_for
+
+DEFAULT_SOURCE = 'C:/Dev/Kitchen_Explorer/src/CookingGame.jsx'
+
+COMPONENT = 'IngredientSVG'
+DEFAULT_SIZES = (32, 64, 128)  # covers the 24-60px the game draws at, on 1x and 2x screens
+PADDING = 1  # transparent pixels around each tile, so scaled sheets never bleed
+
+# Bump when the evaluator or serializer changes what a tile's SVG looks like
+RENDER_VERSION = 1
+
+ATLAS_TEMPLATE = '''// Generated by sprite_atlas.py from {component} in {source}.
+// Re-run the build stage instead of editing this file.
+import React from 'react';
+import atlas from '{map_path}';
+{sheet_imports}
+
+const SHEETS = {{ {sheet_urls} }};
+
+/**
+ * Whether an ingredient state was rasterized into the atlas
+ */
+export const hasAtlasTile = (type, state) => Object.hasOwn(atlas.tiles, `${{type}}:${{state}}`);
+
+/**
+ * {name} - Draws an ingredient state from the prerendered sprite atlas
+ *
+ * Picks the smallest sheet that covers the drawn size on this screen and
+ * crops the tile out of it with the viewBox, so it lays out exactly like
+ * the live SVG it replaces.
+ */
+export const {name} = ({{ type, state, size = 50 }}) => {{
+  const cell = atlas.tiles[`${{type}}:${{state}}`];
+  if (!cell) {{
+    return null;
+  }}
+  const pixels = size * (typeof window === 'undefined' ? 1 : window.devicePixelRatio || 1);
+  const tileSize = atlas.sizes.find((s) => s >= pixels) ?? atlas.sizes[atlas.sizes.length - 1];
+  const sheet = atlas.sheets[tileSize];
+  const pitch = tileSize + 2 * atlas.padding;
+  const x = cell[0] * pitch + atlas.padding;
+  const y = cell[1] * pitch + atlas.padding;
+  return (
+    <svg width={{size}} height={{size}} viewBox={{`${{x}} ${{y}} ${{tileSize}} ${{tileSize}}`}}>
+      <image href={{SHEETS[tileSize]}} width={{sheet.width}} height={{sheet.height}} />
+    </svg>
+  );
+}};
+
+export default {name};
+'''
+
+DRAW_TEMPLATE = '''
+  if (hasAtlasTile(type, state)) {{
+    return <{name} type={{type}} state={{state}} size={{size}} />;
+  }}
+'''
+
+# SVG attributes React spells in camelCase that stay camelCase in markup
+SVG_CAMEL_ATTRS = {
+    'viewBox', 'preserveAspectRatio', 'gradientUnits', 'gradientTransform', 'patternUnits',
+    'patternContentUnits', 'patternTransform', 'spreadMethod', 'stdDeviation', 'baseFrequency',
+    'numOctaves', 'stitchTiles', 'xChannelSelector', 'yChannelSelector', 'filterUnits',
+    'primitiveUnits', 'clipPathUnits', 'maskUnits', 'maskContentUnits', 'markerWidth',
+    'markerHeight', 'markerUnits', 'refX', 'refY', 'pathLength', 'tableValues', 'kernelMatrix',
+    'kernelUnitLength', 'surfaceScale', 'specularConstant', 'specularExponent', 'diffuseConstant',
+    'limitingConeAngle', 'pointsAtX', 'pointsAtY', 'pointsAtZ', 'edgeMode', 'targetX', 'targetY',
+    'textLength', 'lengthAdjust', 'startOffset',
+}
+RENAMED_ATTRS = {'className': 'class', 'xlinkHref': 'xlink:href', 'xmlSpace': 'xml:space'}
+DROPPED_ATTRS = {'key', 'ref', 'children', 'dangerouslySetInnerHTML'}
+UNITLESS_STYLES = {'opacity', 'stopOpacity', 'fillOpacity', 'strokeOpacity', 'floodOpacity',
+                   'strokeWidth', 'strokeMiterlimit', 'fontWeight', 'lineHeight', 'zIndex', 'flex'}
+
+# Elements whose raster would not match what the browser draws
+LIVE_TAGS = {
+    'animate': 'animated', 'animateTransform': 'animated', 'animateMotion': 'animated',
+    'set': 'animated', 'text': 'draws text', 'foreignObject': 'embeds HTML',
+}
+
+CAMEL_RE = re.compile(r'(?<=[a-z0-9])([A-Z])')
+
+def atlas_name_for(component):
+    return component.replace('SVG', 'Atlas') if 'SVG' in component else component + 'Atlas'
+
+
+def _src_root(source_file):
+    # The game's src directory, for a source in it or in its components/
+    directory = os.path.dirname(os.path.abspath(source_file))
+    return os.path.dirname(directory) if os.path.basename(directory) == 'components' else directory
+
+
+def atlas_paths_for(source_file, component=COMPONENT):
+    # (atlas component file, asset directory) next to the patch target
+    root = _src_root(source_file)
+    name = atlas_name_for(component)
+    return os.path.join(root, 'components', name + '.jsx'), os.path.join(root, 'assets', 'atlas')
+
+
+def _escape(text, quote=False):
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    return text.replace('"', '&quot;') if quote else text
+
+
+def _attr_name(name):
+    if name in RENAMED_ATTRS:
+        return RENAMED_ATTRS[name]
+    if name in SVG_CAMEL_ATTRS or name.startswith(('data-', 'aria-')):
+        return name
+    return CAMEL_RE.sub(lambda m: '-' + m.group(1).lower(), name)
+
+
+def _style(style):
+    if isinstance(style, str):
+        return style
+    rules = []
+    for name, value in style.items():
+        if value is None or value is False or value == '':
+            continue
+        if is_number(value) and value != 0 and name not in UNITLESS_STYLES:
+            value = js_str(value) + 'px'
+        rules.append(f'{_attr_name(name)}:{js_str(value)}')
+    return ';'.join(rules)
+
+
+def _flatten(children):
+    for child in children:
+        if isinstance(child, list):
+            yield from _flatten(child)
+        elif isinstance(child, Element) and child.tag is None:
+            yield from _flatten(child.children)
+        elif child is not None and not isinstance(child, bool) and child != '':
+            yield child
+
+
+def serialize(element, root_attrs=None):
+    # SVG markup of an evaluated element; raises Unsupported for anything a raster would get wrong
+    if element.tag[0].isupper() or '.' in element.tag:
+        raise Unsupported(f'renders the <{element.tag}> component')
+    if element.tag in LIVE_TAGS:
+        raise Unsupported(LIVE_TAGS[element.tag])
+    attrs = dict(element.attrs)
+    attrs.update(root_attrs or {})
+    parts = [f'<{element.tag}']
+    for name, value in attrs.items():
+        if name in DROPPED_ATTRS or (name.startswith('on') and name[2:3].isupper()):
+            continue
+        if value is None or value is False or value is True:
+            continue
+        if callable(value) or isinstance(value, (list, Element)):
+            raise Unsupported(f'passes a {type(value).__name__} to {name}')
+        text = _style(value) if name == 'style' else js_str(value) if not isinstance(value, dict) else None
+        if text is None:
+            raise Unsupported(f'passes an object to {name}')
+        parts.append(f' {_attr_name(name)}="{_escape(text, quote=True)}"')
+    children = []
+    for child in _flatten(element.children):
+        if isinstance(child, Element):
+            children.append(serialize(child))
+        elif isinstance(child, (str, int, float)):
+            children.append(_escape(js_str(child)))
+        else:
+            raise Unsupported(f'renders a {type(child).__name__} as a child')
+    if not children:
+        return ''.join(parts) + '/>'
+    return ''.join(parts) + '>' + ''.join(children) + f'</{element.tag}>'
+
+
+def _find_svg(node):
+    # The outermost <svg> a component returns, looking through wrapper elements
+    if isinstance(node, list):
+        for child in node:
+            found = _find_svg(child)
+            if found is not None:
+                return found
+    elif isinstance(node, Element):
+        if node.tag == 'svg':
+            return node
+        return _find_svg(node.children)
+    return None
+
+
+class TileRenderer:
+    """Evaluates a component for each ingredient state and serializes it to SVG."""
+
+    def __init__(self, declaration, component, ingredients, sprite_entries=(), first_line=1):
+        # `declaration` is the source of the component's top-level statement;
+        # the draw unit this stage adds must not short-circuit the evaluation
+        names = {'INGREDIENTS': ingredients, 'hasAtlasTile': lambda *args: False}
+        self.component = evaluate_declaration(declaration, component, names, first_line)
+
+        # Definitions an earlier svg_sprite.py run moved out of the component;
+        # one that cannot be rasterized only keeps the tiles using it live
+        self.sprite = {}
+        for element_id, element in sprite_entries:
+            try:
+                self.sprite[element_id] = serialize(evaluate_jsx(element))
+            except Unsupported as e:
+                self.sprite[element_id] = e
+
+    def _sprite_defs(self, markup):
+        # Serialized sprite entries the markup refers to, including their own references
+        defined = set(ID_RE.findall(markup))
+        needed = []
+        pending = [m.group(2) for m in REF_RE.finditer(markup)]
+        while pending:
+            element_id = pending.pop()
+            if element_id in defined or element_id not in self.sprite:
+                continue
+            defined.add(element_id)
+            if isinstance(self.sprite[element_id], Unsupported):
+                raise self.sprite[element_id]
+            needed.append(self.sprite[element_id])
+            pending.extend(m.group(2) for m in REF_RE.finditer(self.sprite[element_id]))
+        return needed
+
+    def render(self, type_key, state, size):
+        # Standalone SVG document for one tile; raises Unsupported for live branches
+        try:
+            result = self.component({'type': type_key, 'state': state, 'size': size})
+        except RecursionError:
+            raise Unsupported('recursion too deep') from None
+        svg = _find_svg(result)
+        if svg is None:
+            raise Unsupported('renders nothing' if result is None else 'renders no <svg>')
+        markup = serialize(svg, {'width': size, 'height': size, 'xmlns': 'http://www.w3.org/2000/svg',
+                                 'xmlns:xlink': 'http://www.w3.org/1999/xlink'})
+        defs = self._sprite_defs(markup)
+        if defs:
+            open_end = markup.index('>') + 1
+            markup = markup[:open_end] + '<defs>' + ''.join(defs) + '</defs>' + markup[open_end:]
+        return markup
+
+
+def rasterize(markup, size, cache):
+    # PNG bytes of one tile, from the cache while its SVG source is unchanged
+    key = content_hash(markup, str(size), str(RENDER_VERSION))
+    png = cache.get('atlas_tile', key)
+    if png is not None:
+        return png, True
+    try:
+        png = bytes(resvg_py.svg_to_bytes(svg_string=markup, width=size, height=size))
+    except ValueError as e:
+        raise Unsupported(f'resvg could not render it ({e})') from None
+    cache.put('atlas_tile', key, png)
+    return png, False
+
+
+def pack_sheet(cells, size, columns, rows):
+    # One sheet of `columns` x `rows` padded cells; `cells` holds PNG bytes in cell order
+    pitch = size + 2 * PADDING
+    sheet = Image.new('RGBA', (columns * pitch, rows * pitch), (0, 0, 0, 0))
+    for index, png in enumerate(cells):
+        with Image.open(io.BytesIO(png)) as tile:
+            tile = tile.convert('RGBA')
+            if tile.size != (size, size):
+                tile = tile.resize((size, size), Image.LANCZOS)
+            sheet.paste(tile, ((index % columns) * pitch + PADDING, (index // columns) * pitch + PADDING))
+    out = io.BytesIO()
+    sheet.save(out, format='PNG', optimize=True)
+    return out.getvalue()
+
+
+def render_atlas_component(name, component, source_name, map_file, sheet_files):
+    imports = '\n'.join(f"import sheet{size} from '{path}';" for size, path in sheet_files)
+    urls = ', '.join(f'{size}: sheet{size}' for size, _ in sheet_files)
+    return ATLAS_TEMPLATE.format(name=name, component=component, source=source_name, map_path=map_file,
+                                 sheet_imports=imports, sheet_urls=urls)
+
+
+def _relative_import(from_file, to_file):
+    relative = os.path.relpath(to_file, os.path.dirname(os.path.abspath(from_file))).replace(os.sep, '/')
+    return relative if relative.startswith('.') else './' + relative
+
+
+def _read_bytes(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def build_sprite_atlas(source_file=DEFAULT_SOURCE, component=COMPONENT, sizes=DEFAULT_SIZES, atlas_file=None,
+                       atlas_dir=None, game_data_file=None, dry_run=False, cache=None, profile=None):
+    cache = cache or PatchCache()
+    profile = profile or PatchProfile()
+    sizes = tuple(sorted(set(sizes)))
+    name = atlas_name_for(component)
+    default_file, default_dir = atlas_paths_for(source_file, component)
+    atlas_file = atlas_file or default_file
+    atlas_dir = atlas_dir or default_dir
+    game_data_file = game_data_file or game_data_for(os.path.join(_src_root(source_file), 'CookingGame.jsx'))
+
+    with profile.stage('read'):
+        source = MappedSource(source_file)
+        game_data = load_game_data(game_data_file, cache)
+        sprite_entries = read_sprite(sprite_path_for(source_file))
+    content = source.text
+
+    plan = SplicePlan(content)
+    ledger = PatchLedger(source_file, content, source.digest)
+    with profile.locate('(structure map)'):
+        structure = cache.structure(content, source.digest)
+    if component not in structure.by_name:
+        source.close()
+        reason = f"Could not find {component}"
+        print(reason)
+        return {'skipped': reason}
+
+    ingredients = {r.key: {'name': r.name, 'category': r.category, 'states': list(r.states)}
+                   for r in game_data.ingredients}
+    with profile.locate('evaluate'):
+        declaration = structure.declaration(component)
+        renderer = TileRenderer(content[declaration.start:declaration.end], component, ingredients,
+                                sprite_entries, structure.line_of(declaration.start))
+        markups = {}
+        live = {}
+        for record in game_data.ingredients:
+            for state in record.states:
+                tile = f'{record.key}:{state}'
+                try:
+                    markups[tile] = tuple(renderer.render(record.key, state, size) for size in sizes)
+                except Unsupported as e:
+                    live[tile] = str(e)
+
+    # Identical tiles share a cell; cells are laid out row by row
+    cell_of = {}
+    tiles = {}
+    for tile, markup in markups.items():
+        tiles[tile] = cell_of.setdefault(markup, len(cell_of))
+    columns = max(1, math.ceil(math.sqrt(len(cell_of))))
+    rows = max(1, math.ceil(len(cell_of) / columns))
+
+    sheet_names = {size: f'{name}-{size}.png' for size in sizes}
+    atlas_map = {
+        'component': component,
+        'version': RENDER_VERSION,
+        'sizes': list(sizes),
+        'padding': PADDING,
+        'columns': columns,
+        'rows': rows,
+        'sheets': {str(size): {'file': sheet_names[size], 'width': columns * (size + 2 * PADDING),
+                               'height': rows * (size + 2 * PADDING)} for size in sizes},
+        'tiles': {tile: [cell % columns, cell // columns] for tile, cell in tiles.items()},
+        'hashes': {tile: content_hash(*markups[tile])[:12] for tile in tiles},
+    }
+    map_path = os.path.join(atlas_dir, name + '.json')
+    sheet_paths = {size: os.path.join(atlas_dir, sheet_names[size]) for size in sizes}
+    map_data = (json.dumps(atlas_map, indent=2) + '\n').encode('utf-8')
+    old_map = _read_bytes(map_path)
+
+    # The map hashes every tile's SVG, so an unchanged map means unchanged sheets
+    rendered = cached = 0
+    sheets = {}
+    if old_map != map_data or not all(os.path.exists(path) for path in sheet_paths.values()):
+        with profile.locate('rasterize'):
+            for index, size in enumerate(sizes):
+                pngs = []
+                for markup in cell_of:
+                    png, hit = rasterize(markup[index], size, cache)
+                    cached += hit
+                    rendered += not hit
+                    pngs.append(png)
+                sheets[size] = pack_sheet(pngs, size, columns, rows)
+
+    # Sheets before the map, so a map on disk never describes sheets that were not written
+    outputs = {sheet_paths[size]: png for size, png in sheets.items()}
+    outputs[map_path] = map_data
+    sheet_imports = [(size, _relative_import(atlas_file, sheet_paths[size])) for size in sizes]
+    atlas_text = render_atlas_component(name, component, os.path.basename(source_file),
+                                        _relative_import(atlas_file, map_path), sheet_imports)
+    outputs[atlas_file] = atlas_text.encode('utf-8')
+
+    previous = {}
+    if old_map:
+        previous = json.loads(old_map).get('hashes', {})
+    changed = sorted(tile for tile, digest in atlas_map['hashes'].items() if previous.get(tile) != digest)
+    writes = {path: data for path, data in outputs.items() if _read_bytes(path) != data}
+
+    # Draw from the atlas whenever IngredientSVG has a tile for the state
+    with profile.locate('atlas_draw'):
+        imports = [d for d in structure.declarations if d.kind == 'import']
+        import_pos = content.find('\n', imports[-1].end) + 1 if imports else 0
+        draw_pos = declaration.body[0] + 1
+    relative = _relative_import(source_file, os.path.splitext(atlas_file)[0])
+    import_line = f"import {{ {name}, hasAtlasTile }} from '{relative}';\n"
+    with profile.apply('atlas_import', plan):
+        ledger.plan_insert(plan, 'atlas_import', import_line, import_pos)
+    with profile.apply('atlas_draw', plan):
+        ledger.plan_insert(plan, 'atlas_draw', DRAW_TEMPLATE.format(name=name).rstrip('\n'), draw_pos)
+
+    diff = None
+    if dry_run:
+        diff = plan_diff(plan, source_file)
+        if atlas_file in writes:
+            old_atlas = _read_bytes(atlas_file)
+            atlas_plan = SplicePlan((old_atlas or b'').decode('utf-8'))
+            atlas_plan.replace(0, len(atlas_plan.text), atlas_text)
+            diff += plan_diff(atlas_plan, diff_path(atlas_file, source_file), new=old_atlas is None)
+        source.close()
+    else:
+        # Assets go first: a patched component must never import a missing file
+        with profile.stage('write'):
+            for path, data in writes.items():
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                write_atomic(path, [data])
+            digest = source.digest
+            if plan:
+                digest = write_plan(source, plan)
+        source.close()
+        if plan or not ledger.trusted:
+            ledger.save(digest)
+
+    return {
+        'tiles': len(tiles),
+        'cells': len(cell_of),
+        'live': live,
+        'changed': changed,
+        'rendered': rendered,
+        'cached': cached,
+        'sheet_bytes': {size: len(sheets[size]) if size in sheets else os.path.getsize(sheet_paths[size])
+                        for size in sizes},
+        'written': sorted(writes),
+        'atlas_file': atlas_file,
+        'atlas_dir': atlas_dir,
+        'units': ledger.status,
+        'profile': profile.units,
+        'diff': diff
+    }
+
+
+def _sizes(value):
+    try:
+        sizes = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid size list {value!r}') from None
+    if not sizes or min(sizes) <= 0:
+        raise argparse.ArgumentTypeError('sizes must be positive pixel counts')
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rasterize every IngredientSVG state into a sprite atlas')
+    parser.add_argument('source_file', nargs='?', default=DEFAULT_SOURCE)
+    parser.add_argument('--component', default=COMPONENT, help=f'ingredient component to rasterize (default: {COMPONENT})')
+    parser.add_argument('--sizes', type=_sizes, default=list(DEFAULT_SIZES),
+                        help='comma-separated tile sizes in pixels (default: %(default)s)')
+    parser.add_argument('--data', dest='game_data_file', help='path to gameData.js')
+    parser.add_argument('--atlas', dest='atlas_file', help='atlas component to write (default: components/IngredientAtlas.jsx)')
+    parser.add_argument('--assets', dest='atlas_dir', help='directory for the sheets and map (default: assets/atlas)')
+    parser.add_argument('--dry-run', action='store_true', help='print a unified diff and timings, write nothing')
+    args = parser.parse_args(argv)
+
+    try:
+        stats = build_sprite_atlas(args.source_file, args.component, args.sizes, args.atlas_file, args.atlas_dir,
+                                   args.game_data_file, dry_run=args.dry_run)
+    except Unsupported as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 1
+    if 'skipped' in stats:
+        return 1
+    if args.dry_run:
+        print(stats['diff'], end='')
+        print(format_profile(stats['profile']))
+    else:
+        print("Sprite Atlas Built!")
+    print(f"Tiles: {stats['tiles']} in {stats['cells']} cells, {len(stats['live'])} states left live")
+    print(f"Rasterized: {stats['rendered']} ({stats['cached']} from cache, {len(stats['changed'])} states changed)")
+    for size, size_bytes in stats['sheet_bytes'].items():
+        print(f"  {size}px sheet: {size_bytes:,} bytes")
+    for tile, reason in sorted(stats['live'].items()):
+        print(f"  live {tile}: {reason}")
+    for name, status in stats['units'].items():
+        print(f"  {name}: {status}")
+    if not args.dry_run:
+        print(f"\nAtlas written to: {stats['atlas_dir']}" if stats['written'] else "\nAtlas unchanged")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
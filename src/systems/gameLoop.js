@@ -0,0 +1,186 @@
+import { useEffect, useRef } from 'react';
+
+/**
+ * Shared game loop
+ *
+ * Periodic game work (order countdowns, customer spawns, pan and disaster
+ * timers) runs on one scheduler instead of one setInterval each:
+ * - Deadlines are kept in a min-heap, and a single timeout sleeps until the
+ *   earliest one, so the page only wakes when something is due
+ * - Deadlines fall on a shared grid (1 s by default), so tasks with related
+ *   intervals come due together
+ * - Everything due at a wake-up runs in the same callback, which React
+ *   batches into one render
+ * - While the tab is hidden the loop is paused; on return every task resumes
+ *   with the time it had left instead of firing a backlog
+ */
+
+export const LOOP_GRANULARITY = 1000;
+
+/**
+ * Binary min-heap of tasks ordered by deadline, then by registration
+ */
+export class DeadlineHeap {
+  constructor() {
+    this.items = [];
+  }
+
+  get size() {
+    return this.items.length;
+  }
+
+  peek() {
+    return this.items[0];
+  }
+
+  static before(a, b) {
+    return a.due < b.due || (a.due === b.due && a.seq < b.seq);
+  }
+
+  push(task) {
+    const items = this.items;
+    items.push(task);
+    let i = items.length - 1;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (!DeadlineHeap.before(items[i], items[parent])) break;
+      [items[i], items[parent]] = [items[parent], items[i]];
+      i = parent;
+    }
+  }
+
+  pop() {
+    const items = this.items;
+    const top = items[0];
+    const last = items.pop();
+    if (items.length > 0) {
+      items[0] = last;
+      let i = 0;
+      for (;;) {
+        const left = 2 * i + 1;
+        const right = left + 1;
+        let smallest = i;
+        if (left < items.length && DeadlineHeap.before(items[left], items[smallest])) smallest = left;
+        if (right < items.length && DeadlineHeap.before(items[right], items[smallest])) smallest = right;
+        if (smallest === i) break;
+        [items[i], items[smallest]] = [items[smallest], items[i]];
+        i = smallest;
+      }
+    }
+    return top;
+  }
+}
+
+/**
+ * Create a game loop
+ * @param {Object} options
+ * @param {number} options.granularity - Grid deadlines are rounded up to, in ms
+ * @param {boolean} options.pauseWhenHidden - Pause while the document is hidden (default: true)
+ * @returns {Object} { every, pause, resume, stats }
+ */
+export function createGameLoop({ granularity = LOOP_GRANULARITY, pauseWhenHidden = true } = {}) {
+  const heap = new DeadlineHeap();
+  const epoch = Date.now();
+  const stats = { wakeups: 0, runs: 0 };
+  let timer = null;
+  let pausedAt = null;
+  let seq = 0;
+  let watchingVisibility = false;
+
+  const onGrid = (time) => epoch + Math.ceil((time - epoch) / granularity) * granularity;
+
+  const schedule = () => {
+    clearTimeout(timer);
+    timer = null;
+    while (heap.size > 0 && heap.peek().cancelled) heap.pop();
+    if (pausedAt !== null || heap.size === 0) return;
+    timer = setTimeout(wake, Math.max(0, heap.peek().due - Date.now()));
+  };
+
+  const wake = () => {
+    timer = null;
+    stats.wakeups += 1;
+    const now = Date.now();
+    const due = [];
+    while (heap.size > 0 && heap.peek().due <= now) {
+      const task = heap.pop();
+      if (!task.cancelled) due.push(task);
+    }
+    // Re-arm before running, so a callback can cancel its own task
+    for (const task of due) {
+      task.due = Math.max(task.due + task.interval, onGrid(now + 1));
+      heap.push(task);
+    }
+    for (const task of due) {
+      if (task.cancelled) continue;
+      stats.runs += 1;
+      try {
+        task.callback();
+      } catch (error) {
+        console.error('Game loop task failed:', error);
+      }
+    }
+    schedule();
+  };
+
+  const loop = {
+    stats,
+
+    /**
+     * Run `callback` every `interval` ms
+     * @returns {Function} Cancels the task
+     */
+    every(interval, callback) {
+      if (pauseWhenHidden && !watchingVisibility && typeof document !== 'undefined') {
+        watchingVisibility = true;
+        document.addEventListener('visibilitychange', () => {
+          if (document.hidden) loop.pause();
+          else loop.resume();
+        });
+      }
+      const task = { interval, callback, due: onGrid(Date.now() + interval), seq: seq++, cancelled: false };
+      heap.push(task);
+      if (pausedAt === null && (timer === null || heap.peek() === task)) schedule();
+      return () => {
+        task.cancelled = true;
+      };
+    },
+
+    pause() {
+      if (pausedAt !== null) return;
+      pausedAt = Date.now();
+      schedule();
+    },
+
+    resume() {
+      if (pausedAt === null) return;
+      // Shifting every deadline by the same amount keeps the heap ordered
+      const hidden = Date.now() - pausedAt;
+      heap.items.forEach((task) => {
+        task.due += hidden;
+      });
+      pausedAt = null;
+      schedule();
+    },
+  };
+  return loop;
+}
+
+// The loop the game's hooks share
+export const gameLoop = createGameLoop();
+
+/**
+ * Run `callback` every `interval` ms on the shared game loop while `enabled`
+ *
+ * The latest callback is always the one called, so it can read current state
+ * without re-registering the task on every render.
+ */
+export function useGameLoop(interval, callback, enabled = true, loop = gameLoop) {
+  const latest = useRef(callback);
+  latest.current = callback;
+
+  useEffect(() => {
+    if (!enabled) return undefined;
+    return loop.every(interval, () => latest.current());
+  }, [interval, enabled, loop]);
+}
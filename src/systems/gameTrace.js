@@ -0,0 +1,122 @@
+/**
+ * Seeded randomness and event traces for restaurant sessions
+ *
+ * Every random roll of the order and disaster systems goes through
+ * gameRandom(), which is Math.random until a trace is started:
+ * - startTrace() seeds a small PRNG (mulberry32), so the same seed and the
+ *   same player inputs spawn the same customers and disasters again
+ * - While a trace runs, the systems log what the player did (inputs) and
+ *   what the game did in response (outcomes) as compact events
+ * - traceToJSONL() writes a header line and one line per event;
+ *   trace_replay.py plays the inputs back through vitest and compares the
+ *   outcomes
+ *
+ * Open the game with `?trace` (or `?trace=<seed>`) to record a session,
+ * then run `window.__gameTrace.download()` in the console.
+ */
+
+export const TRACE_VERSION = 1;
+
+// Events the player causes; a replay feeds these back in
+export const TRACE_INPUTS = ['toggle', 'customer', 'serve', 'heat', 'resolve', 'level'];
+
+// Events the game produces in response; a replay compares these
+export const TRACE_OUTCOMES = ['spawn', 'drop', 'done', 'disaster', 'fail'];
+
+/**
+ * Seeded PRNG (mulberry32)
+ * @param {number} seed - Any 32-bit integer
+ * @returns {Function} () => number in [0, 1), like Math.random
+ */
+export function createRandom(seed) {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+let random = Math.random;
+let trace = null;
+
+/**
+ * Random number for game logic; seeded while a trace is running
+ */
+export const gameRandom = () => random();
+
+/**
+ * Replace the random source, e.g. with createRandom(seed) in a test
+ * @param {Function} source - () => number in [0, 1); Math.random if omitted
+ */
+export function setGameRandom(source) {
+  random = source || Math.random;
+}
+
+/**
+ * Start recording, seeding gameRandom()
+ * @param {Object} options
+ * @param {number} options.seed - PRNG seed (default: derived from the clock)
+ * @returns {Object} The trace, { header, events }
+ */
+export function startTrace({ seed = Date.now() >>> 0 } = {}) {
+  random = createRandom(seed);
+  trace = { header: { v: TRACE_VERSION, seed, start: Date.now() }, events: [] };
+  return trace;
+}
+
+/**
+ * Stop recording and go back to Math.random
+ * @returns {Object|null} The finished trace, ending with an `end` event
+ */
+export function stopTrace() {
+  const finished = trace;
+  if (finished) traceEvent('end');
+  trace = null;
+  random = Math.random;
+  return finished;
+}
+
+/**
+ * Log an event if a trace is running; costs one comparison otherwise
+ * @param {string} type - One of TRACE_INPUTS or TRACE_OUTCOMES
+ * @param {Object} fields - Short keys only; this is written once per event
+ */
+export function traceEvent(type, fields) {
+  if (trace === null) return;
+  trace.events.push({ t: Date.now() - trace.header.start, e: type, ...fields });
+}
+
+export const traceToJSONL = ({ header, events }) =>
+  [header, ...events].map((line) => JSON.stringify(line)).join('\n') + '\n';
+
+export function parseTrace(text) {
+  const lines = text.split('\n').filter((line) => line.trim());
+  const [header, ...events] = lines.map((line) => JSON.parse(line));
+  if (!header || header.v !== TRACE_VERSION) {
+    throw new Error(`Unsupported trace version: ${header ? header.v : 'none'}`);
+  }
+  return { header, events };
+}
+
+if (typeof window !== 'undefined') {
+  const seed = new URLSearchParams(window.location.search).get('trace');
+  if (seed !== null) {
+    startTrace(seed ? { seed: Number(seed) >>> 0 } : {});
+  }
+  window.__gameTrace = {
+    start: (seed) => startTrace(seed === undefined ? {} : { seed }),
+    stop: () => stopTrace(),
+    download: (filename = 'game-trace.jsonl') => {
+      if (!trace) return;
+      traceEvent('end');
+      const link = document.createElement('a');
+      link.href = URL.createObjectURL(new Blob([traceToJSONL(trace)], { type: 'application/x-ndjson' }));
+      link.download = filename;
+      link.click();
+      URL.revokeObjectURL(link.href);
+    },
+  };
+}
@@ -0,0 +1,96 @@
+import { createElement, lazy, Suspense, useEffect, useState } from 'react';
+
+/**
+ * Lazily loaded chunks of CookingGame.jsx
+ *
+ * code_split.py moves code that is not needed for the first paint
+ * (ingredient drawings per pantry category, dish visuals, restaurant and
+ * disaster UI) into modules under src/chunks/, loaded with dynamic import():
+ * - chunkLoader() wraps an import so it starts only once, and its module can
+ *   be read synchronously after it has arrived
+ * - useChunk() re-renders a component once a chunk it needs has loaded
+ * - lazyComponent() renders a chunk's default export, and fetches the chunk
+ *   while the browser is idle so it is usually there before it is needed
+ */
+
+const whenIdle = (callback) =>
+  typeof requestIdleCallback === 'function'
+    ? requestIdleCallback(callback, { timeout: 5000 })
+    : setTimeout(callback, 0);
+
+/**
+ * Wrap a dynamic import
+ * @param {Function} load - () => import('./chunk.jsx')
+ * @returns {Function} Starts the import (once) and returns its promise;
+ *   `.loaded()` returns the module, or null until it has loaded
+ */
+export function chunkLoader(load) {
+  let promise = null;
+  let module = null;
+  const loader = () => {
+    if (promise === null) {
+      promise = load().then(
+        (loaded) => {
+          module = loaded;
+          return loaded;
+        },
+        (error) => {
+          // Let the next caller retry, e.g. after a network error
+          promise = null;
+          throw error;
+        }
+      );
+    }
+    return promise;
+  };
+  loader.loaded = () => module;
+  return loader;
+}
+
+/**
+ * Module of a chunk, loading it if needed while `enabled`
+ * @param {Function} loader - From chunkLoader(), or undefined for no chunk
+ * @returns {Object|null} The module, or null while it is loading
+ */
+export function useChunk(loader, enabled = true) {
+  const [, setLoaded] = useState(null);
+  const module = loader ? loader.loaded() : null;
+
+  useEffect(() => {
+    if (!loader || !enabled || module) return undefined;
+    let active = true;
+    loader().then(
+      (loaded) => {
+        if (active) setLoaded(loaded);
+      },
+      (error) => console.error('Failed to load chunk:', error)
+    );
+    return () => {
+      active = false;
+    };
+  }, [loader, enabled, module]);
+
+  return module;
+}
+
+/**
+ * Component that renders the default export of a chunk
+ *
+ * Nothing is rendered until the chunk has loaded; after that it renders
+ * synchronously like any other component.
+ *
+ * @param {Function} load - () => import('./chunk.jsx')
+ * @param {Object} options
+ * @param {boolean} options.prefetch - Fetch the chunk when the browser is idle (default: true)
+ * @returns {Function} Component, with `.preload()` to start loading early
+ */
+export function lazyComponent(load, { prefetch = true } = {}) {
+  const loader = chunkLoader(load);
+  const Chunk = lazy(loader);
+  const LazyChunk = (props) => createElement(Suspense, { fallback: null }, createElement(Chunk, props));
+  LazyChunk.preload = loader;
+  if (prefetch && typeof window !== 'undefined') {
+    whenIdle(() => loader().catch(() => {}));
+  }
+  return LazyChunk;
+}
@@ -0,0 +1,228 @@
+// Generated by save_codec.py from data/gameData.js.
+// IDs are append-only so every old save still decodes; after editing gameData.js,
+// re-run `python save_codec.py --generate` instead of editing this file.
+
+export const SAVE_FORMAT = 3;
+
+export const SAVE_IDS = {
+  ingredients: [
+    'salmon', 'tuna', 'mahi', 'tilapia', 'cod', 'shrimp', 'crab', 'scallops', 'chicken',
+    'chickenWing', 'chickenThigh', 'porkBelly', 'porkChop', 'groundPork', 'groundBeef', 'steak',
+    'wagyu', 'lamb', 'bacon', 'onion', 'garlic', 'ginger', 'cucumber', 'avocado', 'carrot',
+    'bellPepper', 'broccoli', 'cabbage', 'mushroom', 'greenOnion', 'tomato', 'spinach',
+    'bokChoy', 'rice', 'noodles', 'flour', 'potato', 'sweetPotato', 'egg', 'butter', 'cheese',
+    'cream', 'coconutMilk', 'soySauce', 'vinegar', 'fishSauce', 'oysterSauce', 'sesameOil',
+    'mirin', 'sake', 'chiliOil', 'hoiSin', 'salt', 'pepper', 'chiliFlakes', 'paprika', 'cumin',
+    'turmeric', 'curryPowder', 'fiveSpice', 'cinnamon', 'starAnise', 'nori', 'wonton',
+    'springRoll', 'tofu', 'tempeh'
+  ],
+  recipes: [
+    'salmonMaki', 'chickenAdobo', 'friedRice', 'shrimpTempura', 'gingerChicken'
+  ],
+  stats: [
+    'recipesCompleted', 'customersServed', 'disastersHandled', 'perfectDishes'
+  ]
+};
+
+const INDEX = Object.fromEntries(
+  Object.entries(SAVE_IDS).map(([table, keys]) => [table, new Map(keys.map((key, id) => [key, id]))])
+);
+const COUNTERS = ['level', 'xp', 'totalXP'];
+const textEncoder = new TextEncoder();
+const textDecoder = new TextDecoder();
+
+const isCount = (value) => Number.isSafeInteger(value) && value >= 0;
+
+// Bytes per String.fromCharCode call; spreading a whole save into one call
+// overflows the stack once it holds a long stats history
+const BASE64_CHUNK = 0x8000;
+
+function toBase64(bytes) {
+  let binary = '';
+  for (let i = 0; i < bytes.length; i += BASE64_CHUNK) {
+    binary += String.fromCharCode.apply(null, bytes.subarray(i, i + BASE64_CHUNK));
+  }
+  return btoa(binary);
+}
+
+class SaveWriter {
+  constructor() {
+    this.bytes = [];
+  }
+
+  varint(value) {
+    let n = value;
+    while (n >= 0x80) {
+      this.bytes.push((n % 0x80) | 0x80);
+      n = Math.floor(n / 0x80);
+    }
+    this.bytes.push(n);
+  }
+
+  raw(bytes) {
+    this.varint(bytes.length);
+    for (const byte of bytes) this.bytes.push(byte);
+  }
+
+  string(text) {
+    this.raw(textEncoder.encode(text));
+  }
+
+  keys(keys, table) {
+    const index = INDEX[table];
+    const bits = new Uint8Array(Math.ceil(SAVE_IDS[table].length / 8));
+    const extra = [];
+    for (const key of new Set(keys)) {
+      const id = index.get(key);
+      if (id === undefined) {
+        extra.push(key);
+      } else {
+        bits[id >> 3] |= 1 << (id & 7);
+      }
+    }
+    let length = bits.length;
+    while (length > 0 && bits[length - 1] === 0) length--;
+    this.raw(bits.subarray(0, length));
+    this.varint(extra.length);
+    extra.forEach((key) => this.string(key));
+  }
+}
+
+class SaveReader {
+  constructor(bytes) {
+    this.bytes = bytes;
+    this.pos = 0;
+  }
+
+  varint() {
+    let value = 0;
+    let scale = 1;
+    let byte;
+    do {
+      if (this.pos >= this.bytes.length) throw new Error('Truncated save');
+      byte = this.bytes[this.pos++];
+      value += (byte & 0x7f) * scale;
+      scale *= 0x80;
+    } while (byte & 0x80);
+    return value;
+  }
+
+  raw() {
+    const length = this.varint();
+    if (this.pos + length > this.bytes.length) throw new Error('Truncated save');
+    this.pos += length;
+    return this.bytes.subarray(this.pos - length, this.pos);
+  }
+
+  string() {
+    return textDecoder.decode(this.raw());
+  }
+
+  keys(table) {
+    const keys = [];
+    this.raw().forEach((byte, i) => {
+      for (let bit = 0; bit < 8; bit++) {
+        if (byte & (1 << bit)) {
+          const key = SAVE_IDS[table][i * 8 + bit];
+          if (key === undefined) throw new Error(`Unknown ${table} ID ${i * 8 + bit}`);
+          keys.push(key);
+        }
+      }
+    });
+    const extra = this.varint();
+    for (let i = 0; i < extra; i++) keys.push(this.string());
+    return keys;
+  }
+}
+
+function hexKeys(bits = '', table) {
+  const keys = [];
+  [...bits].forEach((digit, i) => {
+    for (let bit = 0; bit < 4; bit++) {
+      if (parseInt(digit, 16) & (1 << bit) && SAVE_IDS[table][i * 4 + bit] !== undefined) {
+        keys.push(SAVE_IDS[table][i * 4 + bit]);
+      }
+    }
+  });
+  return keys;
+}
+
+// JSON saves from before the binary format, by their `v` (none = 1)
+const MIGRATIONS = {
+  1: (saved) => saved,
+  2: ({ v, ingredients, recipes, extraIngredients = [], extraRecipes = [], ...rest }) => ({
+    ...rest,
+    unlockedIngredients: [...hexKeys(ingredients, 'ingredients'), ...extraIngredients],
+    discoveredRecipes: [...hexKeys(recipes, 'recipes'), ...extraRecipes],
+  }),
+};
+
+function migrate(saved) {
+  const version = saved.v ?? 1;
+  if (!MIGRATIONS[version]) throw new Error(`Unsupported save version ${version}`);
+  const profile = MIGRATIONS[version](saved);
+  for (const field of ['unlockedIngredients', 'discoveredRecipes']) {
+    if (Array.isArray(profile[field])) profile[field] = [...new Set(profile[field])];
+  }
+  return profile;
+}
+
+/**
+ * Serialize a profile in the current binary format
+ * @param {Object} profile - Player profile
+ * @returns {string} base64 save
+ */
+export function encodeProfile({ unlockedIngredients = [], discoveredRecipes = [], stats = {}, ...rest }) {
+  const writer = new SaveWriter();
+  const other = { ...rest };
+  writer.varint(SAVE_FORMAT);
+  for (const field of COUNTERS) {
+    writer.varint(isCount(rest[field]) ? rest[field] : 0);
+    if (isCount(rest[field])) delete other[field];
+  }
+  writer.keys(unlockedIngredients, 'ingredients');
+  writer.keys(discoveredRecipes, 'recipes');
+
+  const entries = Object.entries(stats);
+  if (entries.every(([, value]) => isCount(value))) {
+    writer.varint(entries.length);
+    for (const [name, value] of entries) {
+      const id = INDEX.stats.get(name);
+      writer.varint(id === undefined ? 0 : id + 1);
+      if (id === undefined) writer.string(name);
+      writer.varint(value);
+    }
+  } else {
+    writer.varint(0);
+    other.stats = stats;
+  }
+  writer.string(Object.keys(other).length > 0 ? JSON.stringify(other) : '');
+  return toBase64(Uint8Array.from(writer.bytes));
+}
+
+/**
+ * Parse a save in any format, migrating older ones
+ * @param {string} text - Saved text
+ * @returns {Object} Player profile
+ */
+export function decodeProfile(text) {
+  if (text.trimStart().startsWith('{')) {
+    return migrate(JSON.parse(text));
+  }
+  const reader = new SaveReader(Uint8Array.from(atob(text), (c) => c.charCodeAt(0)));
+  const format = reader.varint();
+  if (format !== SAVE_FORMAT) throw new Error(`Unsupported save format ${format}`);
+  const profile = {};
+  for (const field of COUNTERS) profile[field] = reader.varint();
+  profile.unlockedIngredients = reader.keys('ingredients');
+  profile.discoveredRecipes = reader.keys('recipes');
+  profile.stats = {};
+  const count = reader.varint();
+  for (let i = 0; i < count; i++) {
+    const id = reader.varint();
+    const name = id === 0 ? reader.string() : SAVE_IDS.stats[id - 1];
+    profile.stats[name] = reader.varint();
+  }
+  const other = reader.string();
+  return other ? { ...profile, ...JSON.parse(other) } : profile;
+}
@@ -0,0 +1,134 @@
+import { useState, useEffect } from 'react';
+import { encodeProfile, decodeProfile } from './profileCodec';
+
+/**
+ * Player profile persistence (localStorage)
+ *
+ * Profiles are saved only when they changed, at most once per interval, and
+ * serialized during idle time. The saved form is the versioned binary format
+ * of profileCodec.js, generated by save_codec.py; older saves are migrated
+ * when they load.
+ */
+
+export { encodeProfile, decodeProfile, SAVE_FORMAT } from './profileCodec';
+
+export const PROFILE_KEY = 'kitchenExplorerProfile';
+export const SAVE_INTERVAL = 30000;
+
+/**
+ * Load the saved profile
+ * @returns {Object|null} Player profile, or null if nothing was saved
+ */
+export function loadProfile(key = PROFILE_KEY, storage = globalThis.localStorage) {
+  const saved = storage.getItem(key);
+  return saved ? decodeProfile(saved) : null;
+}
+
+/**
+ * Save a profile immediately
+ */
+export function saveProfile(profile, key = PROFILE_KEY, storage = globalThis.localStorage) {
+  storage.setItem(key, encodeProfile(profile));
+}
+
+const whenIdle = (callback) =>
+  typeof requestIdleCallback === 'function'
+    ? requestIdleCallback(callback, { timeout: 2000 })
+    : setTimeout(callback, 0);
+
+/**
+ * Create a saver that writes a profile only when it changed
+ *
+ * Every new profile bumps a version counter. The first change after a save
+ * schedules one write for when the interval has passed and the browser is
+ * idle; later changes only bump the version, so the write picks up the
+ * latest profile and nothing resets the schedule.
+ *
+ * @param {Object} options
+ * @param {string} options.key - localStorage key (default: PROFILE_KEY)
+ * @param {number} options.interval - Minimum ms between saves (default: SAVE_INTERVAL)
+ * @param {Storage} options.storage - Storage to write to (default: localStorage)
+ * @returns {Object} { update, flush, cancel, version, savedVersion }
+ */
+export function createProfileSaver({
+  key = PROFILE_KEY,
+  interval = SAVE_INTERVAL,
+  storage = globalThis.localStorage,
+} = {}) {
+  let profile = null;
+  let version = 0;
+  let savedVersion = 0;
+  let lastSaved = Date.now();
+  let timer = null;
+
+  const write = () => {
+    timer = null;
+    if (savedVersion === version) return;
+    try {
+      saveProfile(profile, key, storage);
+      savedVersion = version;
+      lastSaved = Date.now();
+    } catch (error) {
+      console.error('Failed to save profile:', error);
+    }
+  };
+
+  return {
+    /**
+     * Record the current profile; the first one seen is the saved baseline
+     */
+    update(next) {
+      if (next === profile) return;
+      const baseline = profile === null;
+      profile = next;
+      if (baseline) return;
+      version += 1;
+      if (timer === null) {
+        timer = setTimeout(() => whenIdle(write), Math.max(0, lastSaved + interval - Date.now()));
+      }
+    },
+    /**
+     * Write now if there are unsaved changes (page hidden or unmounting)
+     */
+    flush() {
+      clearTimeout(timer);
+      write();
+    },
+    cancel() {
+      clearTimeout(timer);
+      timer = null;
+    },
+    get version() {
+      return version;
+    },
+    get savedVersion() {
+      return savedVersion;
+    },
+  };
+}
+
+/**
+ * Keep a profile saved with createProfileSaver, flushing when the page is hidden
+ * @param {Object} profile - Player profile state
+ * @param {Object} options - createProfileSaver options, read on mount
+ */
+export function useProfileSaver(profile, options) {
+  const [saver] = useState(() => createProfileSaver(options));
+
+  useEffect(() => {
+    saver.update(profile);
+  }, [saver, profile]);
+
+  useEffect(() => {
+    const onVisibilityChange = () => {
+      if (document.visibilityState === 'hidden') saver.flush();
+    };
+    document.addEventListener('visibilitychange', onVisibilityChange);
+    window.addEventListener('pagehide', saver.flush);
+    return () => {
+      document.removeEventListener('visibilitychange', onVisibilityChange);
+      window.removeEventListener('pagehide', saver.flush);
+      saver.flush();
+    };
+  }, [saver]);
+}
@@ -1,5 +1,7 @@
 import { useState, useCallback, useEffect, useRef } from 'react';
 import { CUSTOMER_TYPES, RECIPES } from '../data/gameData';
+import { useGameLoop } from './gameLoop';
+import { gameRandom, traceEvent } from './gameTrace';
 
 /**
  * useCustomerOrders - Custom hook for managing restaurant mode and customer orders
@@ -11,6 +13,9 @@ import { CUSTOMER_TYPES, RECIPES } from '../data/gameData';
  * - Order completion and tips
  * - Reputation system
  *
+ * Random rolls come from gameRandom() and every spawn, drop and served order
+ * is logged with traceEvent(), so a seeded session can be replayed.
+ *
  * @param {Object} playerProfile - Player progression data (for level-based customer unlocks)
  * @param {Function} onOrderComplete - Callback when order is successfully completed
  * @param {Function} onOrderFailed - Callback when order times out
@@ -22,10 +27,16 @@ export function useCustomerOrders(playerProfile, onOrderComplete, onOrderFailed)
   const [reputation, setReputation] = useState(5.0); // Out of 5 stars
   const nextOrderIdRef = useRef(1);
 
+  // The level decides which customers can come, so a replay needs it
+  useEffect(() => {
+    traceEvent('level', { l: playerProfile.level });
+  }, [playerProfile.level]);
+
   /**
    * Toggle restaurant open/closed
    */
   const toggleRestaurant = useCallback(() => {
+    traceEvent('toggle');
     setRestaurantMode((prev) => !prev);
   }, []);
 
@@ -44,7 +55,7 @@ export function useCustomerOrders(playerProfile, onOrderComplete, onOrderFailed)
   const selectRandomCustomer = useCallback(() => {
     const availableCustomers = getAvailableCustomerTypes();
     const totalProbability = availableCustomers.reduce((sum, [_, c]) => sum + c.probability, 0);
-    let random = Math.random() * totalProbability;
+    let random = gameRandom() * totalProbability;
 
     for (const [type, customer] of availableCustomers) {
       random -= customer.probability;
@@ -67,12 +78,12 @@ export function useCustomerOrders(playerProfile, onOrderComplete, onOrderFailed)
     if (customer.preferredDishes && customer.preferredDishes.length > 0) {
       const validPreferred = customer.preferredDishes.filter((r) => availableRecipes.includes(r));
       if (validPreferred.length > 0) {
-        return validPreferred[Math.floor(Math.random() * validPreferred.length)];
+        return validPreferred[Math.floor(gameRandom() * validPreferred.length)];
       }
     }
 
     // Otherwise random recipe
-    return availableRecipes[Math.floor(Math.random() * availableRecipes.length)];
+    return availableRecipes[Math.floor(gameRandom() * availableRecipes.length)];
   }, []);
 
   /**
@@ -109,6 +120,7 @@ export function useCustomerOrders(playerProfile, onOrderComplete, onOrderFailed)
     };
 
     setActiveOrders((prev) => [...prev, newOrder]);
+    traceEvent('spawn', { id: newOrder.id, c: customer.type, r: recipeId });
 
     return newOrder;
   }, [activeOrders.length, selectRandomCustomer, selectRecipeForCustomer, playerProfile.level]);
@@ -135,6 +147,7 @@ export function useCustomerOrders(playerProfile, onOrderComplete, onOrderFailed)
 
       // Remove order
       setActiveOrders((prev) => prev.filter((o) => o.id !== orderId));
+      traceEvent('done', { id: orderId, xp: totalXP });
 
       // Callback with order completion data
       if (onOrderComplete) {
@@ -168,6 +181,7 @@ export function useCustomerOrders(playerProfile, onOrderComplete, onOrderFailed)
 
       // Remove order
       setActiveOrders((prev) => prev.filter((o) => o.id !== orderId));
+      traceEvent('drop', { id: orderId });
 
       // Callback
       if (onOrderFailed) {
@@ -185,6 +199,7 @@ export function useCustomerOrders(playerProfile, onOrderComplete, onOrderFailed)
    */
   const checkForMatchingOrder = useCallback(
     (recipeId) => {
+      traceEvent('serve', { r: recipeId });
       const matchingOrder = activeOrders.find((o) => o.recipeId === recipeId);
 
       if (matchingOrder) {
@@ -211,49 +226,34 @@ export function useCustomerOrders(playerProfile, onOrderComplete, onOrderFailed)
    * Manual order creation (for "New Customer" button)
    */
   const spawnCustomer = useCallback(() => {
+    traceEvent('customer');
     return createOrder();
   }, [createOrder]);
 
   // Timer: Decrease patience for all active orders every second
-  useEffect(() => {
-    if (!restaurantMode || activeOrders.length === 0) {
-      return;
-    }
-
-    const timer = setInterval(() => {
-      setActiveOrders((prev) => {
-        const updated = prev.map((order) => ({
-          ...order,
-          patienceRemaining: order.patienceRemaining - 1,
-        }));
-
-        // Check for expired orders
-        const expired = updated.filter((o) => o.patienceRemaining <= 0);
-        expired.forEach((order) => failOrder(order.id));
-
-        // Return only non-expired orders
-        return updated.filter((o) => o.patienceRemaining > 0);
-      });
-    }, 1000);
-
-    return () => clearInterval(timer);
-  }, [restaurantMode, activeOrders.length, failOrder]);
+  useGameLoop(1000, () => {
+    setActiveOrders((prev) => {
+      const updated = prev.map((order) => ({
+        ...order,
+        patienceRemaining: order.patienceRemaining - 1,
+      }));
+
+      // Check for expired orders
+      const expired = updated.filter((o) => o.patienceRemaining <= 0);
+      expired.forEach((order) => failOrder(order.id));
+
+      // Return only non-expired orders
+      return updated.filter((o) => o.patienceRemaining > 0);
+    });
+  }, restaurantMode && activeOrders.length > 0);
 
   // Auto-spawn customers when restaurant is open
-  useEffect(() => {
-    if (!restaurantMode) {
-      return;
+  useGameLoop(15000, () => {
+    if (activeOrders.length < 3 && gameRandom() > 0.3) {
+      // 70% chance to spawn customer every 15 seconds
+      createOrder();
     }
-
-    const spawnInterval = setInterval(() => {
-      if (activeOrders.length < 3 && Math.random() > 0.3) {
-        // 70% chance to spawn customer every 15 seconds
-        createOrder();
-      }
-    }, 15000);
-
-    return () => clearInterval(spawnInterval);
-  }, [restaurantMode, activeOrders.length, createOrder]);
+  }, restaurantMode);
 
   /**
    * Get patience percentage for an order
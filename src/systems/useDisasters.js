@@ -1,5 +1,7 @@
-import { useState, useCallback, useEffect, useRef } from 'react';
+import { useState, useCallback, useRef } from 'react';
 import { DISASTER_TYPES } from '../data/gameData';
+import { useGameLoop } from './gameLoop';
+import { gameRandom, traceEvent } from './gameTrace';
 
 /**
  * useDisasters - Custom hook for managing kitchen disasters and mini-games
@@ -11,6 +13,9 @@ import { DISASTER_TYPES } from '../data/gameData';
  * - Success/failure outcomes
  * - Warning notifications
  *
+ * Disaster rolls come from gameRandom(), and heat changes, disasters and
+ * their outcomes are logged with traceEvent() for replays.
+ *
  * @param {Function} onDisasterSuccess - Callback when disaster is successfully handled
  * @param {Function} onDisasterFailure - Callback when disaster fails
  * @returns {Object} Disaster state and methods
@@ -66,6 +71,7 @@ export function useDisasters(onDisasterSuccess, onDisasterFailure) {
       };
 
       setActiveDisaster(newDisaster);
+      traceEvent('disaster', { d: disasterType });
 
       return newDisaster;
     },
@@ -79,6 +85,7 @@ export function useDisasters(onDisasterSuccess, onDisasterFailure) {
     if (!activeDisaster) {
       return;
     }
+    traceEvent('resolve');
 
     // Success!
     if (onDisasterSuccess) {
@@ -101,6 +108,7 @@ export function useDisasters(onDisasterSuccess, onDisasterFailure) {
     if (!activeDisaster) {
       return;
     }
+    traceEvent('fail', { d: activeDisaster.type });
 
     // Failure!
     if (onDisasterFailure) {
@@ -119,6 +127,7 @@ export function useDisasters(onDisasterSuccess, onDisasterFailure) {
    * Update pan heat timer
    */
   const updatePanTimer = useCallback((isHeating) => {
+    traceEvent('heat', { k: 'pan', on: Boolean(isHeating) });
     if (isHeating) {
       setPanTimer((prev) => prev + 1);
     } else {
@@ -130,6 +139,7 @@ export function useDisasters(onDisasterSuccess, onDisasterFailure) {
    * Update pot heat timer
    */
   const updatePotTimer = useCallback((isBoiling) => {
+    traceEvent('heat', { k: 'pot', on: Boolean(isBoiling) });
     if (isBoiling) {
       setPotTimer((prev) => prev + 1);
     } else {
@@ -146,7 +156,7 @@ export function useDisasters(onDisasterSuccess, onDisasterFailure) {
     } // Don't trigger if one is already active
 
     // Pan fire condition
-    if (panTimer > 30 && Math.random() < 0.3) {
+    if (panTimer > 30 && gameRandom() < 0.3) {
       addWarning(DISASTER_TYPES.fire.warningMessage, 'high');
       setTimeout(() => {
         triggerDisaster('fire');
@@ -155,7 +165,7 @@ export function useDisasters(onDisasterSuccess, onDisasterFailure) {
     }
 
     // Pot overflow condition
-    if (potTimer > 45 && Math.random() < 0.3) {
+    if (potTimer > 45 && gameRandom() < 0.3) {
       addWarning(DISASTER_TYPES.overflow.warningMessage, 'high');
       setTimeout(() => {
         triggerDisaster('overflow');
@@ -175,43 +185,31 @@ export function useDisasters(onDisasterSuccess, onDisasterFailure) {
   }, [panTimer, potTimer, activeDisaster, addWarning, triggerDisaster]);
 
   // Disaster countdown timer
-  useEffect(() => {
-    if (!activeDisaster) {
-      return;
-    }
-
-    const countdownTimer = setInterval(() => {
-      setActiveDisaster((prev) => {
-        if (!prev) {
-          return null;
-        }
-
-        const newTimeRemaining = prev.timeRemaining - 1;
+  useGameLoop(1000, () => {
+    setActiveDisaster((prev) => {
+      if (!prev) {
+        return null;
+      }
 
-        if (newTimeRemaining <= 0) {
-          // Time's up! Disaster failed
-          failDisaster();
-          return null;
-        }
+      const newTimeRemaining = prev.timeRemaining - 1;
 
-        return {
-          ...prev,
-          timeRemaining: newTimeRemaining,
-        };
-      });
-    }, 1000);
+      if (newTimeRemaining <= 0) {
+        // Time's up! Disaster failed
+        failDisaster();
+        return null;
+      }
 
-    return () => clearInterval(countdownTimer);
-  }, [activeDisaster, failDisaster]);
+      return {
+        ...prev,
+        timeRemaining: newTimeRemaining,
+      };
+    });
+  }, activeDisaster !== null);
 
   // Periodic disaster condition check
-  useEffect(() => {
-    const checkInterval = setInterval(() => {
-      checkDisasterConditions();
-    }, 1000);
-
-    return () => clearInterval(checkInterval);
-  }, [checkDisasterConditions]);
+  useGameLoop(1000, () => {
+    checkDisasterConditions();
+  });
 
   /**
    * Clear a specific warning
@@ -1,5 +1,6 @@
 import { useState, useCallback, useEffect } from 'react';
 import { CHEF_LEVELS, STARTER_INGREDIENTS, INGREDIENT_UNLOCKS } from '../data/gameData';
+import { loadProfile, saveProfile, useProfileSaver } from './profileStorage';
 
 /**
  * useProgression - Custom hook for managing player progression
@@ -34,9 +35,8 @@ export function useProgression() {
   // Load saved profile on mount
   useEffect(() => {
     try {
-      const saved = localStorage.getItem('kitchenExplorerProfile');
-      if (saved) {
-        const loadedProfile = JSON.parse(saved);
+      const loadedProfile = loadProfile();
+      if (loadedProfile) {
         // Merge saved unlocked ingredients with current STARTER_INGREDIENTS
         // This ensures new starter ingredients are always available even in saved games
         const savedUnlocked = loadedProfile.unlockedIngredients || [];
@@ -56,18 +56,8 @@ export function useProgression() {
     }
   }, []);
 
-  // Auto-save profile every 30 seconds
-  useEffect(() => {
-    const saveInterval = setInterval(() => {
-      try {
-        localStorage.setItem('kitchenExplorerProfile', JSON.stringify(playerProfile));
-      } catch (error) {
-        console.error('Failed to save profile:', error);
-      }
-    }, 30000);
-
-    return () => clearInterval(saveInterval);
-  }, [playerProfile]);
+  // Auto-save profile when it changes, at most every 30 seconds
+  useProfileSaver(playerProfile);
 
   /**
    * Award XP and handle level-ups
@@ -231,7 +221,7 @@ export function useProgression() {
     };
 
     setPlayerProfile(newProfile);
-    localStorage.setItem('kitchenExplorerProfile', JSON.stringify(newProfile));
+    saveProfile(newProfile);
   }, []);
 
   return {
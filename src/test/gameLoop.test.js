@@ -0,0 +1,179 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+import { renderHook } from '@testing-library/react';
+import { DeadlineHeap, createGameLoop, useGameLoop } from '../systems/gameLoop.js';
+
+// ============================================================================
+// GAME LOOP TESTS
+// ============================================================================
+
+describe('DeadlineHeap', () => {
+  it('pops tasks by deadline, then in registration order', () => {
+    const heap = new DeadlineHeap();
+    const tasks = [5, 1, 4, 1, 5, 9, 2, 6, 5, 3].map((due, seq) => ({ due, seq }));
+    tasks.forEach((task) => heap.push(task));
+    expect(heap.size).toBe(tasks.length);
+    expect(heap.peek()).toBe(tasks[1]);
+
+    const popped = [];
+    while (heap.size > 0) popped.push(heap.pop());
+    expect(popped).toEqual([...tasks].sort((a, b) => a.due - b.due || a.seq - b.seq));
+  });
+});
+
+describe('createGameLoop', () => {
+  beforeEach(() => {
+    vi.useFakeTimers({ now: 0 });
+  });
+
+  afterEach(() => {
+    vi.useRealTimers();
+    vi.restoreAllMocks();
+  });
+
+  it('runs tasks due at the same moment in one wake-up, in registration order', () => {
+    const loop = createGameLoop({ pauseWhenHidden: false });
+    const runs = [];
+    loop.every(1000, () => runs.push(['a', Date.now()]));
+    loop.every(2000, () => runs.push(['b', Date.now()]));
+
+    vi.advanceTimersByTime(4000);
+    expect(runs).toEqual([['a', 1000], ['a', 2000], ['b', 2000], ['a', 3000], ['a', 4000], ['b', 4000]]);
+    expect(loop.stats).toEqual({ wakeups: 4, runs: 6 });
+  });
+
+  it('rounds a new deadline up to the shared grid', () => {
+    const loop = createGameLoop({ pauseWhenHidden: false });
+    vi.advanceTimersByTime(300);
+    const task = vi.fn();
+    loop.every(1000, task);
+
+    vi.advanceTimersByTime(1699);
+    expect(task).not.toHaveBeenCalled();
+    vi.advanceTimersByTime(1);
+    expect(task).toHaveBeenCalledTimes(1);
+  });
+
+  it('stops calling a cancelled task and lets the timer lapse', () => {
+    const loop = createGameLoop({ pauseWhenHidden: false });
+    const task = vi.fn();
+    const cancel = loop.every(1000, task);
+    cancel();
+
+    vi.advanceTimersByTime(5000);
+    expect(task).not.toHaveBeenCalled();
+    expect(vi.getTimerCount()).toBe(0);
+  });
+
+  it('lets a task cancel itself while it runs', () => {
+    const loop = createGameLoop({ pauseWhenHidden: false });
+    const task = vi.fn(() => cancel());
+    const cancel = loop.every(1000, task);
+
+    vi.advanceTimersByTime(5000);
+    expect(task).toHaveBeenCalledTimes(1);
+  });
+
+  it('schedules tasks added by a running task', () => {
+    const loop = createGameLoop({ pauseWhenHidden: false });
+    const added = vi.fn();
+    // The new task is due before the one that added it runs again
+    const cancel = loop.every(5000, () => {
+      cancel();
+      loop.every(1000, added);
+    });
+
+    vi.advanceTimersByTime(5000);
+    expect(added).not.toHaveBeenCalled();
+    vi.advanceTimersByTime(1000);
+    expect(added).toHaveBeenCalledTimes(1);
+    vi.advanceTimersByTime(4000);
+    expect(added).toHaveBeenCalledTimes(5);
+  });
+
+  it('keeps running the other tasks when one throws', () => {
+    const loop = createGameLoop({ pauseWhenHidden: false });
+    const error = vi.spyOn(console, 'error').mockImplementation(() => {});
+    const task = vi.fn();
+    loop.every(1000, () => {
+      throw new Error('boom');
+    });
+    loop.every(1000, task);
+
+    vi.advanceTimersByTime(2000);
+    expect(task).toHaveBeenCalledTimes(2);
+    expect(error).toHaveBeenCalledWith('Game loop task failed:', expect.any(Error));
+  });
+
+  it('resumes with the time that was left instead of firing a backlog', () => {
+    const loop = createGameLoop({ pauseWhenHidden: false });
+    const task = vi.fn();
+    loop.every(1000, task);
+
+    vi.advanceTimersByTime(400);
+    loop.pause();
+    vi.advanceTimersByTime(10000);
+    expect(task).not.toHaveBeenCalled();
+
+    loop.resume();
+    vi.advanceTimersByTime(599);
+    expect(task).not.toHaveBeenCalled();
+    vi.advanceTimersByTime(1);
+    expect(task).toHaveBeenCalledTimes(1);
+  });
+
+  it('pauses while the document is hidden', () => {
+    const loop = createGameLoop();
+    const task = vi.fn();
+    loop.every(1000, task);
+    const setHidden = (hidden) => {
+      Object.defineProperty(document, 'hidden', { configurable: true, get: () => hidden });
+      document.dispatchEvent(new Event('visibilitychange'));
+    };
+
+    try {
+      setHidden(true);
+      vi.advanceTimersByTime(5000);
+      expect(task).not.toHaveBeenCalled();
+
+      setHidden(false);
+      vi.advanceTimersByTime(1000);
+      expect(task).toHaveBeenCalledTimes(1);
+    } finally {
+      delete document.hidden;
+    }
+  });
+});
+
+describe('useGameLoop', () => {
+  beforeEach(() => {
+    vi.useFakeTimers({ now: 0 });
+  });
+
+  afterEach(() => {
+    vi.useRealTimers();
+  });
+
+  it('calls the latest callback while enabled, and cancels on unmount', () => {
+    const loop = createGameLoop({ pauseWhenHidden: false });
+    const calls = [];
+    const { rerender, unmount } = renderHook(
+      ({ value, enabled }) => useGameLoop(1000, () => calls.push(value), enabled, loop),
+      { initialProps: { value: 'a', enabled: true } }
+    );
+
+    vi.advanceTimersByTime(1000);
+    rerender({ value: 'b', enabled: true });
+    vi.advanceTimersByTime(1000);
+    expect(calls).toEqual(['a', 'b']);
+    expect(loop.stats.runs).toBe(2);
+
+    rerender({ value: 'c', enabled: false });
+    vi.advanceTimersByTime(3000);
+    expect(calls).toEqual(['a', 'b']);
+
+    rerender({ value: 'd', enabled: true });
+    unmount();
+    vi.advanceTimersByTime(3000);
+    expect(calls).toEqual(['a', 'b']);
+  });
+});
@@ -0,0 +1,92 @@
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { createElement } from 'react';
+import { render, renderHook, screen, waitFor } from '@testing-library/react';
+import { chunkLoader, lazyComponent, useChunk } from '../systems/lazyChunks.js';
+
+// ============================================================================
+// LAZY CHUNK TESTS
+// ============================================================================
+
+const chunk = { default: ({ label }) => createElement('span', null, label) };
+
+afterEach(() => {
+  vi.restoreAllMocks();
+  vi.unstubAllGlobals();
+});
+
+describe('chunkLoader', () => {
+  it('imports a chunk once, however often it is asked for', async () => {
+    const load = vi.fn(() => Promise.resolve(chunk));
+    const loader = chunkLoader(load);
+    expect(loader.loaded()).toBeNull();
+
+    const first = loader();
+    const second = loader();
+    expect(second).toBe(first);
+    expect(await first).toBe(chunk);
+    expect(loader.loaded()).toBe(chunk);
+
+    await loader();
+    expect(load).toHaveBeenCalledTimes(1);
+  });
+
+  it('lets the next call retry a failed import', async () => {
+    const load = vi.fn()
+      .mockImplementationOnce(() => Promise.reject(new Error('offline')))
+      .mockImplementationOnce(() => Promise.resolve(chunk));
+    const loader = chunkLoader(load);
+
+    await expect(loader()).rejects.toThrow('offline');
+    expect(loader.loaded()).toBeNull();
+    expect(await loader()).toBe(chunk);
+    expect(load).toHaveBeenCalledTimes(2);
+  });
+});
+
+describe('useChunk', () => {
+  it('returns the module once it has loaded', async () => {
+    const loader = chunkLoader(() => Promise.resolve(chunk));
+    const { result } = renderHook(() => useChunk(loader));
+    expect(result.current).toBeNull();
+    await waitFor(() => expect(result.current).toBe(chunk));
+  });
+
+  it('does not load while disabled', () => {
+    const load = vi.fn(() => Promise.resolve(chunk));
+    const { result } = renderHook(() => useChunk(chunkLoader(load), false));
+    expect(result.current).toBeNull();
+    expect(load).not.toHaveBeenCalled();
+  });
+
+  it('reports a failed import and keeps rendering without the chunk', async () => {
+    const error = vi.spyOn(console, 'error').mockImplementation(() => {});
+    const loader = chunkLoader(() => Promise.reject(new Error('offline')));
+    const { result } = renderHook(() => useChunk(loader));
+
+    await waitFor(() => expect(error).toHaveBeenCalledWith('Failed to load chunk:', expect.any(Error)));
+    expect(result.current).toBeNull();
+  });
+});
+
+describe('lazyComponent', () => {
+  it('renders the default export of the chunk', async () => {
+    const load = vi.fn(() => Promise.resolve(chunk));
+    const Lazy = lazyComponent(load, { prefetch: false });
+    render(createElement(Lazy, { label: 'Sushi station' }));
+
+    expect(await screen.findByText('Sushi station')).toBeInTheDocument();
+    await Lazy.preload();
+    expect(load).toHaveBeenCalledTimes(1);
+  });
+
+  it('prefetches the chunk when the browser is idle', () => {
+    const idle = vi.fn();
+    vi.stubGlobal('requestIdleCallback', idle);
+    const load = vi.fn(() => Promise.resolve(chunk));
+    lazyComponent(load);
+    expect(load).not.toHaveBeenCalled();
+
+    idle.mock.calls[0][0]();
+    expect(load).toHaveBeenCalledTimes(1);
+  });
+});
@@ -0,0 +1,137 @@
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { INGREDIENTS, RECIPES } from '../data/gameData.js';
+import {
+  encodeProfile,
+  decodeProfile,
+  createProfileSaver,
+  loadProfile,
+  PROFILE_KEY,
+  SAVE_FORMAT,
+} from '../systems/profileStorage.js';
+
+// ============================================================================
+// PROFILE STORAGE TESTS
+// ============================================================================
+
+const profile = {
+  level: 2,
+  xp: 40,
+  totalXP: 140,
+  unlockedIngredients: [Object.keys(INGREDIENTS)[0], Object.keys(INGREDIENTS)[5], 'notAnIngredient'],
+  discoveredRecipes: [Object.keys(RECIPES)[1]],
+  stats: { recipesCompleted: 3, customersServed: 1, disastersHandled: 0, perfectDishes: 0 },
+};
+
+// A profile with a long stats history, far more than one call's arguments
+const longHistory = {
+  ...profile,
+  stats: Object.fromEntries(Array.from({ length: 20000 }, (_, day) => [`day${day}`, day])),
+};
+
+const memoryStorage = () => {
+  const items = {};
+  return {
+    items,
+    setItem: vi.fn((key, value) => { items[key] = value; }),
+    getItem: (key) => items[key] ?? null,
+  };
+};
+
+describe('encodeProfile / decodeProfile', () => {
+  it('round-trips a profile, keeping keys missing from gameData', () => {
+    const decoded = decodeProfile(encodeProfile(profile));
+    expect(decoded).toEqual(profile);
+  });
+
+  it('stores each unlocked ingredient once', () => {
+    const key = Object.keys(INGREDIENTS)[0];
+    const decoded = decodeProfile(encodeProfile({ ...profile, unlockedIngredients: [key, key, key] }));
+    expect(decoded.unlockedIngredients).toEqual([key]);
+  });
+
+  it('keeps fields that are not counters exactly', () => {
+    const odd = { ...profile, xp: 2.5, unlockedStations: ['sink'], stats: { recipesCompleted: -1 } };
+    expect(decodeProfile(encodeProfile(odd))).toEqual(odd);
+  });
+
+  it('is much smaller than the plain JSON profile', () => {
+    const unlocked = { ...profile, unlockedIngredients: Object.keys(INGREDIENTS) };
+    const saved = encodeProfile(unlocked);
+    expect(saved.length * 4).toBeLessThan(JSON.stringify(unlocked).length);
+    expect(atob(saved).charCodeAt(0)).toBe(SAVE_FORMAT);
+  });
+
+  it('round-trips a profile with a long stats history', () => {
+    expect(decodeProfile(encodeProfile(longHistory))).toEqual(longHistory);
+  });
+
+  it('migrates plain JSON profiles, dropping duplicate unlocks', () => {
+    const key = Object.keys(INGREDIENTS)[0];
+    const saved = JSON.stringify({ ...profile, unlockedIngredients: [key, key] });
+    expect(decodeProfile(saved)).toEqual({ ...profile, unlockedIngredients: [key] });
+  });
+
+  it('migrates the hex bitset JSON format', () => {
+    const saved = JSON.stringify({ level: 3, xp: 1, totalXP: 301, stats: {}, v: 2, ingredients: '3', recipes: '1' });
+    expect(decodeProfile(saved)).toEqual({
+      level: 3,
+      xp: 1,
+      totalXP: 301,
+      stats: {},
+      unlockedIngredients: Object.keys(INGREDIENTS).slice(0, 2),
+      discoveredRecipes: Object.keys(RECIPES).slice(0, 1),
+    });
+  });
+});
+
+describe('createProfileSaver', () => {
+  afterEach(() => {
+    vi.useRealTimers();
+    vi.restoreAllMocks();
+  });
+
+  it('writes once per interval, and only when the profile changed', () => {
+    vi.useFakeTimers();
+    const storage = memoryStorage();
+    const saver = createProfileSaver({ storage, interval: 30000 });
+
+    saver.update(profile);
+    vi.advanceTimersByTime(60000);
+    expect(storage.setItem).not.toHaveBeenCalled();
+
+    saver.update({ ...profile, xp: 41 });
+    saver.update({ ...profile, xp: 42 });
+    vi.advanceTimersByTime(30000);
+    expect(storage.setItem).toHaveBeenCalledTimes(1);
+    expect(decodeProfile(storage.items.kitchenExplorerProfile).xp).toBe(42);
+    expect(saver.savedVersion).toBe(saver.version);
+
+    saver.flush();
+    expect(storage.setItem).toHaveBeenCalledTimes(1);
+  });
+
+  it('flushes pending changes immediately', () => {
+    vi.useFakeTimers();
+    const storage = memoryStorage();
+    const saver = createProfileSaver({ storage });
+
+    saver.update(profile);
+    saver.update({ ...profile, level: 3 });
+    saver.flush();
+    expect(decodeProfile(storage.items.kitchenExplorerProfile).level).toBe(3);
+  });
+
+  it('saves a profile with a long stats history', () => {
+    vi.useFakeTimers();
+    const error = vi.spyOn(console, 'error').mockImplementation(() => {});
+    const storage = memoryStorage();
+    const saver = createProfileSaver({ storage });
+
+    saver.update(profile);
+    saver.update(longHistory);
+    saver.flush();
+    expect(error).not.toHaveBeenCalled();
+    expect(saver.savedVersion).toBe(saver.version);
+    expect(loadProfile(PROFILE_KEY, storage)).toEqual(longHistory);
+  });
+});
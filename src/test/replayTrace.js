@@ -0,0 +1,116 @@
+import { act, renderHook } from '@testing-library/react';
+import { vi } from 'vitest';
+
+// ============================================================================
+// TRACE REPLAY
+// ============================================================================
+//
+// Plays the inputs of a recorded trace (see src/systems/gameTrace.js) back
+// through the order and disaster hooks, on fake timers, one tick at a time.
+// Used by traceReplay.test.js, which trace_replay.py drives.
+
+// Saved before any test fakes the clock, to pace ticks in real time
+const realSetTimeout = globalThis.setTimeout;
+
+const heapUsed = () => (typeof process !== 'undefined' && process.memoryUsage ? process.memoryUsage().heapUsed : null);
+
+// Outcome events without their timestamps, to compare two runs
+const outcomeKey = ({ t, ...event }) => JSON.stringify(event);
+
+/**
+ * Replay a trace
+ * @param {Object} trace - { header, events }, e.g. from parseTrace()
+ * @param {Object} options
+ * @param {number} options.tick - Game time per tick, in ms (default: 1000)
+ * @param {number} options.speed - Game time per real time; 0 runs flat out (default: 100)
+ * @param {number} options.heapEvery - Sample the heap every N ticks (default: 10)
+ * @returns {Object} { ticks: [[t, ms, renders, heap], ...], renders, outcomes, diverged, trace }
+ */
+export async function replayTrace({ header, events }, { tick = 1000, speed = 100, heapEvery = 10 } = {}) {
+  vi.useFakeTimers({ now: header.start });
+  // Fresh modules, so the shared game loop and trace state start on this clock
+  vi.resetModules();
+  const { TRACE_INPUTS, TRACE_OUTCOMES, startTrace, stopTrace } = await import('../systems/gameTrace');
+  const { useCustomerOrders } = await import('../systems/useCustomerOrders');
+  const { useDisasters } = await import('../systems/useDisasters');
+
+  const inputs = events.filter((event) => TRACE_INPUTS.includes(event.e));
+  const isOutcome = (event) => TRACE_OUTCOMES.includes(event.e);
+  const end = events.reduce((last, event) => Math.max(last, event.t), 0);
+  const firstLevel = inputs.find((event) => event.e === 'level');
+
+  startTrace({ seed: header.seed });
+  let renders = 0;
+  const { result, rerender, unmount } = renderHook(
+    ({ level }) => {
+      renders += 1;
+      return { orders: useCustomerOrders({ level }), disasters: useDisasters() };
+    },
+    { initialProps: { level: firstLevel ? firstLevel.l : 1 } }
+  );
+
+  const apply = (event) => {
+    const { orders, disasters } = result.current;
+    switch (event.e) {
+      case 'toggle':
+        return orders.toggleRestaurant();
+      case 'customer':
+        return orders.spawnCustomer();
+      case 'serve':
+        return orders.checkForMatchingOrder(event.r);
+      case 'heat':
+        return event.k === 'pot' ? disasters.updatePotTimer(event.on) : disasters.updatePanTimer(event.on);
+      case 'resolve':
+        return disasters.resolveDisaster();
+      case 'level':
+        return rerender({ level: event.l });
+      default:
+        return undefined;
+    }
+  };
+
+  const ticks = [];
+  let next = 0;
+  let now = 0;
+  let replayed;
+  try {
+    for (let start = 0; start < end || next < inputs.length; start += tick) {
+      const rendersBefore = renders;
+      const began = performance.now();
+      // Inputs land at their recorded time within the tick, each in its own act()
+      while (next < inputs.length && inputs[next].t < start + tick) {
+        const input = inputs[next++];
+        act(() => {
+          vi.advanceTimersByTime(Math.max(0, input.t - now));
+          apply(input);
+        });
+        now = Math.max(now, input.t);
+      }
+      act(() => {
+        vi.advanceTimersByTime(start + tick - now);
+      });
+      now = start + tick;
+      const ms = performance.now() - began;
+      ticks.push([start, ms, renders - rendersBefore, ticks.length % heapEvery === 0 ? heapUsed() : null]);
+      if (speed > 0) {
+        await new Promise((resolve) => realSetTimeout(resolve, tick / speed));
+      }
+    }
+  } finally {
+    unmount();
+    // While the clock is still fake, so `end` lands where the replay stopped
+    replayed = stopTrace();
+    vi.useRealTimers();
+  }
+
+  const expected = events.filter(isOutcome);
+  const outcomes = replayed.events.filter(isOutcome);
+  let diverged = null;
+  for (let i = 0; i < Math.max(expected.length, outcomes.length); i++) {
+    if (!expected[i] || !outcomes[i] || outcomeKey(expected[i]) !== outcomeKey(outcomes[i])) {
+      diverged = { index: i, expected: expected[i] || null, actual: outcomes[i] || null };
+      break;
+    }
+  }
+  return { ticks, renders, outcomes, diverged, trace: replayed };
+}
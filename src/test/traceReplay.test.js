@@ -0,0 +1,108 @@
+import { describe, it, expect, afterEach } from 'vitest';
+import { readFileSync, writeFileSync } from 'node:fs';
+import {
+  createRandom,
+  gameRandom,
+  parseTrace,
+  startTrace,
+  stopTrace,
+  traceEvent,
+  traceToJSONL,
+} from '../systems/gameTrace.js';
+import { replayTrace } from './replayTrace.js';
+
+// ============================================================================
+// GAME TRACE TESTS
+// ============================================================================
+
+describe('gameTrace', () => {
+  afterEach(() => {
+    stopTrace();
+  });
+
+  it('same seed gives the same rolls', () => {
+    const a = createRandom(42);
+    const b = createRandom(42);
+    const rolls = Array.from({ length: 5 }, a);
+    expect(Array.from({ length: 5 }, b)).toEqual(rolls);
+    rolls.forEach((roll) => {
+      expect(roll).toBeGreaterThanOrEqual(0);
+      expect(roll).toBeLessThan(1);
+    });
+  });
+
+  it('gameRandom is seeded while a trace runs', () => {
+    startTrace({ seed: 7 });
+    const first = [gameRandom(), gameRandom()];
+    startTrace({ seed: 7 });
+    expect([gameRandom(), gameRandom()]).toEqual(first);
+  });
+
+  it('events are only recorded while a trace runs', () => {
+    traceEvent('toggle');
+    const trace = startTrace({ seed: 1 });
+    traceEvent('serve', { r: 'salad' });
+    expect(trace.events).toEqual([expect.objectContaining({ e: 'serve', r: 'salad' })]);
+  });
+
+  it('round-trips through JSONL', () => {
+    const trace = startTrace({ seed: 3 });
+    traceEvent('customer');
+    traceEvent('spawn', { id: 1, c: 'regular', r: 'salad' });
+    const text = traceToJSONL(trace);
+    expect(text.trim().split('\n')).toHaveLength(3);
+    expect(parseTrace(text)).toEqual(trace);
+    expect(() => parseTrace('{"v":99}\n')).toThrow('Unsupported trace version');
+  });
+});
+
+// ============================================================================
+// REPLAY TESTS
+// ============================================================================
+
+// Ten minutes of restaurant play: open, a few customers, a long fry
+const SESSION = {
+  header: { v: 1, seed: 2024, start: 1700000000000 },
+  events: [
+    { t: 0, e: 'level', l: 3 },
+    { t: 500, e: 'toggle' },
+    { t: 2000, e: 'customer' },
+    { t: 9000, e: 'customer' },
+    ...Array.from({ length: 60 }, (_, i) => ({ t: 20000 + i * 1000, e: 'heat', k: 'pan', on: true })),
+    { t: 85000, e: 'resolve' },
+    { t: 600000, e: 'end' },
+  ],
+};
+
+describe('replayTrace', () => {
+  it('replays a session the same way twice', async () => {
+    const first = await replayTrace(SESSION, { speed: 0 });
+    expect(first.outcomes.some((event) => event.e === 'spawn')).toBe(true);
+    expect(first.ticks).toHaveLength(600);
+
+    // The first replay's own trace has the outcomes a recording would have
+    const second = await replayTrace(first.trace, { speed: 0 });
+    expect(second.diverged).toBeNull();
+    expect(second.renders).toBe(first.renders);
+  });
+
+  // Set by trace_replay.py
+  const { TRACE_REPLAY, TRACE_REPORT, TRACE_SPEED, TRACE_TICK } = process.env;
+
+  it.runIf(TRACE_REPLAY)('replays TRACE_REPLAY', async () => {
+    const trace = parseTrace(readFileSync(TRACE_REPLAY, 'utf8'));
+    const options = { speed: Number(TRACE_SPEED || 100), tick: Number(TRACE_TICK || 1000) };
+    const { ticks, renders, outcomes, diverged } = await replayTrace(trace, options);
+    const report = {
+      trace: TRACE_REPLAY,
+      seed: trace.header.seed,
+      ...options,
+      ticks,
+      renders,
+      outcomes: outcomes.length,
+      diverged,
+    };
+    if (TRACE_REPORT) writeFileSync(TRACE_REPORT, JSON.stringify(report));
+    expect(ticks.length).toBeGreaterThan(0);
+  }, 0);
+});
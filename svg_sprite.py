@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Build stage that moves IngredientSVG's static SVG into one shared sprite.
+
+Every static gradient, filter, pattern, clip path and mask in the
+component's <defs> blocks is hashed with its id left out. Identical
+definitions collapse into one entry of a generated IngredientSprite
+component, and references to the dropped copies are rewritten. Branches
+whose returned markup is fully static (no JSX expressions) become
+<symbol>s in the sprite and are drawn with <use>. IngredientSprite is
+mounted once in the game's root element, so the definitions exist once
+per page instead of once per rendered ingredient.
+
+Markup that depends on props or state stays inline. Re-running merges
+newly added definitions into the existing sprite.
+
+    python svg_sprite.py src/CookingGame.jsx --dry-run
+"""
+
+import argparse
+import os
+import re
+import textwrap
+
+from jsx_structure import tokenize
+from patch_cache import PatchCache, content_hash
+from patch_io import MappedSource, write_atomic, write_plan
+from patch_ledger import PatchLedger
+from patch_report import PatchProfile, diff_path, format_profile, plan_diff
+from splice import SplicePlan
+
+DEFAULT_SOURCE = 'C:/Dev/Kitchen_Explorer/src/CookingGame.jsx'
+
+COMPONENT = 'IngredientSVG'
+ROOT_COMPONENT = 'CookingGame'
+SPRITE_NAME = 'IngredientSprite'
+
+# Must match the viewBox IngredientSVG renders into, so <use> draws symbols 1:1
+SYMBOL_VIEWBOX = '0 0 50 50'
+
+DEF_TAGS = {'linearGradient', 'radialGradient', 'filter', 'pattern', 'clipPath', 'mask'}
+
+ID_RE = re.compile(r'\bid="([^"]+)"')
+REF_RE = re.compile(r'(url\(#|[hH]ref="#)([\w:.-]+)')
+WS_RE = re.compile(r'\s+')
+
+SPRITE_TEMPLATE = '''// Generated by svg_sprite.py from {component} in {source}.
+// Edit the definitions there and re-run the build stage instead of editing this file.
+import React from 'react';
+
+export const {name} = () => (
+  <svg width="0" height="0" style={{{{ position: 'absolute' }}}} aria-hidden="true" focusable="false">
+    <defs>
+{entries}
+    </defs>
+  </svg>
+);
+
+export default {name};
+'''
+
+
+class SpriteError(ValueError):
+    pass
+
+
+def sprite_path_for(source_file):
+    return os.path.join(os.path.dirname(os.path.abspath(source_file)), 'components', SPRITE_NAME + '.jsx')
+
+
+def _tokens(text):
+    return [t for t in tokenize(text) if t.kind not in ('ws', 'comment')]
+
+
+def _element_end(tokens, i):
+    # Index of the token closing the JSX element opened at tokens[i]
+    nesting = 0
+    for j in range(i, len(tokens)):
+        token = tokens[j]
+        if token.kind != 'jsx_tag':
+            continue
+        if token.value in ('<', '<>'):
+            nesting += 1
+        elif token.value == '/>' or token.value.startswith('</'):
+            nesting -= 1
+            if nesting == 0:
+                return j
+    raise SpriteError(f'Unclosed JSX element at offset {tokens[i].start}')
+
+
+def _is_static(tokens, i, j):
+    # No JSX expressions between tokens i and j; `{/* comments */}` are fine
+    for k in range(i, j):
+        if tokens[k].kind == 'punct' and tokens[k].value == '{' and tokens[k + 1].value != '}':
+            return False
+    return True
+
+
+def _open_tag_end(tokens, i):
+    # Index of the `>` or `/>` ending the opening tag started at tokens[i]
+    k = i + 1
+    while tokens[k].kind != 'jsx_tag' or tokens[k].value not in ('>', '/>'):
+        k += 1
+    return k
+
+
+def _children(tokens, i, j):
+    # Child elements of the element spanning tokens[i..j], as (first, last) indexes
+    k = _open_tag_end(tokens, i)
+    children = []
+    k += 1
+    while k < j:
+        token = tokens[k]
+        if token.kind == 'jsx_tag' and token.value in ('<', '<>'):
+            end = _element_end(tokens, k)
+            children.append((k, end))
+            k = end + 1
+        elif token.kind == 'punct' and token.value == '{':
+            depth = token.depth
+            k += 1
+            while not (tokens[k].value == '}' and tokens[k].depth == depth):
+                k += 1
+            k += 1
+        else:
+            k += 1
+    return children
+
+
+def _canonical(element, element_id=None):
+    # Whitespace-insensitive form used for hashing; the id itself never counts
+    if element_id is not None:
+        element = element.replace(f'id="{element_id}"', 'id=""', 1)
+    return WS_RE.sub(' ', element).replace('> <', '><').strip()
+
+
+def _line_span(text, start, end):
+    # Widen a removal to whole lines when nothing else shares them
+    line_start = text.rfind('\n', 0, start) + 1
+    line_end = text.find('\n', end)
+    line_end = len(text) if line_end == -1 else line_end
+    if not text[line_start:start].strip() and not text[end:line_end].strip():
+        return line_start, min(line_end + 1, len(text))
+    return start, end
+
+
+def _column(text, offset):
+    return offset - (text.rfind('\n', 0, offset) + 1)
+
+
+def _dedent(fragment, column):
+    # A fragment whose first line started at `column`, shifted to column 0
+    return textwrap.dedent(' ' * column + fragment)
+
+
+def _rewrite_refs(fragment, id_map):
+    return REF_RE.sub(lambda m: m.group(1) + id_map.get(m.group(2), m.group(2)), fragment)
+
+
+def _splice_out(text, start, end, removals):
+    # text[start:end] without the (sorted, non-overlapping) removal ranges
+    pieces = []
+    cursor = start
+    for remove_start, remove_end in removals:
+        if start <= remove_start and remove_end <= end:
+            pieces.append(text[cursor:remove_start])
+            cursor = remove_end
+    pieces.append(text[cursor:end])
+    return ''.join(pieces)
+
+
+def read_sprite(path):
+    # [(id, element text)] of a sprite generated by this module, in order
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    tokens = _tokens(text)
+    for i, token in enumerate(tokens):
+        if token.kind == 'jsx_tag' and token.value == '<' and tokens[i + 1].value == 'defs':
+            entries = []
+            for first, last in _children(tokens, i, _element_end(tokens, i)):
+                start, end = tokens[first].start, tokens[last].end
+                match = ID_RE.search(text, start, end)
+                if match:
+                    entries.append((match.group(1), _dedent(text[start:end], _column(text, start))))
+            return entries
+    raise SpriteError(f'{path} has no <defs> block')
+
+
+def render_sprite(entries, source_name):
+    body = '\n'.join(textwrap.indent(element, ' ' * 6) for _, element in entries)
+    return SPRITE_TEMPLATE.format(component=COMPONENT, source=source_name, name=SPRITE_NAME, entries=body)
+
+
+class SpriteBuild:
+    """Plans the IngredientSVG rewrite and the sprite entries it needs."""
+
+    def __init__(self, text, base, tokens, existing):
+        self.text = text
+        self.base = base  # offset of the component in the file
+        self.tokens = tokens
+        self.entries = list(existing)
+        self.new_entries = 0
+        self.by_hash = {}
+        self.hash_of = {}
+        for element_id, element in existing:
+            if element.startswith('<symbol'):
+                element_hash = content_hash(_canonical(element[element.index('>') + 1:element.rindex('</symbol>')]))
+            else:
+                element_hash = content_hash(_canonical(element, element_id))
+            self.by_hash.setdefault(element_hash, element_id)
+            self.hash_of[element_id] = element_hash
+        self.removals = []      # (start, end) relative to the component
+        self.id_maps = {}       # scope (start, end) -> {old id: sprite id}
+        self.symbols = []       # (start, end, symbol id) of static returns
+        self.defs_moved = 0
+
+    def _register(self, element_id, element, scope):
+        element_hash = content_hash(_canonical(element, element_id))
+        sprite_id = self.by_hash.get(element_hash)
+        if sprite_id is None:
+            sprite_id = element_id
+            if sprite_id in self.hash_of:  # same id, different content
+                sprite_id = f'{element_id}-{element_hash[:6]}'
+            self.by_hash[element_hash] = sprite_id
+            self.hash_of[sprite_id] = element_hash
+            self.entries.append((sprite_id, (element_id, element, scope)))
+            self.new_entries += 1
+        return sprite_id
+
+    def _scopes(self):
+        # Token ranges of every `return (...)` in the component
+        closers = {}
+        stack = []
+        for i, token in enumerate(self.tokens):
+            if token.kind == 'punct':
+                if token.value in ('(', '[', '{', '${'):
+                    stack.append(i)
+                elif token.value in (')', ']', '}'):
+                    closers[stack.pop()] = i
+        return [(i + 1, closers[i + 1]) for i, token in enumerate(self.tokens)
+                if token.kind == 'ident' and token.value == 'return' and i + 1 in closers
+                and self.tokens[i + 1].value == '(']
+
+    def collect_defs(self):
+        tokens = self.tokens
+        scopes = self._scopes()
+        for i, token in enumerate(tokens):
+            if not (token.kind == 'jsx_tag' and token.value == '<' and tokens[i + 1].value == 'defs'):
+                continue
+            end = _element_end(tokens, i)
+            scope = min((s for s in scopes if s[0] < i and end < s[1]),
+                        key=lambda s: s[1] - s[0], default=(0, len(tokens) - 1))
+            scope_range = (tokens[scope[0]].start, tokens[scope[1]].end)
+            id_map = self.id_maps.setdefault(scope_range, {})
+
+            children = _children(tokens, i, end)
+            moved = []
+            for first, last in children:
+                start, stop = tokens[first].start, tokens[last].end
+                match = ID_RE.search(self.text, start, tokens[_open_tag_end(tokens, first)].end)
+                if tokens[first + 1].value not in DEF_TAGS or not match or not _is_static(tokens, first, last):
+                    continue
+                element = _dedent(self.text[start:stop], _column(self.text, start))
+                id_map[match.group(1)] = self._register(match.group(1), element, scope_range)
+                moved.append((start, stop))
+            self.defs_moved += len(moved)
+
+            if moved and len(moved) == len(children) and _is_static(tokens, i, end):
+                self.removals.append(_line_span(self.text, token.start, tokens[end].end))
+            else:
+                self.removals.extend(_line_span(self.text, start, stop) for start, stop in moved)
+        self.removals.sort()
+
+    def collect_symbols(self):
+        tokens = self.tokens
+        for open_index, close_index in self._scopes():
+            first = open_index + 1
+            # `<use>` is what an earlier run already left behind
+            if not (tokens[first].kind == 'jsx_tag' and tokens[first].value == '<') or tokens[first + 1].value == 'use':
+                continue
+            last = _element_end(tokens, first)
+            if last >= close_index or not _is_static(tokens, first, last):
+                continue
+            start, end = tokens[first].start, tokens[last].end
+            scope = (tokens[open_index].start, tokens[close_index].end)
+            inner = _splice_out(self.text, start, end, self.removals)
+            inner = _rewrite_refs(inner, self.id_maps.get(scope, {}))
+            case = re.search(r"case '([\w$]+)'", self.text[self.text.rfind('case ', 0, start):start])
+            symbol_hash = content_hash(_canonical(inner))
+            symbol_id = self.by_hash.get(symbol_hash)
+            if symbol_id is None:
+                symbol_id = f"{case.group(1) if case else 'ingredient'}-{symbol_hash[:8]}"
+                body = textwrap.indent(_dedent(inner, _column(self.text, start)), '  ')
+                element = f'<symbol id="{symbol_id}" viewBox="{SYMBOL_VIEWBOX}">\n{body}\n</symbol>'
+                self.by_hash[symbol_hash] = symbol_id
+                self.hash_of[symbol_id] = symbol_hash
+                self.entries.append((symbol_id, element))
+                self.new_entries += 1
+            self.symbols.append((start, end, symbol_id))
+
+    def sprite_entries(self):
+        # Entries with their own references rewritten to sprite ids
+        entries = []
+        for sprite_id, element in self.entries:
+            if isinstance(element, tuple):
+                element_id, element, scope = element
+                element = _rewrite_refs(element, self.id_maps.get(scope, {}))
+                element = element.replace(f'id="{element_id}"', f'id="{sprite_id}"', 1)
+            entries.append((sprite_id, element))
+        return entries
+
+    def plan(self, plan):
+        # Replace static returns with <use>, drop moved definitions and
+        # point the remaining references at the sprite ids
+        replaced = []
+        for start, end, symbol_id in self.symbols:
+            plan.replace(self.base + start, self.base + end, f'<use href="#{symbol_id}" width="50" height="50" />')
+            replaced.append((start, end))
+        for start, end in self.removals:
+            if not any(s <= start and end <= e for s, e in replaced):
+                plan.replace(self.base + start, self.base + end, '')
+                replaced.append((start, end))
+        for (scope_start, scope_end), id_map in self.id_maps.items():
+            changed = {old: new for old, new in id_map.items() if old != new}
+            if not changed:
+                continue
+            for match in REF_RE.finditer(self.text, scope_start, scope_end):
+                if match.group(2) in changed and not any(s <= match.start() < e for s, e in replaced):
+                    plan.replace(self.base + match.start(2), self.base + match.end(2), changed[match.group(2)])
+
+
+def _root_open_tag_end(text, structure, component_name):
+    # Offset just past the opening tag of the element a component returns
+    component = structure.declaration(component_name)
+    start = component.return_offset
+    tokens = _tokens(text[start:component.body[1]])
+    for i, token in enumerate(tokens):
+        if token.kind == 'jsx_tag' and token.value == '<':
+            for follow in tokens[i + 1:]:
+                if follow.kind == 'jsx_tag' and follow.value == '>' and follow.depth == token.depth:
+                    return start + follow.end, start + token.start
+    raise SpriteError(f'{component_name} does not return a JSX element')
+
+
+def extract_svg_sprite(source_file=DEFAULT_SOURCE, sprite_file=None, dry_run=False, cache=None, profile=None):
+    cache = cache or PatchCache()
+    profile = profile or PatchProfile()
+    sprite_file = sprite_file or sprite_path_for(source_file)
+
+    with profile.stage('read'):
+        source = MappedSource(source_file)
+        existing = read_sprite(sprite_file)
+    content = source.text
+
+    plan = SplicePlan(content)
+    ledger = PatchLedger(source_file, content, source.digest)
+    with profile.locate('(structure map)'):
+        structure = cache.structure(content, source.digest)
+    if COMPONENT not in structure.by_name:
+        source.close()
+        reason = f"Could not find {COMPONENT}"
+        print(reason)
+        return {'skipped': reason}
+
+    component = structure.declaration(COMPONENT)
+    with profile.locate('defs'):
+        build = SpriteBuild(content[component.start:component.end], component.start,
+                            _tokens(content[component.start:component.end]), existing)
+        build.collect_defs()
+    with profile.locate('symbols'):
+        build.collect_symbols()
+    with profile.apply('defs', plan):
+        build.plan(plan)
+
+    # Import the sprite and mount it once at the top of the game's root element
+    with profile.locate('sprite_mount'):
+        imports = [d for d in structure.declarations if d.kind == 'import']
+        import_pos = content.find('\n', imports[-1].end) + 1 if imports else 0
+        mount_pos, root_start = _root_open_tag_end(content, structure, ROOT_COMPONENT)
+        indent = root_start - (content.rfind('\n', 0, root_start) + 1) + 2
+    relative = os.path.relpath(os.path.splitext(sprite_file)[0], os.path.dirname(os.path.abspath(source_file)))
+    import_line = f"import {{ {SPRITE_NAME} }} from './{relative.replace(os.sep, '/')}';\n"
+    with profile.apply('sprite_import', plan):
+        ledger.plan_insert(plan, 'sprite_import', import_line, import_pos)
+    with profile.apply('sprite_mount', plan):
+        ledger.plan_insert(plan, 'sprite_mount', '\n' + ' ' * indent + f'<{SPRITE_NAME} />', mount_pos)
+
+    sprite_text = None
+    if build.new_entries or not existing:
+        sprite_text = render_sprite(build.sprite_entries(), os.path.basename(source_file))
+
+    diff = None
+    if dry_run:
+        diff = plan_diff(plan, source_file)
+        if sprite_text is not None:
+            old_sprite = render_sprite(existing, os.path.basename(source_file)) if existing else ''
+            sprite_plan = SplicePlan(old_sprite)
+            sprite_plan.replace(0, len(old_sprite), sprite_text)
+            diff += plan_diff(sprite_plan, diff_path(sprite_file, source_file),
+                              new=not os.path.exists(sprite_file))
+        source.close()
+    else:
+        # The sprite goes first: a patched component must never import a missing file
+        with profile.stage('write'):
+            if sprite_text is not None:
+                os.makedirs(os.path.dirname(os.path.abspath(sprite_file)), exist_ok=True)
+                write_atomic(sprite_file, [sprite_text.encode('utf-8')])
+            digest = source.digest
+            if plan:
+                digest = write_plan(source, plan)
+        source.close()
+        if plan or not ledger.trusted:
+            ledger.save(digest)
+
+    return {
+        'defs_moved': build.defs_moved,
+        'symbols': len(build.symbols),
+        'sprite_entries': len(build.entries),
+        'new_entries': build.new_entries,
+        'bytes_removed': -plan.size_delta(),
+        'sprite_file': sprite_file,
+        'units': ledger.status,
+        'profile': profile.units,
+        'diff': diff
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Move IngredientSVG gradients, filters and static branches into a shared sprite')
+    parser.add_argument('source_file', nargs='?', default=DEFAULT_SOURCE)
+    parser.add_argument('--sprite', dest='sprite_file', help=f'sprite component to write (default: components/{SPRITE_NAME}.jsx)')
+    parser.add_argument('--dry-run', action='store_true', help='print a unified diff and patch timings, write nothing')
+    args = parser.parse_args()
+
+    stats = extract_svg_sprite(args.source_file, args.sprite_file, dry_run=args.dry_run)
+    if 'skipped' in stats:
+        raise SystemExit(1)
+    if args.dry_run:
+        print(stats['diff'], end='')
+        print(format_profile(stats['profile']))
+        raise SystemExit(0)
+
+    print("SVG Sprite Built!")
+    print(f"Definitions moved: {stats['defs_moved']}")
+    print(f"Static branches drawn with <use>: {stats['symbols']}")
+    print(f"Sprite entries: {stats['sprite_entries']} ({stats['new_entries']} new)")
+    print(f"Bytes removed from component: {stats['bytes_removed']:,}")
+    for name, status in stats['units'].items():
+        print(f"  {name}: {status}")
+    print(f"\nSprite written to: {stats['sprite_file']}")
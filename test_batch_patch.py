@@ -0,0 +1,60 @@
+"""
+Batch runner checks against the game as it is in src/.
+
+    python -m pytest test_batch_patch.py
+"""
+
+import os
+import shutil
+
+from batch_patch import TRANSFORMS, run_target
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GAME = os.path.join(ROOT, 'src', 'CookingGame.jsx')
+GAME_DATA = os.path.join(ROOT, 'src', 'data', 'gameData.js')
+
+INLINE_RECIPES = """const RECIPES = {
+  salmonMaki: { name: 'Salmon Maki Roll', required: ['rice', 'salmon', 'nori'], emoji: '🍣' },
+  friedRice: { name: 'Fried Rice', required: ['rice', 'egg'], emoji: '🍳' }
+};
+"""
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_every_transform_runs_on_the_game():
+    before = _read(GAME)
+    result = run_target(GAME, sorted(TRANSFORMS), dry_run=True)
+    assert result['ok'], result['error']
+    assert _read(GAME) == before
+
+
+def test_enhance_game_skips_the_modular_game():
+    # CookingGame.jsx imports RECIPES and gets progression, orders and
+    # disasters from src/systems hooks, so there is nothing to add
+    result = run_target(GAME, ['enhance_game', 'add_ui_components'], dry_run=True)
+    assert result['ok'], result['error']
+    assert result['transforms'] == {}
+    assert 'useCustomerOrders' in result['skipped']['enhance_game']
+    assert result['skipped']['add_ui_components'] == 'Could not find title element'
+
+
+def test_enhance_game_patches_a_single_file_game(tmp_path):
+    # The same component with RECIPES declared inline and no systems hooks
+    with open(GAME, encoding='utf-8') as f:
+        text = f.read()
+    text = text.replace('// Recipes imported from gameData.js\n', INLINE_RECIPES, 1)
+    text = text.replace("import { useCustomerOrders } from './systems/useCustomerOrders';\n", '', 1)
+    target = tmp_path / 'CookingGame.jsx'
+    target.write_text(text, encoding='utf-8')
+    (tmp_path / 'data').mkdir()
+    shutil.copy(GAME_DATA, tmp_path / 'data' / 'gameData.js')
+
+    result = run_target(str(target), ['enhance_game'], dry_run=True)
+    assert result['ok'], result['error']
+    assert result['skipped'] == {}
+    assert result['transforms']['enhance_game']['constants'] == 'applied'
+    assert "xpReward: 20 }" in result['diffs']['enhance_game']
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Replay recorded restaurant sessions headlessly and report what they cost.
+
+A trace is the JSONL written by src/systems/gameTrace.js: a header with
+the PRNG seed, then the player's inputs (restaurant toggles, customers,
+served dishes, heat changes) and the game's outcomes (order spawns,
+drops, completions, disasters). Record one by opening the game with
+`?trace` and running `window.__gameTrace.download()` in the console.
+
+Each trace is played back through the order and disaster hooks by
+src/test/traceReplay.test.js under vitest, on fake timers advanced one
+tick at a time, with the PRNG seeded as recorded so the same customers
+and disasters come back. Game time runs `--speed` times faster than real
+time (0 runs flat out). The report gives handler time per tick, renders
+per tick and heap growth, and whether the replayed outcomes still match
+the recording; a mismatch means game logic changed, not just its speed.
+
+    python trace_replay.py traces/lunch-rush.jsonl
+    python trace_replay.py traces/*.jsonl --json after.json --compare before.json
+    python trace_replay.py traces/lunch-rush.jsonl --speed 0 --max-tick-ms 4
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEST_FILE = 'src/test/traceReplay.test.js'
+TEST_NAME = 'replays TRACE_REPLAY'
+DEFAULT_VITEST = 'npx vitest run'
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def _percentile(values, pct):
+    # Nearest rank, so the result is always an observed value
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def run_replay(trace_path, speed=100, tick=1000, vitest=DEFAULT_VITEST):
+    """Replay one trace through vitest and return its raw report."""
+    fd, report_path = tempfile.mkstemp(suffix='.json', prefix='trace-report-')
+    os.close(fd)
+    env = dict(os.environ, TRACE_REPLAY=os.path.abspath(trace_path), TRACE_REPORT=report_path,
+               TRACE_SPEED=str(speed), TRACE_TICK=str(tick))
+    try:
+        command = vitest.split() + [TEST_FILE, '-t', TEST_NAME]
+        try:
+            done = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+        except OSError as e:
+            raise ReplayError(f'cannot run {command[0]}: {e}')
+        if done.returncode != 0 or not os.path.getsize(report_path):
+            output = (done.stdout + done.stderr).strip().splitlines()
+            raise ReplayError(f'{trace_path}: vitest failed\n' + '\n'.join(output[-20:]))
+        with open(report_path, encoding='utf-8') as f:
+            report = json.load(f)
+        report['trace'] = trace_path
+        return report
+    finally:
+        os.remove(report_path)
+
+
+def summarize(report):
+    """Reduce a raw replay report to the numbers worth comparing."""
+    ticks = report['ticks']
+    times = [ms for _, ms, _, _ in ticks]
+    renders = [count for _, _, count, _ in ticks]
+    heap = [(t, used) for t, _, _, used in ticks if used is not None]
+    minutes = len(ticks) * report['tick'] / 60000.0
+    growth = (heap[-1][1] - heap[0][1]) / 1e6 if len(heap) > 1 else 0.0
+    span = (heap[-1][0] - heap[0][0]) / 60000.0 if len(heap) > 1 else 0.0
+    slowest = sorted(ticks, key=lambda tick: tick[1], reverse=True)[:5]
+    return {
+        'trace': report['trace'],
+        'seed': report['seed'],
+        'minutes': round(minutes, 2),
+        'ticks': len(ticks),
+        'tick_ms': {
+            'p50': round(_percentile(times, 50), 3),
+            'p95': round(_percentile(times, 95), 3),
+            'max': round(max(times) if times else 0.0, 3),
+        },
+        'slowest': [{'t': t, 'ms': round(ms, 3), 'renders': count} for t, ms, count, _ in slowest],
+        'renders': report['renders'],
+        'renders_per_tick': round(sum(renders) / len(ticks), 2) if ticks else 0.0,
+        'max_renders': max(renders) if renders else 0,
+        'heap_growth_mb': round(growth, 2),
+        'heap_mb_per_minute': round(growth / span, 3) if span else 0.0,
+        'outcomes': report['outcomes'],
+        'diverged': report['diverged'],
+    }
+
+
+def compare(previous, current):
+    """Changes of the headline numbers, per trace present in both runs."""
+    before = {s['trace']: s for s in previous}
+    rows = []
+    for summary in current:
+        old = before.get(summary['trace'])
+        if old is None:
+            continue
+        rows.append((summary['trace'], [
+            ('p50 ms', old['tick_ms']['p50'], summary['tick_ms']['p50']),
+            ('p95 ms', old['tick_ms']['p95'], summary['tick_ms']['p95']),
+            ('renders', old['renders'], summary['renders']),
+            ('heap MB/min', old['heap_mb_per_minute'], summary['heap_mb_per_minute']),
+        ]))
+    return rows
+
+
+def print_report(summaries, comparison=()):
+    for s in summaries:
+        ms = s['tick_ms']
+        print(f"{s['trace']}  (seed {s['seed']}, {s['minutes']} min, {s['ticks']} ticks)")
+        print(f"  handler time per tick  p50 {ms['p50']:.3f} ms  p95 {ms['p95']:.3f} ms  max {ms['max']:.3f} ms")
+        print(f"  renders                {s['renders']} total, {s['renders_per_tick']} per tick, "
+              f"{s['max_renders']} max")
+        print(f"  heap growth            {s['heap_growth_mb']:+.2f} MB ({s['heap_mb_per_minute']:+.3f} MB/min)")
+        for slow in s['slowest'][:3]:
+            print(f"  slow tick              t={slow['t'] / 1000:.0f}s  {slow['ms']:.3f} ms  "
+                  f"{slow['renders']} renders")
+        if s['diverged'] is None:
+            print(f"  outcomes               {s['outcomes']} replayed as recorded")
+        else:
+            d = s['diverged']
+            print(f"  outcomes               diverged at #{d['index']}: "
+                  f"recorded {json.dumps(d['expected'])}, replayed {json.dumps(d['actual'])}")
+    for trace, rows in comparison:
+        print(f'{trace} vs previous run')
+        for label, old, new in rows:
+            change = f'{(new - old) / old * 100:+.1f}%' if old else 'n/a'
+            print(f'  {label:12} {old:>10} -> {new:<10} {change}')
+
+
+def expand_paths(paths):
+    traces = []
+    for path in paths:
+        matches = sorted(glob.glob(path)) or [path]
+        for match in matches:
+            if os.path.isdir(match):
+                traces.extend(sorted(glob.glob(os.path.join(match, '*.jsonl'))))
+            else:
+                traces.append(match)
+    return traces
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('traces', nargs='+', help='trace files, directories or globs')
+    parser.add_argument('--speed', type=float, default=100,
+                        help='game time per real time; 0 runs flat out (default: 100)')
+    parser.add_argument('--tick', type=int, default=1000, help='game time per tick in ms (default: 1000)')
+    parser.add_argument('--vitest', default=DEFAULT_VITEST, help=f'vitest command (default: {DEFAULT_VITEST})')
+    parser.add_argument('--json', dest='json_path', help='also write the summaries as JSON')
+    parser.add_argument('--compare', help='JSON from an earlier --json run to compare against')
+    parser.add_argument('--max-tick-ms', type=float,
+                        help='exit with status 1 if a trace\'s p95 handler time per tick is above this')
+    parser.add_argument('--strict', action='store_true',
+                        help='exit with status 1 if a replay diverges from its recording')
+    args = parser.parse_args(argv)
+
+    traces = expand_paths(args.traces)
+    missing = [t for t in traces if not os.path.isfile(t)]
+    if missing:
+        parser.error(f'no such trace: {", ".join(missing)}')
+
+    summaries = []
+    for trace in traces:
+        try:
+            summaries.append(summarize(run_replay(trace, args.speed, args.tick, args.vitest)))
+        except ReplayError as e:
+            print(e, file=sys.stderr)
+            return 2
+    comparison = ()
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            comparison = compare(json.load(f), summaries)
+    print_report(summaries, comparison)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2)
+
+    if args.max_tick_ms is not None and any(s['tick_ms']['p95'] > args.max_tick_ms for s in summaries):
+        return 1
+    if args.strict and any(s['diverged'] is not None for s in summaries):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())